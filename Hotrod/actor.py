@@ -0,0 +1,784 @@
+"""Store classes for the state and rules of in-game characters.
+
+This module includes headless classes that store the state of the player
+and enemies and apply the game's rules to them. They are stepped by a
+simulation.Simulation and do not depend on any widgets, so the game can
+be run without a window. Positions are stored in grid units, where the
+center of the cell at (x, y) is at (x + 0.5, y + 0.5).
+
+Classes:
+Actor -- class that all actors inherit from
+PlayerActor(Actor) -- class for the player beetle
+EnemyActor(Actor) -- class that all enemies inherit from
+RedActor(EnemyActor) -- class for the red beetle enemy
+PinkActor(EnemyActor) -- class for the pink beetle enemy
+BlueActor(EnemyActor) -- class for the blue beetle enemy
+OrangeActor(EnemyActor) -- class for the orange beetle enemy
+"""
+
+# Standard python libraries
+import math
+
+# Own modules
+import direction
+
+
+# Number of cells characters move per second before the speed multiplier is applied
+BASE_SPEED = 1.0
+# Size of characters relative to a cell, so that they fit inside the cell's walls
+CHARACTER_SIZE = 0.8
+# Time that the character will start flashing before powerup ends in seconds
+POWERUP_END_WARNING_TIME = 0.5
+# Time between the player's flashes when the powerup is ending in seconds
+POWERUP_FLASH_INTERVAL = 0.1
+
+
+class Actor(object):
+
+    """Store state and rules relevant to all characters.
+
+    Abstract class that should not be instantiated directly.
+    All actors should inherit from this class. It includes methods that
+    are universal to all characters, such as those managing movement.
+
+    Public methods:
+    move -- move the actor. Should be called every tick.
+    initialise -- set up the position, direction and speed of the actor
+    get_position -- return the actor's position interpolated between ticks
+    kill_character -- set the actor to dead
+
+    Attributes:
+    simulation -- the simulation.Simulation the actor belongs to
+    start_position -- tuple of the actor's starting grid coordinates
+    grid_position -- tuple of the grid coordinates of the cell the actor is in
+    x -- the actor's x position in grid units
+    y -- the actor's y position in grid units
+    current_direction -- direction.Direction the actor is currently moving in
+    next_direction -- direction.Direction the actor will move in when possible
+    speed -- the number of cells the actor moves per tick
+    """
+
+    # Actors are stepped every tick, so their state is kept in slots rather
+    # than an instance dictionary, which makes it smaller and quicker to access
+    __slots__ = ('simulation', 'start_position', 'grid_position', 'x', 'y', 'previous_x', 'previous_y',
+                 'current_direction', 'next_direction', 'speed', 'dead')
+
+    def __init__(self, simulation):
+        """Create an actor belonging to the given simulation.Simulation."""
+
+        self.simulation = simulation
+        self.start_position = (0, 0)
+        self.grid_position = (0, 0)
+        self.x = self.previous_x = 0.5
+        self.y = self.previous_y = 0.5
+        self.current_direction = direction.Direction.right
+        self.next_direction = direction.Direction.right
+        self.speed = 0
+
+    def move(self):
+        """Move the actor.
+
+        This method moves the actor corresponding to its current
+        and pending directions and ensures that actors are positioned
+        correctly. It should be called every tick.
+        """
+
+        self.previous_x = self.x
+        self.previous_y = self.y
+        self.x += self.current_direction.dx * self.speed
+        self.y += self.current_direction.dy * self.speed
+
+        self.__check_position_validity()
+        self.__update_direction(self.previous_x, self.previous_y)
+        self.__update_grid_position()
+
+    def initialise(self):
+        """Initialise the actor's position, direction and speed.
+
+        This method sets the actor to its initial position and direction.
+        Actors should override this method to initialise any additional properties
+        specific to that actor. This method still needs to be called in the actors'
+        versions, however.
+        """
+
+        self.__initialise_direction()
+        self.__initialise_grid_position()
+        self.__initialise_speed()
+
+    def get_position(self, alpha):
+        """Return the actor's position interpolated between the last two ticks.
+
+        This method returns the position in grid units as a tuple. It should be
+        used for rendering, so that movement looks smooth when frames don't
+        line up with ticks.
+
+        Arguments:
+        alpha -- how far between the previous and current tick to interpolate, from 0 to 1
+        """
+
+        return (self.previous_x + (self.x - self.previous_x) * alpha,
+                self.previous_y + (self.y - self.previous_y) * alpha)
+
+    def kill_character(self):
+        """Set the actor to dead."""
+
+        self.dead = True
+
+    def _enter_cell(self):
+        """Respond to the actor moving into a different cell.
+
+        This method is called whenever the actor's grid position changes.
+        Actors can override and call back to this method to respond in
+        ways specific to that actor. Collisions between actors are not
+        checked here, as the simulation checks them once per tick.
+        """
+
+        pass
+
+    def _move_to_cell_center(self, cell):
+        """Place the actor in the center of the given cell without interpolating.
+
+        Arguments:
+        cell -- grid coordinates of the cell as a tuple
+        """
+
+        self.grid_position = tuple(cell)
+        self.x = self.previous_x = cell[0] + 0.5
+        self.y = self.previous_y = cell[1] + 0.5
+
+    def __initialise_direction(self):
+        """Initialise the starting directions of the actors.
+
+        All actors start facing right.
+        This method should be called when a new game/level is started, or
+        when the player dies.
+        """
+
+        self.current_direction = direction.Direction.right
+        self.next_direction = direction.Direction.right
+
+    def __initialise_grid_position(self):
+        """Initialise the actor's position based on its start position.
+
+        This method should be called when a new game/level is started, or
+        when the player dies.
+        """
+
+        self._move_to_cell_center(self.start_position)
+
+    def __initialise_speed(self):
+        """Set the actor's speed per tick from the game's speed multiplier."""
+
+        self.speed = BASE_SPEED * self.simulation.settings.speed_multiplier * self.simulation.tick_length
+
+    def __check_position_validity(self):
+        """Ensure the actor cannot move through walls.
+
+        This method moves the actor back to the center of its current cell
+        if it attempts to move into a wall. This method should be called every
+        tick, after the actor has been moved.
+        """
+
+        current_direction = self.current_direction
+        if self.simulation.maze.is_wall(self.grid_position, current_direction):
+            # The actor is moved back if it has moved past the center in its direction of travel
+            center_x = self.grid_position[0] + 0.5
+            center_y = self.grid_position[1] + 0.5
+            if current_direction.dx > 0 and self.x > center_x or current_direction.dx < 0 and self.x < center_x:
+                self.x = center_x
+            elif current_direction.dy > 0 and self.y > center_y or current_direction.dy < 0 and self.y < center_y:
+                self.y = center_y
+
+    def __update_direction(self, previous_x, previous_y):
+        """Check pending movement direction and change direction if possible.
+
+        If there is a pending movement direction, this method checks if movement
+        in that direction is possible. If it is possible, the current direction is
+        set to the pending direction, and the actor is moved to the center of the
+        current cell to ensure correct positioning.
+
+        Arguments:
+        previous_x -- the actor's x position on the previous tick
+        previous_y -- the actor's y position on the previous tick
+        """
+
+        # No need to do any checks if next direction is the same
+        if self.next_direction is not self.current_direction:
+            if not self.simulation.maze.is_wall(self.grid_position, self.next_direction):
+                center_x = self.grid_position[0] + 0.5
+                center_y = self.grid_position[1] + 0.5
+                dx = self.current_direction.dx
+                dy = self.current_direction.dy
+
+                # Set new direction for next tick if actor has moved into/past center or is at the center of cell
+                if dx:
+                    if ((dx > 0 and self.x >= center_x > previous_x) or
+                            (dx < 0 and self.x <= center_x < previous_x) or
+                            (self.x == center_x and previous_x == center_x)):
+                        # Ensure actor is in center before changing direction
+                        self.x = center_x
+                        self.__change_direction()
+
+                elif ((dy > 0 and self.y >= center_y > previous_y) or
+                        (dy < 0 and self.y <= center_y < previous_y) or
+                        (self.y == center_y and previous_y == center_y)):
+                    self.y = center_y
+                    self.__change_direction()
+
+    def __change_direction(self):
+        """Set the current direction to the pending next direction."""
+
+        self.current_direction = self.next_direction
+
+    def __update_grid_position(self):
+        """Update the grid position of the actor.
+
+        This method updates the grid coordinates of the cell the actor's
+        center is in, and responds if it has moved into a different cell.
+        """
+
+        grid_position = (int(self.x), int(self.y))
+        if grid_position != self.grid_position:
+            self.grid_position = grid_position
+            self._enter_cell()
+
+
+class PlayerActor(Actor):
+
+    """Store state and rules relevant to the player character.
+
+    This class stores state and methods relating to only the player,
+    namely eating pellets, power-ups and dying.
+
+    Public methods:
+    initialise -- initialise the state relating to the player
+    activate_powerup -- activate power up effects when a power pellet is eaten
+    kill_character -- set the player to dead
+
+    Attributes:
+    dead -- whether the player is dead or not
+    powered_up -- whether the player is powered up
+    flash_hidden -- whether the powered up image is hidden whilst the powerup is ending
+    """
+
+    __slots__ = ('powered_up', 'flash_hidden')
+
+    def __init__(self, simulation):
+        """Create the player actor belonging to the given simulation.Simulation."""
+
+        Actor.__init__(self, simulation)
+        self.dead = False
+        self.powered_up = False
+        self.flash_hidden = False
+
+    def initialise(self):
+        """Initialise the player actor.
+
+        This method performs initialisations specific for the player
+        character, such as power-up mode. It also performs the
+        initialisations relevant to all actors.
+        """
+
+        self.__initialise_states()
+        Actor.initialise(self)
+
+    def activate_powerup(self):
+        """Ensure that powerup is activated correctly.
+
+        This method activates the powerup, by changing the powered_up state and scheduling
+        the method that removes the powerup for the appropriate amount of time.
+        It also schedules the method that makes the player flash
+        when the powerup is about to run out.
+        It should be called when the player eats a power pellet.
+        """
+
+        # Unschedule remove powerup so that full length of additional pellets is experienced
+        self.simulation.unschedule(self.__remove_powerup)
+        self.simulation.unschedule(self.__indicate_powerup_end)
+        self.simulation.dispatch('on_powerup_activated')
+        self.flash_hidden = False
+        self.__set_powered_up(True)
+        powerup_length = self.simulation.settings.powerup_length
+        self.simulation.schedule_once(self.__remove_powerup, powerup_length)
+        self.simulation.schedule_once(self.__indicate_powerup_end, powerup_length - POWERUP_END_WARNING_TIME)
+
+    def kill_character(self):
+        """Set the player to dead and remove their powerup.
+
+        The simulation's listeners are notified so that a life can be removed.
+        """
+
+        if not self.dead:
+            self.dead = True
+            self.simulation.dispatch('on_player_killed')
+            self.__set_powered_up(False)
+
+    def _enter_cell(self):
+        """Check for pellet collisions."""
+
+        self.__check_pellet_collision()
+        Actor._enter_cell(self)
+
+    def __initialise_states(self):
+        """Initialise power-up and dead states.
+
+        This method initialises the power-up and dead states
+        of the player, so that it starts not dead and not
+        powered up.
+        """
+
+        self.simulation.unschedule(self.__remove_powerup)
+        self.simulation.unschedule(self.__indicate_powerup_end)
+        # Start not dead and not powered up
+        self.powered_up = False
+        self.flash_hidden = False
+        self.dead = False
+
+    def __check_pellet_collision(self):
+        """Check for pellet collisions.
+
+        This method checks if the cell the player has moved into contains
+        a pellet. If so, the simulation is told that it has been eaten.
+        """
+
+        if self.simulation.get_pellet(self.grid_position) is not None:
+            self.simulation.eat_pellet(self.grid_position)
+
+    def __set_powered_up(self, powered_up):
+        """Change the powered up state and dispatch on_powered_up if it changes.
+
+        The simulation switches the enemies' frightened states in response.
+
+        Arguments:
+        powered_up -- the new powered up state as a bool
+        """
+
+        if powered_up != self.powered_up:
+            self.powered_up = powered_up
+            if not powered_up:
+                self.flash_hidden = False
+            self.simulation.dispatch('on_powered_up', powered_up)
+
+    def __remove_powerup(self, dt):
+        """Remove the power-up status from the player.
+
+        This method is scheduled on the simulation and sets the
+        player's powered up state to false when called.
+        """
+
+        self.__set_powered_up(False)
+
+    def __indicate_powerup_end(self, dt):
+        """Indicate that the powerup is about to end.
+
+        This method is scheduled on the simulation and makes the
+        player flash between its powered up and normal appearance
+        until the power up ends.
+        """
+
+        if self.powered_up:
+            self.flash_hidden = not self.flash_hidden
+            self.simulation.schedule_once(self.__indicate_powerup_end, POWERUP_FLASH_INTERVAL)
+
+
+class EnemyActor(Actor):
+
+    """Store state and rules relating only to enemy characters.
+
+    This class stores state and methods relevant to enemy characters.
+    Each enemy's target is defined by its subclass, and the moves towards
+    it are chosen by the simulation's enemy_engine.EnemyEngine.
+
+    Public Methods:
+    retreat -- move the dead enemy back to the beetle den
+    initialise -- initialise the modes of the enemy
+    reset_character -- reset the enemy for a new level
+    start_mode_change_timer -- reset the scatter/chase mode change timer
+    start_activation_timer -- reset the timer that releases the enemy
+    switch_frightened_state -- change enemy state to match the player's powerup
+    kill_character -- set the enemy to dead
+
+    Attributes:
+    activation_timer -- the number of seconds until the enemy is released
+    chasing -- whether the enemy is in scatter or chase mode
+    dormant -- whether the enemy is dormant
+    frightened -- whether the enemy is frightened
+    dead -- whether the enemy is dead
+    scatter_length -- the number of seconds scatter mode lasts
+    chase_length -- the number of seconds chase mode lasts
+    mode_change_timer -- the number of seconds the next chase/scatter mode change will be scheduled for
+    mode_change_start -- when the last chase/scatter mode change was for pausing it
+    mode_time_remaining -- how much time remaining until next chase/scatter mode change for resuming it
+    target_position -- grid coordinates the enemy is moving towards
+    decision_key -- the cell, direction and frightened state the enemy engine last chose a move for, or None
+    """
+
+    __slots__ = ('dormant', 'chasing', 'frightened', 'scatter_length', 'chase_length', 'mode_change_timer',
+                 'mode_change_start', 'mode_time_remaining', 'target_position', 'decision_key')
+
+    activation_timer = 0
+
+    def __init__(self, simulation):
+        """Create an enemy actor belonging to the given simulation.Simulation."""
+
+        Actor.__init__(self, simulation)
+        self.dormant = True
+        self.chasing = False
+        self.frightened = False
+        self.dead = False
+
+        self.scatter_length = 0
+        self.chase_length = 0
+        self.mode_change_timer = 0
+        self.mode_change_start = 0
+        self.mode_time_remaining = 0
+        self.target_position = (0, 0)
+        self.decision_key = None
+
+    def retreat(self):
+        """Move the enemy to the beetle den.
+
+        This method moves the enemy straight towards the beetle den if it is dead.
+        The enemy is set to not dead upon reaching the beetle den.
+        This method should be called every tick in place of moving if
+        the enemy is dead.
+        """
+
+        beetle_den_center = self.simulation.maze.beetle_den['center']
+        distance_x = beetle_den_center[0] + 0.5 - self.x
+        distance_y = beetle_den_center[1] + 0.5 - self.y
+        self.previous_x = self.x
+        self.previous_y = self.y
+
+        # The enemy has arrived when the den's center is within its bounds
+        if abs(distance_x) > CHARACTER_SIZE / 2 or abs(distance_y) > CHARACTER_SIZE / 2:
+            distance = math.hypot(distance_x, distance_y)
+            self.x += distance_x / distance * self.speed
+            self.y += distance_y / distance * self.speed
+        else:
+            self._move_to_cell_center(beetle_den_center)
+            self.dead = False
+            self.frightened = False
+
+    def initialise(self):
+        """Initialise the enemy actors.
+
+        This method performs initialisations specific for the enemies,
+        such as setting their initial modes and also performs initialisations
+        relevant to all actors.
+        It should be called when the player dies or a new game/level is
+        started.
+        """
+
+        self.__initialise_chase_mode()
+        self.__initialise_frightened_mode()
+        self.dead = False
+        self.decision_key = None
+        Actor.initialise(self)
+
+    def reset_character(self):
+        """Reset the enemy actors.
+
+        This method performs the basic initialisations, in addition to
+        things that should only be reset upon starting a new game or
+        level.
+        """
+
+        self.__unschedule_all_timers()
+        self.__deactivate()
+        self.__reset_mode_lengths()
+        self._set_start_position()
+        self.initialise()
+
+    def start_mode_change_timer(self):
+        """Reset the scatter/chase mode change timer to its initial state.
+
+        This method resets the chasing/scatter mode change timer.
+        It should be called when the player dies or a new game/level is started.
+        """
+
+        self.simulation.unschedule(self.__change_mode)
+        self.mode_change_timer = self.scatter_length
+        self.mode_change_start = self.simulation.get_time()
+        self.simulation.schedule_once(self.__change_mode, self.mode_change_timer)
+
+    def start_activation_timer(self):
+        """Reset the activation timer to its initial state.
+
+        This method resets the timer that determines when the enemy is
+        activated.
+        It should only be called when a new game or level is started.
+        """
+
+        self.simulation.unschedule(self.__activate)
+        self.simulation.schedule_once(self.__activate, self.activation_timer)
+
+    def switch_frightened_state(self):
+        """Switch the frightened state.
+
+        This method should be called when the players powered-up state
+        has changed or a power pellet has been eaten.
+        This method switches the enemies' frightened states to correspond
+        with the players powered up state and pauses/resumes regular scatter/chase
+        mode changes accordingly.
+        """
+
+        if self.simulation.player.powered_up:
+            # Enemies can't become frightened when in the beetle den
+            if not self.simulation.maze.is_in_den(self.grid_position):
+                self.frightened = True
+            self.__pause_mode_change()
+        else:
+            self.frightened = False
+            self.__resume_mode_change()
+
+    def kill_character(self):
+        """Set the enemy to dead.
+
+        The simulation's listeners are notified so that points can be awarded.
+        """
+
+        if not self.dead:
+            self.dead = True
+            self.simulation.dispatch('on_enemy_killed', self)
+
+    def __initialise_chase_mode(self):
+        """Set chase state to initial value."""
+
+        self.chasing = False
+
+    def __initialise_frightened_mode(self):
+        """Set frightened mode to initial value."""
+
+        self.frightened = False
+
+    def __reset_mode_lengths(self):
+        """Reset the length of the scatter and chase mode.
+
+        This method resets the length of scatter and chase mode
+        to match the game's setup properties.
+        """
+
+        self.scatter_length = self.simulation.settings.scatter_length
+        self.chase_length = self.simulation.settings.chase_length
+
+    def __unschedule_all_timers(self):
+        """Unschedule all enemy timers."""
+
+        self.simulation.unschedule(self.__activate)
+        self.simulation.unschedule(self.__change_mode)
+
+    def __change_mode(self, dt):
+        """Switch enemy between scatter and chase mode.
+
+        This method is scheduled on the simulation and switches the enemy state
+        between chasing and not chasing, as well as reversing enemy direction to
+        signify the change.
+        After the mode is changed, the timer for this method being called again
+        is set depending on the mode that the enemy is now in.
+        """
+
+        self.chasing = not self.chasing
+        self.current_direction = self.current_direction.opposite
+        self.mode_change_start = self.simulation.get_time()
+
+        if self.chasing:
+            self.mode_change_timer = self.chase_length
+        else:
+            self.mode_change_timer = self.scatter_length
+        self.simulation.schedule_once(self.__change_mode, self.mode_change_timer)
+
+    def __deactivate(self):
+        """Change enemy state to dormant."""
+
+        self.dormant = True
+
+    # Needed to be a method to schedule on the simulation
+    def __activate(self, dt):
+        """Change enemy state to not dormant."""
+
+        self.dormant = False
+
+    def __pause_mode_change(self):
+        """Pause the mode change timers.
+
+        This method pauses the chase/scatter mode change timers.
+        It should be called when the enemies become frightened.
+        """
+
+        self.simulation.unschedule(self.__change_mode)
+        time_into_mode = self.simulation.get_time() - self.mode_change_start
+
+        if self.chasing:
+            self.mode_time_remaining = self.chase_length - time_into_mode
+        else:
+            self.mode_time_remaining = self.scatter_length - time_into_mode
+
+    def __resume_mode_change(self):
+        """Resume the mode change timers.
+
+        This method resumes the chase/scatter mode change timers.
+        It should be called when the enemies stop being frightened.
+        """
+
+        self.simulation.schedule_once(self.__change_mode, self.mode_time_remaining)
+
+
+class RedActor(EnemyActor):
+
+    """Store rules specific to the Red Beetle.
+
+    The red beetle is released immediately.
+    """
+
+    __slots__ = ()
+
+    activation_timer = 0
+
+    def _set_start_position(self):
+        """Set the start position of the enemy.
+
+        The red beetle starts in the center of the beetle den.
+        """
+
+        self.start_position = self.simulation.maze.beetle_den['center']
+
+    def _get_target_position(self):
+        """Determine and return the target position.
+
+        This method returns the target position depending on the enemy's mode.
+        The red beetle's target position is the player's position when in chase mode.
+        The target position is the upper right corner when in scatter mode.
+        """
+
+        if self.chasing:
+            # Target position is always player's position
+            return self.simulation.player.grid_position
+        else:
+            # Upper right corner in scatter mode
+            return (self.simulation.maze.columns + 1, self.simulation.maze.rows + 1)
+
+
+class PinkActor(EnemyActor):
+
+    """Store rules specific to the Pink Beetle.
+
+    The pink beetle is released after 10 seconds.
+    """
+
+    __slots__ = ()
+
+    activation_timer = 10
+
+    def _set_start_position(self):
+        """Set the start position of the enemy.
+
+        The pink beetle starts in the center of the beetle den.
+        """
+
+        self.start_position = self.simulation.maze.beetle_den['center']
+
+    def _get_target_position(self):
+        """Determine and return the target position
+
+        This method returns the target position depending on the enemy's mode.
+        The pink beetle's target position is two spaces ahead of the player's
+        current position when in chase mode.
+        The target position is the upper left corner when scattering.
+        """
+
+        if self.chasing:
+            player = self.simulation.player
+            # Target position is 2 cells ahead of the player
+            return (player.grid_position[0] + 2 * player.current_direction.dx,
+                    player.grid_position[1] + 2 * player.current_direction.dy)
+        else:
+            # Upper left corner in scatter mode
+            return (-1, self.simulation.maze.rows + 1)
+
+
+class BlueActor(EnemyActor):
+
+    """Store rules specific to the Blue Beetle.
+
+    The blue beetle is released after 20 seconds.
+    """
+
+    __slots__ = ()
+
+    activation_timer = 20
+
+    def _set_start_position(self):
+        """Set the start position of the enemy.
+
+        The blue beetle starts at the right of the beetle den.
+        """
+
+        self.start_position = self.simulation.maze.beetle_den['right']
+
+    def _get_target_position(self):
+        """Determine and return the target position
+
+        This method returns the target position depending on the enemy's mode.
+        The blue beetle's target position is the twice the vector between the
+        player's position and the red beetles position when in chase mode.
+        The target position is the lower right corner when scattering.
+        """
+
+        if self.chasing:
+            player = self.simulation.player
+            # Could have used Pink's target position, but calculating here reduces confusion
+            two_cells_ahead_x = player.grid_position[0] + 2 * player.current_direction.dx
+            two_cells_ahead_y = player.grid_position[1] + 2 * player.current_direction.dy
+            red_beetle_position = self.simulation.red_enemy.grid_position
+            # Double the vector between 2 cells ahead of the player and the red beetle's position
+            return (2 * two_cells_ahead_x - red_beetle_position[0],
+                    2 * two_cells_ahead_y - red_beetle_position[1])
+        else:
+            # Bottom right in scatter mode
+            return (self.simulation.maze.columns + 1, -1)
+
+
+class OrangeActor(EnemyActor):
+
+    """Store rules specific to the Orange Beetle.
+
+    The orange beetle is released after 30 seconds.
+
+    Attributes:
+    flee_distance -- the distance from the player the enemy needs to be within to flee
+    """
+
+    __slots__ = ()
+
+    activation_timer = 30
+    flee_distance = 4
+
+    def _set_start_position(self):
+        """Set the start position of the enemy.
+
+        The orange beetle starts at the left of the beetle den.
+        """
+
+        self.start_position = self.simulation.maze.beetle_den['left']
+
+    def _get_target_position(self):
+        """Determine and return the target position
+
+        This method returns the target position depending on the enemy's mode.
+        The orange beetle's target position is the player's position when the distance
+        away from the player is greater than flee_distance. It is the same as its
+        scatter target if the distance is less than flee_distance.
+        The target position is the lower left corner when scattering.
+        """
+
+        if self.chasing:
+            player_position = self.simulation.player.grid_position
+            distance_from_player = math.hypot(player_position[0] - self.grid_position[0],
+                                              player_position[1] - self.grid_position[1])
+            if distance_from_player > self.flee_distance:
+                # Target position is player if the player is more than flee_distance tiles away
+                return player_position
+
+        # Returns bottom left in scatter mode or if within flee_distance from player
+        return -1, -1
@@ -0,0 +1,158 @@
+"""Contain a class for loading and caching the game's sounds.
+
+This module contains a class that loads the game's sounds without
+blocking the first frame. The sounds that are needed straight away are
+loaded first, and the rest are decoded on a background thread. Sounds
+are looked up by key from a shared cache, and any sound that hasn't
+been loaded yet is loaded when it is first asked for.
+
+Classes:
+SoundCache -- class for loading the sounds and handing them out by key
+"""
+
+# Standard Python libraries
+import os
+import threading
+
+
+# Sounds that play on a loop, rather than once
+LOOPING_SOUNDS = ('title', 'frightened')
+
+
+def load_sound(path):
+    """Load a sound file with Kivy's SDL2 audio provider and return it."""
+
+    from kivy.core.audio.audio_sdl2 import SoundSDL2
+    return SoundSDL2(source=path)
+
+
+def dispatch_on_main_thread(callback):
+    """Call a callback on the Kivy main thread, as sounds are played from there."""
+
+    from kivy.clock import Clock
+    Clock.schedule_once(lambda dt: callback(), 0)
+
+
+class SoundCache(object):
+
+    """Load the game's sounds and hand them out by key.
+
+    The keys are the sound files' names without their extensions. The
+    sounds are loaded in the order they are asked for, so the sounds
+    needed first should be loaded first. Sounds that are being loaded in
+    the background can still be asked for: they are loaded straight away,
+    and the background thread skips them. If both threads load the same
+    sound at once, the one that finishes first is kept.
+
+    Public methods:
+    load_in_background -- load the sounds that haven't been loaded on a background thread
+    when_ready -- call a callback on the main thread once a sound has been loaded
+    is_ready -- return whether a sound has been loaded
+
+    Attributes:
+    keys -- list of the keys of all of the sounds
+    """
+
+    def __init__(self, directory, load=load_sound, dispatch=dispatch_on_main_thread):
+        """Find the sounds in a directory, without loading them.
+
+        Arguments:
+        directory -- the directory containing the sound files
+        load -- function that loads the sound file at a path and returns it
+        dispatch -- function that calls a callback on the thread that plays sounds
+        """
+
+        self.__paths = {}
+        for file in sorted(os.listdir(directory)):
+            filename, extension = os.path.splitext(file)
+            self.__paths[filename] = os.path.join(directory, file)
+        self.keys = sorted(self.__paths)
+
+        self.__load = load
+        self.__dispatch = dispatch
+        # Guards the loaded sounds and the waiting callbacks, but isn't held whilst loading
+        self.__lock = threading.Lock()
+        self.__sounds = {}
+        # Callbacks waiting on each sound to be loaded
+        self.__waiting = {}
+
+    def __getitem__(self, key):
+        """Return the sound with the given key, loading it if it hasn't been loaded.
+
+        A KeyError is raised if there is no sound file with the key.
+        """
+
+        sound = self.__sounds.get(key)
+        if sound is None:
+            sound = self.__load_sound(key)
+        return sound
+
+    def __contains__(self, key):
+        """Return whether there is a sound file with the given key."""
+
+        return key in self.__paths
+
+    def is_ready(self, key):
+        """Return whether the sound with the given key has been loaded."""
+
+        return key in self.__sounds
+
+    def when_ready(self, key, callback):
+        """Call a callback on the main thread once the sound with the given key has been loaded.
+
+        If the sound has already been loaded, the callback is called straight away.
+
+        Arguments:
+        key -- the key of the sound to wait for
+        callback -- function to call with no arguments
+        """
+
+        with self.__lock:
+            if key not in self.__sounds:
+                self.__waiting.setdefault(key, []).append(callback)
+                return
+        callback()
+
+    def load_in_background(self, order=()):
+        """Load the sounds that haven't been loaded on a background thread.
+
+        Arguments:
+        order -- keys of sounds to load before the rest, in the order to load them
+        """
+
+        keys = [key for key in order if key in self.__paths]
+        keys.extend(key for key in self.keys if key not in keys)
+        thread = threading.Thread(target=self.__load_all, args=(keys,))
+        # Sounds that haven't been loaded shouldn't stop the app from closing
+        thread.daemon = True
+        thread.start()
+
+    def __load_all(self, keys):
+        """Load each of the sounds with the given keys, unless they have already been loaded."""
+
+        for key in keys:
+            if key not in self.__sounds:
+                self.__load_sound(key)
+
+    def __load_sound(self, key):
+        """Load a sound, store it and pass it to the callbacks waiting on it."""
+
+        path = self.__paths[key]
+        with self.__lock:
+            sound = self.__sounds.get(key)
+        if sound is not None:
+            return sound
+
+        # Decoding is slow, so it is done without the lock to not stall the other thread
+        loaded_sound = self.__load(path)
+        if key in LOOPING_SOUNDS:
+            loaded_sound.loop = True
+
+        with self.__lock:
+            # Another thread may have loaded it at the same time, in which case its sound is kept
+            sound = self.__sounds.setdefault(key, loaded_sound)
+            waiting = self.__waiting.pop(key, [])
+
+        for callback in waiting:
+            self.__dispatch(callback)
+        return sound
@@ -0,0 +1,410 @@
+"""Run many games headlessly to measure the game's difficulty.
+
+This file contains classes for playing full games without a window,
+with the player controlled by a scripted policy. Games are run in
+parallel across a pool of processes, one seed per game, and a summary
+of the results is printed. It is intended for tuning the constants in
+the difficulty module. Running this file will run the batch, for example:
+
+python batch.py --games 1000 --policy greedy
+
+Classes:
+RandomPolicy -- player policy that wanders the maze randomly
+GreedyPolicy -- player policy that heads for the nearest pellet whilst avoiding enemies
+HeadlessGame -- class for playing a full game without a window
+"""
+
+# Standard Python libraries
+import argparse
+import collections
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+# Kivy must not parse the runner's arguments, and only logs warnings so the summary is readable
+# The console log is kept, as Kivy sends everything written to stderr through it
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+os.environ.setdefault('KCFG_KIVY_LOG_LEVEL', 'warning')
+
+# Own modules
+import difficulty
+import direction
+import maze
+import simulation
+
+
+# Size of the maze, matching the level in the kv file
+DEFAULT_COLUMNS = 8
+DEFAULT_ROWS = 8
+# Seconds of game time a level can last before the game is abandoned
+# This stops a policy that can't finish a level from running forever
+MAX_LEVEL_TIME = 600
+# Highest level a game is played to before it is stopped
+DEFAULT_MAX_LEVEL = 20
+
+
+class RandomPolicy(object):
+
+    """Control the player by wandering the maze randomly.
+
+    A new direction is chosen each time the player enters a cell, avoiding
+    turning back on itself unless the cell is a dead end.
+
+    Public methods:
+    reset -- forget the player's last position after it has been moved
+    choose_direction -- return the direction the player should move in next
+    """
+
+    def __init__(self, seed):
+        """Create a policy whose choices are repeatable for the given seed."""
+
+        self.random = random.Random(seed)
+        self.__last_position = None
+
+    def reset(self):
+        """Forget the player's last position, so that a new direction is chosen.
+
+        This method should be called whenever the player is moved back to its start.
+        """
+
+        self.__last_position = None
+
+    def choose_direction(self, level_simulation):
+        """Return the direction the player should move in next, or None to keep going.
+
+        A direction is only chosen when the player enters a different cell.
+
+        Arguments:
+        level_simulation -- the simulation.Simulation being played
+        """
+
+        player = level_simulation.player
+        if player.grid_position == self.__last_position:
+            return None
+        self.__last_position = player.grid_position
+        return self._choose_move(level_simulation)
+
+    def _choose_move(self, level_simulation):
+        """Return a random open direction, avoiding turning back if possible."""
+
+        player = level_simulation.player
+        moves = get_open_directions(level_simulation.maze, player.grid_position)
+        forward_moves = [dir for dir in moves if dir is not player.current_direction.opposite]
+        return self.random.choice(forward_moves or moves)
+
+
+class GreedyPolicy(RandomPolicy):
+
+    """Control the player by heading for the nearest pellet whilst avoiding enemies.
+
+    Each time the player enters a cell, a breadth first search finds the
+    shortest route to a pellet that doesn't pass through or next to a
+    dangerous enemy. Whilst powered up, frightened enemies are chased as well.
+    If no safe route exists, the player wanders randomly.
+
+    Public methods:
+    reset -- forget the player's last position after it has been moved
+    choose_direction -- return the direction the player should move in next
+    """
+
+    def _choose_move(self, level_simulation):
+        """Return the start of the shortest safe route, or a random direction if there isn't one."""
+
+        move = self.__get_route_start(level_simulation)
+        if move is None:
+            return RandomPolicy._choose_move(self, level_simulation)
+        return move
+
+    def __get_route_start(self, level_simulation):
+        """Return the first direction of the shortest safe route to a target, or None."""
+
+        level_maze = level_simulation.maze
+        player = level_simulation.player
+        danger = self.__get_dangerous_cells(level_simulation)
+
+        start = player.grid_position
+        first_moves = {start: None}
+        queue = collections.deque([start])
+        while queue:
+            coordinates = queue.popleft()
+            if coordinates != start and self.__is_target(level_simulation, coordinates):
+                return first_moves[coordinates]
+
+            for dir in get_open_directions(level_maze, coordinates):
+                adjacent = level_maze.get_adjacent_coordinates(coordinates, dir)
+                if adjacent not in first_moves and adjacent not in danger:
+                    first_moves[adjacent] = first_moves[coordinates] or dir
+                    queue.append(adjacent)
+        return None
+
+    def __get_dangerous_cells(self, level_simulation):
+        """Return a set of the cells that contain or neighbour an enemy that can kill the player."""
+
+        level_maze = level_simulation.maze
+        danger = set()
+        for enemy in level_simulation.enemies:
+            if enemy.dead or enemy.dormant or enemy.frightened:
+                continue
+            danger.add(enemy.grid_position)
+            for dir in direction.Direction:
+                adjacent = level_maze.get_adjacent_coordinates(enemy.grid_position, dir)
+                if adjacent is not None:
+                    danger.add(adjacent)
+        return danger
+
+    def __is_target(self, level_simulation, coordinates):
+        """Return whether the cell contains a pellet or, whilst powered up, a frightened enemy."""
+
+        if level_simulation.get_pellet(coordinates) is not None:
+            return True
+        if level_simulation.player.powered_up:
+            for occupant in level_simulation.get_occupants(coordinates):
+                if occupant is not level_simulation.player and occupant.frightened:
+                    return True
+        return False
+
+
+# Policies that can be chosen from the command line
+POLICIES = {'random': RandomPolicy,
+            'greedy': GreedyPolicy}
+
+
+def get_open_directions(level_maze, coordinates):
+    """Return a list of the directions the player can move in from a cell.
+
+    Arguments:
+    level_maze -- the maze.Maze of the level
+    coordinates -- grid coordinates of the cell as a tuple
+    """
+
+    return [dir for dir in direction.Direction if not level_maze.is_wall(coordinates, dir)]
+
+
+class HeadlessGame(object):
+
+    """Play a full game without a window.
+
+    This class plays levels with the same rules and difficulty ramp as
+    main.HotrodGame, with the player controlled by a policy, until the player
+    runs out of lives, the maximum level is completed or a level takes too long.
+
+    Public methods:
+    play -- play the game and return its results
+    """
+
+    def __init__(self, seed, policy_name, columns=DEFAULT_COLUMNS, rows=DEFAULT_ROWS,
+                 max_level=DEFAULT_MAX_LEVEL):
+        """Set up a game.
+
+        Arguments:
+        seed -- seed that every level of the game is generated from
+        policy_name -- the key in POLICIES of the policy that controls the player
+        columns -- number of columns the mazes should have
+        rows -- number of rows the mazes should have
+        max_level -- the highest level that is played
+        """
+
+        self.seed = seed
+        self.policy = POLICIES[policy_name](seed)
+        self.columns = columns
+        self.rows = rows
+        self.max_level = max_level
+
+        self.random = random.Random(seed)
+        self.settings = difficulty.DifficultySettings()
+        self.score = 0
+        self.lives = difficulty.INITIAL_LIVES
+        self.level_number = 1
+        self.ticks = 0
+        self.__player_killed = False
+        self.__pellets_cleared = False
+
+    def play(self):
+        """Play the game and return a dictionary of its results."""
+
+        outcome = 'max_level'
+        while self.level_number <= self.max_level:
+            outcome = self.__play_level()
+            if outcome != 'cleared':
+                break
+
+            self.level_number += 1
+            self.lives += difficulty.LIVES_BONUS
+            self.settings.increase()
+            outcome = 'max_level'
+
+        return {'seed': self.seed,
+                'score': self.score,
+                'level': min(self.level_number, self.max_level),
+                'ticks': self.ticks,
+                'outcome': outcome}
+
+    def __play_level(self):
+        """Play a single level and return how it ended.
+
+        'cleared' is returned if all of the pellets were eaten, 'game_over'
+        if the player ran out of lives and 'timeout' if the level took too long.
+        """
+
+        level_seed = self.random.randint(0, sys.maxsize)
+        # Maze generation uses the global random number generator, as in the app
+        random.seed(level_seed)
+        level_maze = maze.Maze(self.columns, self.rows)
+        level_maze.generate()
+        level_maze.precompute_distance_fields()
+
+        level_simulation = simulation.Simulation(level_maze, self.settings, level_seed)
+        level_simulation.bind(on_pellet_eaten=self.__on_pellet_eaten,
+                              on_pellets_cleared=self.__on_pellets_cleared,
+                              on_enemy_killed=self.__on_enemy_killed,
+                              on_player_killed=self.__on_player_killed)
+        level_simulation.start()
+
+        self.policy.reset()
+        self.__pellets_cleared = False
+        max_ticks = MAX_LEVEL_TIME * simulation.TICK_RATE
+        for tick in range(max_ticks):
+            move = self.policy.choose_direction(level_simulation)
+            if move is not None:
+                level_simulation.player.next_direction = move
+            level_simulation.step()
+            self.ticks += 1
+
+            if self.__pellets_cleared:
+                return 'cleared'
+            if self.__player_killed:
+                self.__player_killed = False
+                self.lives -= 1
+                if self.lives <= 0:
+                    return 'game_over'
+                level_simulation.reset_after_death()
+                self.policy.reset()
+        return 'timeout'
+
+    def __on_pellet_eaten(self, coordinates, pellet_type):
+        """Increase the score when a pellet is eaten."""
+
+        self.score += self.settings.pellet_value
+
+    def __on_pellets_cleared(self):
+        """Record that the level has been completed."""
+
+        self.__pellets_cleared = True
+
+    def __on_enemy_killed(self, enemy):
+        """Increase the score when an enemy is killed."""
+
+        self.score += self.settings.kill_value
+
+    def __on_player_killed(self):
+        """Record that the player has been killed, so it is handled after the tick."""
+
+        self.__player_killed = True
+
+
+def run_game(game_arguments):
+    """Play a game and return its results.
+
+    This function is run by the process pool's workers, so it takes
+    a single tuple of the HeadlessGame's arguments.
+
+    Arguments:
+    game_arguments -- tuple of (seed, policy_name, columns, rows, max_level)
+    """
+
+    return HeadlessGame(*game_arguments).play()
+
+
+def run_games(games, policy_name, processes=None, first_seed=0,
+              columns=DEFAULT_COLUMNS, rows=DEFAULT_ROWS, max_level=DEFAULT_MAX_LEVEL):
+    """Play a number of games in parallel and return a list of their results.
+
+    Each game is played with a consecutive seed, so a batch is repeatable.
+    The games are shared between a pool of processes, or played in this
+    process if only one process is requested.
+
+    Arguments:
+    games -- the number of games to play
+    policy_name -- the key in POLICIES of the policy that controls the player
+    processes -- the number of processes to use, or None for one per core
+    first_seed -- the seed of the first game
+    columns -- number of columns the mazes should have
+    rows -- number of rows the mazes should have
+    max_level -- the highest level that is played
+    """
+
+    game_arguments = [(seed, policy_name, columns, rows, max_level)
+                      for seed in range(first_seed, first_seed + games)]
+    if processes == 1:
+        return [run_game(arguments) for arguments in game_arguments]
+
+    pool = multiprocessing.Pool(processes)
+    try:
+        # Larger chunks mean workers spend less time waiting on the parent process
+        chunk_size = max(1, games // (4 * (processes or multiprocessing.cpu_count())))
+        return pool.map(run_game, game_arguments, chunk_size)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def summarise(results, elapsed_time):
+    """Return a list of lines summarising the results of a batch.
+
+    Arguments:
+    results -- list of the results of each game
+    elapsed_time -- the real time in seconds the batch took
+    """
+
+    scores = sorted(result['score'] for result in results)
+    levels = [result['level'] for result in results]
+    outcomes = collections.Counter(result['outcome'] for result in results)
+    games = len(results)
+
+    return ['games: %d in %.1fs (%.0f games/minute)' % (games, elapsed_time, games * 60.0 / elapsed_time),
+            'score: mean %.1f, median %d, max %d' % (float(sum(scores)) / games, scores[games // 2], scores[-1]),
+            'level reached: mean %.2f, max %d' % (float(sum(levels)) / games, max(levels)),
+            'outcomes: ' + ', '.join('%s %d' % item for item in sorted(outcomes.items()))]
+
+
+def positive_integer(text):
+    """Return a command line argument as an integer, if it is at least 1."""
+
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError("must be at least 1: %r" % text)
+    return value
+
+
+def parse_arguments(arguments):
+    """Return the parsed command line arguments."""
+
+    parser = argparse.ArgumentParser(description="Play games of Hotrod the Beetle headlessly.")
+    parser.add_argument('--games', type=positive_integer, default=100, help="number of games to play")
+    parser.add_argument('--policy', choices=sorted(POLICIES), default='greedy',
+                        help="how the player is controlled")
+    parser.add_argument('--processes', type=positive_integer, default=None,
+                        help="number of worker processes (default: one per core)")
+    parser.add_argument('--seed', type=int, default=0, help="seed of the first game")
+    parser.add_argument('--columns', type=int, default=DEFAULT_COLUMNS, help="maze columns")
+    parser.add_argument('--rows', type=int, default=DEFAULT_ROWS, help="maze rows")
+    parser.add_argument('--max-level', type=int, default=DEFAULT_MAX_LEVEL,
+                        help="highest level to play to")
+    return parser.parse_args(arguments)
+
+
+def main(arguments):
+    """Run a batch of games from the command line and print a summary."""
+
+    options = parse_arguments(arguments)
+    start_time = time.time()
+    results = run_games(options.games, options.policy, options.processes, options.seed,
+                        options.columns, options.rows, options.max_level)
+    for line in summarise(results, time.time() - start_time):
+        print(line)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
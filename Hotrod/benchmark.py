@@ -0,0 +1,349 @@
+"""Time the game's hot paths and compare them against a stored baseline.
+
+This file contains benchmarks for level generation, character movement,
+the enemies' AI and the level's layout. Every benchmark uses a fixed seed,
+and the results are written as JSON so that they can be stored as a baseline
+and compared against later runs. Running this file will run the benchmarks,
+for example:
+
+python benchmark.py --output baseline.json
+python benchmark.py --baseline baseline.json
+
+The benchmarks that need widgets (--widgets) can only be run where Kivy can open a window.
+
+Classes:
+Benchmark -- class for storing a benchmark and timing it
+"""
+
+# Standard Python libraries
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import timeit
+
+# Kivy must not parse the benchmark's arguments, and only logs warnings so the results are readable
+# The console log is kept, as Kivy sends everything written to stderr through it
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+os.environ.setdefault('KCFG_KIVY_LOG_LEVEL', 'warning')
+
+# Own modules
+import difficulty
+import direction
+import actor
+import maze
+import simulation
+
+
+# Seed used for every benchmark, so that each run times the same work
+SEED = 130
+# Sizes of the mazes that generation is timed for
+MAZE_SIZES = (8, 32, 128)
+# Number of enemies in the swarm level that a tick is timed for
+# The enemy engine updates enemies one at a time, so this tick grows linearly with the
+# number of enemies, and its gains come from caching moves and distance fields
+SWARM_SIZE = 32
+# Number of times each benchmark's timing is repeated
+DEFAULT_REPEAT = 5
+# Minimum number of seconds a single timing should last
+# Shorter timings are dominated by the timer's resolution
+MIN_TIMING_LENGTH = 0.2
+# Fraction slower than the baseline a benchmark can be before it is flagged
+DEFAULT_TOLERANCE = 0.1
+
+
+class Benchmark(object):
+
+    """Store a benchmark and time it.
+
+    Public methods:
+    run -- time the benchmark and return its results
+
+    Attributes:
+    name -- the name the benchmark's results are stored under
+    setup -- function that prepares the benchmark and returns the function to time
+    """
+
+    def __init__(self, name, setup):
+        """Create a benchmark.
+
+        Arguments:
+        name -- the name the benchmark's results are stored under
+        setup -- function that takes no arguments and returns the function to time
+        """
+
+        self.name = name
+        self.setup = setup
+
+    def run(self, repeat):
+        """Time the benchmark and return a dictionary of its results.
+
+        The number of calls per timing is increased until a timing lasts long
+        enough to be accurate. The fastest timing is the most reliable measure,
+        as slower ones are caused by other processes rather than the code.
+
+        Arguments:
+        repeat -- the number of timings to take
+        """
+
+        random.seed(SEED)
+        function = self.setup()
+        timer = timeit.Timer(function)
+
+        number = 1
+        while timer.timeit(number) < MIN_TIMING_LENGTH:
+            number *= 2
+        timings = [timing / number for timing in timer.repeat(repeat, number)]
+
+        mean = sum(timings) / len(timings)
+        return {'name': self.name,
+                'number': number,
+                'repeat': repeat,
+                'min': min(timings),
+                'mean': mean,
+                'max': max(timings)}
+
+
+def create_maze(size):
+    """Return a generated square maze.Maze with the given number of columns and rows."""
+
+    random.seed(SEED)
+    level_maze = maze.Maze(size, size)
+    level_maze.generate()
+    level_maze.precompute_distance_fields()
+    return level_maze
+
+
+def create_simulation(size=8, enemy_count=4):
+    """Return a simulation.Simulation of a generated square maze with all of its enemies active.
+
+    Arguments:
+    size -- the number of columns and rows of the maze
+    enemy_count -- the number of enemies, with the standard four repeated to make up the rest
+    """
+
+    level_simulation = simulation.Simulation(create_maze(size), difficulty.DifficultySettings(), SEED)
+    enemy_classes = [actor.RedActor, actor.PinkActor, actor.BlueActor, actor.OrangeActor]
+    for number in range(4, enemy_count):
+        level_simulation.add_enemy(enemy_classes[number % 4])
+    level_simulation.start()
+    level_simulation.active = True
+    for enemy in level_simulation.enemies:
+        enemy.dormant = False
+        enemy.chasing = True
+    return level_simulation
+
+
+def setup_maze_generation(size):
+    """Return a function that generates a maze of the given size."""
+
+    def generate_maze():
+        random.seed(SEED)
+        level_maze = maze.Maze(size, size)
+        level_maze.generate()
+        level_maze.precompute_distance_fields()
+    return generate_maze
+
+
+def setup_player_move():
+    """Return a function that moves the player back and forth along a corridor."""
+
+    level_simulation = create_simulation()
+    player = level_simulation.player
+
+    def move_player():
+        if level_simulation.maze.is_wall(player.grid_position, player.current_direction):
+            player.next_direction = player.current_direction.opposite
+        player.move()
+    return move_player
+
+
+def setup_enemy_engine_step():
+    """Return a function that chooses the moves of a simulation's enemies and moves them."""
+
+    return create_simulation().enemy_engine.step
+
+
+def setup_adjacent_coordinates():
+    """Return a function that looks up the neighbours of every cell of a maze."""
+
+    level_maze = create_maze(32)
+    cells = [level_maze.get_coordinates(cell_id) for cell_id in range(level_maze.columns * level_maze.rows)]
+    directions = list(direction.Direction)
+
+    def get_all_adjacent():
+        for coordinates in cells:
+            for dir in directions:
+                level_maze.get_adjacent_coordinates(coordinates, dir)
+    return get_all_adjacent
+
+
+def setup_simulation_step():
+    """Return a function that runs a tick of a simulation."""
+
+    return create_simulation().step
+
+
+def setup_swarm_step():
+    """Return a function that runs a tick of a simulation of a larger maze with SWARM_SIZE enemies."""
+
+    return create_simulation(32, SWARM_SIZE).step
+
+
+def get_game():
+    """Return a main.HotrodGame with a simulation of a generated level.
+
+    This imports the app, so it needs a window.
+    """
+
+    from kivy.lang import Builder
+    import main
+
+    # The app normally loads the kv file when it is run
+    kv_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hotrod.kv')
+    if kv_file not in Builder.files:
+        Builder.load_file(kv_file)
+    game = main.HotrodGame()
+    game.level.size = (800, 800)
+    random.seed(SEED)
+    game.level.generate_level()
+
+    level_simulation = simulation.Simulation(game.level.maze, game, SEED)
+    game.play_area.simulation = level_simulation
+    game.level.place_pellets(level_simulation.pellets)
+    game.player.actor = level_simulation.player
+    for enemy_actor, enemy in zip(level_simulation.enemies, game.enemies):
+        enemy.actor = enemy_actor
+    return game
+
+
+def setup_level_generation():
+    """Return a function that generates the level's widgets."""
+
+    game = get_game()
+
+    def generate_level():
+        random.seed(SEED)
+        game.level.generate_level()
+    return generate_level
+
+
+def setup_adjacent_cell():
+    """Return a function that looks up the neighbouring cell widgets of every cell."""
+
+    level = get_game().level
+    cells = [cell for column in level.cells for cell in column]
+    directions = list(direction.Direction)
+
+    def get_all_adjacent():
+        for cell in cells:
+            for dir in directions:
+                level.get_adjacent_cell(cell, dir)
+    return get_all_adjacent
+
+
+def setup_play_area_layout():
+    """Return a function that lays out the play area for a new size."""
+
+    game = get_game()
+    sizes = [(800, 800), (801, 801)]
+
+    def update_layout():
+        # Alternate sizes so that the layout always changes
+        sizes.reverse()
+        game.level.size = sizes[0]
+        game.play_area.update_play_area_size()
+    return update_layout
+
+
+def get_benchmarks(include_widgets):
+    """Return a list of the benchmarks to run.
+
+    Arguments:
+    include_widgets -- whether to include the benchmarks that need a window
+    """
+
+    benchmarks = [Benchmark('maze_generation_%dx%d' % (size, size),
+                            lambda size=size: setup_maze_generation(size))
+                  for size in MAZE_SIZES]
+    benchmarks += [Benchmark('player_move', setup_player_move),
+                   Benchmark('enemy_engine_step', setup_enemy_engine_step),
+                   Benchmark('maze_adjacent_coordinates_32x32', setup_adjacent_coordinates),
+                   Benchmark('simulation_step', setup_simulation_step),
+                   Benchmark('swarm_step_%d_enemies' % SWARM_SIZE, setup_swarm_step)]
+    if include_widgets:
+        benchmarks += [Benchmark('level_generate_level', setup_level_generation),
+                       Benchmark('level_get_adjacent_cell', setup_adjacent_cell),
+                       Benchmark('play_area_update_size', setup_play_area_layout)]
+    return benchmarks
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """Return a list of descriptions of the benchmarks that are slower than the baseline.
+
+    Arguments:
+    results -- the results of this run
+    baseline -- the results of the baseline run
+    tolerance -- the fraction slower than the baseline a benchmark can be
+    """
+
+    baseline_times = dict((result['name'], result['min']) for result in baseline['benchmarks'])
+    regressions = []
+    for result in results['benchmarks']:
+        baseline_time = baseline_times.get(result['name'])
+        if baseline_time is not None and result['min'] > baseline_time * (1 + tolerance):
+            regressions.append('%s: %.3gs against baseline %.3gs (%+.0f%%)' %
+                               (result['name'], result['min'], baseline_time,
+                                (result['min'] / baseline_time - 1) * 100))
+    return regressions
+
+
+def parse_arguments(arguments):
+    """Return the parsed command line arguments."""
+
+    parser = argparse.ArgumentParser(description="Time the hot paths of Hotrod the Beetle.")
+    parser.add_argument('--output', help="file to write the JSON results to (default: standard output)")
+    parser.add_argument('--baseline', help="JSON results to compare against")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="fraction slower than the baseline that is flagged as a regression")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="number of timings per benchmark")
+    parser.add_argument('--filter', default='', help="only run benchmarks whose name contains this")
+    parser.add_argument('--widgets', action='store_true', help="include benchmarks that need a window")
+    return parser.parse_args(arguments)
+
+
+def main(arguments):
+    """Run the benchmarks from the command line.
+
+    The exit status is 1 if any benchmark is slower than the baseline.
+    """
+
+    options = parse_arguments(arguments)
+    results = {'python': platform.python_version(),
+               'platform': platform.platform(),
+               'seed': SEED,
+               'benchmarks': [benchmark.run(options.repeat)
+                              for benchmark in get_benchmarks(options.widgets)
+                              if options.filter in benchmark.name]}
+
+    output = json.dumps(results, indent=2, sort_keys=True)
+    if options.output:
+        with open(options.output, 'w') as output_file:
+            output_file.write(output + '\n')
+    else:
+        print(output)
+
+    if options.baseline:
+        with open(options.baseline) as baseline_file:
+            regressions = compare_to_baseline(results, json.load(baseline_file), options.tolerance)
+        for regression in regressions:
+            sys.stderr.write('Regression: ' + regression + '\n')
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
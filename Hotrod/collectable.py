@@ -1,71 +1,183 @@
 """Contain classes relating to collectables.
 
 This module contains classes that relate to objects that
-the player can collect.
+the player can collect. The state of a level's pellets is stored
+in a single bytearray, and all of them are drawn by one canvas group
+rather than by a widget per pellet.
 
 Classes:
-Pellet(Widget) -- class for all pellets
+PelletGrid -- class for storing which cells of a level contain pellets
+PelletLayer -- class for drawing the pellets of a PelletGrid
 PelletType(Enum) -- enum for storing the type of a pellet
 """
 
 
 # Kivy Modules
-from kivy.uix.widget import Widget
-from kivy.properties import NumericProperty
-from kivy.properties import ReferenceListProperty
-from kivy.properties import ObjectProperty
+from kivy.graphics import Color
+from kivy.graphics import Ellipse
+from kivy.graphics import InstructionGroup
 
 # Other modules
 from enum import Enum
 
 
-class Pellet(Widget):
-    """Contain information about the pellet widget.
+# Bit flags stored for each cell of a PelletGrid
+PELLET_FLAG = 1
+POWER_FLAG = 2
+# The colours the pellet types are drawn in
+NORMAL_PELLET_COLOR = (0.9, 0.9, 0)
+POWER_PELLET_COLOR = (0.9, 0, 0)
+# The size of the pellet types relative to the cell size
+NORMAL_PELLET_SIZE = 0.1
+POWER_PELLET_SIZE = 0.2
 
-    This class primarily stores information about the pellet
-    widget, such as its type and colour. It also stores methods for
-    ensuring that the pellet is displayed correctly.
 
-    Public Methods:
-    update_pellet_widget -- ensure the pellet's size and colour is correct
+class PelletGrid(object):
 
-    Kivy Events:
-    on_type -- updates the pellet widget when the type changes
+    """Store which cells of a level contain pellets.
 
-    Kivy Properties:
-    type -- ObjectProperty to store enum representing the pellet's type
-    color -- ObjectProperty to store the colour of the pellet. (kv file)
+    This class stores a byte of flags for every cell of a level, indexed by
+    maze cell id, recording whether the cell contains a pellet and whether
+    it is a power pellet. The number of pellets remaining is kept up to date,
+    so that eating a pellet and checking whether the level is complete
+    are both constant time.
+
+    Public methods:
+    add_pellet -- add a pellet of a given type to a cell
+    get_pellet -- return the type of the pellet in a cell
+    eat_pellet -- remove the pellet from a cell
+
+    Attributes:
+    flags -- bytearray of the pellet flags of each cell
+    count -- the number of pellets remaining
+    power_count -- the number of power pellets remaining
     """
 
-    type = ObjectProperty()
+    def __init__(self, cell_count):
+        """Create a grid of cells without any pellets.
+
+        Arguments:
+        cell_count -- the number of cells in the level
+        """
 
-    def update_pellet_widget(self):
-        """Set up pellet properties.
+        self.flags = bytearray(cell_count)
+        self.count = 0
+        self.power_count = 0
 
-        This method sets up the pellet size, color, and position depending
-        on its type. It should be called when the pellet type changes or
-        when the window size changes.
+    def add_pellet(self, cell_id, pellet_type):
+        """Add a pellet to a cell, replacing any pellet that is already there.
+
+        Arguments:
+        cell_id -- the maze cell id of the cell
+        pellet_type -- the PelletType of the pellet
         """
 
-        if self.type == PelletType.normal:
-            self.width = self.parent.width / 10
-            self.height = self.parent.height / 10
-            self.color = (0.9, 0.9, 0)
+        self.eat_pellet(cell_id)
+        if pellet_type == PelletType.power:
+            self.flags[cell_id] = PELLET_FLAG | POWER_FLAG
+            self.power_count += 1
+        else:
+            self.flags[cell_id] = PELLET_FLAG
+        self.count += 1
+
+    def get_pellet(self, cell_id):
+        """Return the PelletType of the pellet in a cell, or None.
+
+        Arguments:
+        cell_id -- the maze cell id of the cell
+        """
+
+        flags = self.flags[cell_id]
+        if not flags & PELLET_FLAG:
+            return None
+        elif flags & POWER_FLAG:
+            return PelletType.power
+        else:
+            return PelletType.normal
+
+    def eat_pellet(self, cell_id):
+        """Remove the pellet from a cell.
+
+        This method returns the PelletType of the pellet that was
+        removed, or None if the cell didn't contain a pellet.
+
+        Arguments:
+        cell_id -- the maze cell id of the cell
+        """
 
-        elif self.type == PelletType.power:
-            self.width = self.parent.width / 5
-            self.height = self.parent.height / 5
-            self.color = (0.9, 0, 0)
-        self.center = self.parent.center
+        pellet_type = self.get_pellet(cell_id)
+        if pellet_type is not None:
+            self.flags[cell_id] = 0
+            self.count -= 1
+            if pellet_type == PelletType.power:
+                self.power_count -= 1
+        return pellet_type
 
-    def on_type(self, instance, value):
-        """Update the pellet if its type changes
 
-        This is a Kivy event called when the pellet type changes. It causes the
-        pellet widget's properties to be updated.
+class PelletLayer(object):
+
+    """Draw the pellets of a level.
+
+    This class draws the pellets of a PelletGrid with one ellipse each,
+    all held in a single instruction group that is added to the level's
+    canvas. Pellets of each type are grouped together, so the colour only
+    changes once. Eaten pellets are hidden by shrinking their ellipse,
+    so the instructions only need rebuilding when the layout changes.
+
+    Public methods:
+    draw -- replace the instructions with ones for the pellets of a PelletGrid
+    hide_pellet -- stop drawing the pellet of a cell
+
+    Attributes:
+    instructions -- the kivy.graphics.InstructionGroup containing the pellets
+    """
+
+    def __init__(self):
+        """Create an empty pellet layer."""
+
+        self.instructions = InstructionGroup()
+        # The ellipse for each cell, indexed by maze cell id
+        self.__ellipses = []
+
+    def draw(self, pellets, level):
+        """Draw the pellets remaining in a PelletGrid.
+
+        This method should be called when a level is set up and
+        whenever the level's layout changes.
+
+        Arguments:
+        pellets -- the PelletGrid of the level
+        level -- the level.Level to draw the pellets in
+        """
+
+        self.instructions.clear()
+        self.__ellipses = [None] * len(pellets.flags)
+
+        for pellet_type, color, size in ((PelletType.normal, NORMAL_PELLET_COLOR, NORMAL_PELLET_SIZE),
+                                         (PelletType.power, POWER_PELLET_COLOR, POWER_PELLET_SIZE)):
+            self.instructions.add(Color(*color))
+            width = level.cell_size[0] * size
+            height = level.cell_size[1] * size
+            for cell_id in range(len(pellets.flags)):
+                if pellets.get_pellet(cell_id) == pellet_type:
+                    x, y = level.convert_to_window_position(level.maze.get_coordinates(cell_id))
+                    ellipse = Ellipse(pos=(x + (level.cell_size[0] - width) / 2,
+                                           y + (level.cell_size[1] - height) / 2),
+                                      size=(width, height))
+                    self.instructions.add(ellipse)
+                    self.__ellipses[cell_id] = ellipse
+
+    def hide_pellet(self, cell_id):
+        """Stop drawing the pellet of a cell.
+
+        Arguments:
+        cell_id -- the maze cell id of the cell
         """
 
-        self.update_pellet_widget()
+        ellipse = self.__ellipses[cell_id]
+        if ellipse is not None:
+            ellipse.size = (0, 0)
+            self.__ellipses[cell_id] = None
 
 
 class PelletType(Enum):
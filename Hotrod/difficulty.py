@@ -0,0 +1,124 @@
+"""Contain the values that tune the game's difficulty and rewards.
+
+This module contains the initial values of the properties that modify
+the game's difficulty and rewards, and the ramp applied to them when the
+level advances. It does not depend on any widgets, so the same ramp is used
+by the app and by headless runs of the game.
+
+Classes:
+DifficultySettings -- class for storing difficulty properties without a window
+"""
+
+
+# The values specified below were chosen to tune the game's difficulty
+
+# These are initial values of properties that modify the games's difficulty/rewards
+# The points that kills add on the first level
+INITIAL_KILL_VALUE = 100
+# The points that pellets add on the first level
+INITIAL_PELLET_VALUE = 10
+# The number of powerups spawned on the first level
+INITIAL_POWERUP_LIMIT = 6
+# The length of time in seconds powerups last on the first level
+INITIAL_POWERUP_TIME = 10
+# The number of consecutive seconds enemies target the player for
+INITIAL_CHASE_TIME = 15
+# The number of consecutive seconds enemies stop targeting the player
+INITIAL_SCATTER_TIME = 7
+# The movement speed of characters on the first level
+INITIAL_SPEED_MULTIPLIER = 1
+# Number of lives the player starts with
+INITIAL_LIVES = 3
+
+# The number of lives the player gains when the level advances
+LIVES_BONUS = 1
+
+# These are the adjustments applied to the respective property when the level advances
+SPEED_INCREMENT = 0.1
+CHASE_INCREMENT = 1
+PELLET_VALUE_INCREMENT = 10
+KILL_VALUE_INCREMENT = 100
+SCATTER_DECREMENT = -1
+POWERUP_TIME_DECREMENT = -1
+POWERUP_LIMIT_DECREMENT = -1
+
+# These are the maximum/minimum values the adjusted properties can take
+MAX_SPEED_MULTIPLIER = 2
+MAX_PELLET_VALUE = 100
+MIN_SCATTER_LENGTH = 0
+MIN_POWERUP_LENGTH = 0
+MIN_POWERUP_LIMIT = 0
+
+
+def initialise_difficulty(settings):
+    """Set the difficulty properties of an object to their initial values.
+
+    Arguments:
+    settings -- object with the difficulty properties, such as a main.HotrodGame
+    """
+
+    settings.pellet_value = INITIAL_PELLET_VALUE
+    settings.kill_value = INITIAL_KILL_VALUE
+
+    settings.powerup_limit = INITIAL_POWERUP_LIMIT
+    settings.powerup_length = INITIAL_POWERUP_TIME
+    settings.scatter_length = INITIAL_SCATTER_TIME
+    settings.chase_length = INITIAL_CHASE_TIME
+    settings.speed_multiplier = INITIAL_SPEED_MULTIPLIER
+
+
+def increase_difficulty(settings):
+    """Increase the difficulty of an object's difficulty properties.
+
+    This function increases the difficulty by adjusting the values
+    of the relevant properties by the defined increment, until they
+    will exceed their maximum or minimum values.
+
+    Arguments:
+    settings -- object with the difficulty properties, such as a main.HotrodGame
+    """
+
+    if settings.speed_multiplier <= MAX_SPEED_MULTIPLIER - SPEED_INCREMENT:
+        settings.speed_multiplier += SPEED_INCREMENT
+    if settings.scatter_length >= MIN_SCATTER_LENGTH - SCATTER_DECREMENT:
+        settings.scatter_length += SCATTER_DECREMENT
+    if settings.powerup_length >= MIN_POWERUP_LENGTH - POWERUP_TIME_DECREMENT:
+        settings.powerup_length += POWERUP_TIME_DECREMENT
+    if settings.powerup_limit >= MIN_POWERUP_LIMIT - POWERUP_LIMIT_DECREMENT:
+        settings.powerup_limit += POWERUP_LIMIT_DECREMENT
+
+    settings.chase_length += CHASE_INCREMENT
+    settings.pellet_value += PELLET_VALUE_INCREMENT
+    settings.kill_value += KILL_VALUE_INCREMENT
+
+
+class DifficultySettings(object):
+
+    """Store the difficulty properties of a game without a window.
+
+    This class stores the same difficulty properties as main.HotrodGame,
+    so that it can be used as the settings of a simulation.Simulation
+    when the game is run headlessly.
+
+    Public methods:
+    increase -- increase the difficulty for the next level
+
+    Attributes:
+    powerup_limit -- the number of powerups that can spawn
+    powerup_length -- the number of seconds a powerup lasts
+    scatter_length -- the number of seconds the enemies scatter
+    chase_length -- the number of seconds the enemies target the player
+    speed_multiplier -- the value the character's base speed will be multiplied by
+    pellet_value -- the number of points pellets are worth
+    kill_value -- the number of points kills are worth
+    """
+
+    def __init__(self):
+        """Create settings with the initial difficulty."""
+
+        initialise_difficulty(self)
+
+    def increase(self):
+        """Increase the difficulty for the next level."""
+
+        increase_difficulty(self)
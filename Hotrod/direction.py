@@ -1,9 +1,15 @@
 """Contain an enum to represent directions.
 
 This module includes an enum for representing the directions left, down,
-right and up.
+right and up, and a table of each direction's properties. The properties
+are looked up in the table once when the module is loaded and stored on
+the enum's members, so code that runs every frame reads plain attributes
+rather than comparing directions or their vectors.
 """
 
+# Standard python library
+import collections
+
 # Kivy modules
 from kivy.vector import Vector
 
@@ -11,11 +17,28 @@ from kivy.vector import Vector
 from enum import Enum
 
 
+# The properties of a direction. index is its position in the Direction enum, dx and dy
+# are the steps it moves in, opposite is the index of the opposite direction, angle is
+# the rotation in degrees of a character facing it and bit is the bit of the edge on
+# that side of a cell in the maze's wall bitmasks
+DirectionProperties = collections.namedtuple('DirectionProperties',
+                                             ('index', 'dx', 'dy', 'opposite', 'angle', 'bit'))
+
+# The properties of left, down, right and up, indexed by direction index
+# Opposite directions are two apart, so the opposite of index i is i ^ 2
+DIRECTION_TABLE = (DirectionProperties(0, -1, 0, 2, 0, 1 << 0),
+                   DirectionProperties(1, 0, -1, 3, 90, 1 << 1),
+                   DirectionProperties(2, 1, 0, 0, 180, 1 << 2),
+                   DirectionProperties(3, 0, 1, 1, 270, 1 << 3))
+
+
 class Direction(Enum):
     """Store enumerations for directions.
 
     This is an enum to represent directions.
-    Values are the vectors representing the direction.
+    Values are the vectors representing the direction. Each member also has
+    the index, dx, dy, angle and bit of its row in DIRECTION_TABLE, and its
+    opposite member, as attributes.
 
     Public methods:
     get_angle -- return the angle corresponding to the direction
@@ -30,23 +53,22 @@ class Direction(Enum):
     def get_angle(self):
         """Return the rotation angle in degrees relevant to the Direction"""
 
-        if self == Direction.left:
-            return 0
-        elif self == Direction.down:
-            return 90
-        elif self == Direction.right:
-            return 180
-        elif self == Direction.up:
-            return 270
+        return self.angle
 
     def get_opposite(self):
         """Return the opposite Direction"""
 
-        if self == Direction.left:
-            return Direction.right
-        elif self == Direction.down:
-            return Direction.up
-        elif self == Direction.right:
-            return Direction.left
-        elif self == Direction.up:
-            return Direction.down
+        return self.opposite
+
+
+# The Direction members, indexed by direction index
+DIRECTIONS = tuple(Direction)
+
+for _direction, _properties in zip(DIRECTIONS, DIRECTION_TABLE):
+    _direction.index = _properties.index
+    _direction.dx = _properties.dx
+    _direction.dy = _properties.dy
+    _direction.angle = _properties.angle
+    _direction.bit = _properties.bit
+    _direction.opposite = DIRECTIONS[_properties.opposite]
+del _direction, _properties
@@ -0,0 +1,175 @@
+"""Contain a class for updating all of a level's enemies in one pass.
+
+This module contains an engine that chooses the next direction of every
+enemy and moves them, once per tick. The engine reads the flat tables of
+integers in the maze's junction graph, so choosing a move is a handful of
+list lookups rather than calls that build coordinates and compare
+directions. Enemies in a corridor follow it, and only choose a move from
+their target when they enter a decision cell. Enemies that share a target
+share its distance field.
+
+The enemies are still updated one at a time in a Python loop, so a tick
+takes time proportional to the number of enemies. What the engine saves is
+the cost of each enemy, mostly by caching moves and distance fields, which
+keeps levels with dozens of enemies playable.
+
+Classes:
+EnemyEngine -- class for choosing the moves of every enemy and moving them
+"""
+
+# Own modules
+import actor
+import direction
+import junctions
+
+
+# Indices of right, down, left and up, so the last of equally good moves is the highest priority
+# This gives enemies an up-left-down-right priority
+MOVE_ORDER = (direction.Direction.right.index,
+              direction.Direction.down.index,
+              direction.Direction.left.index,
+              direction.Direction.up.index)
+
+
+class EnemyEngine(object):
+
+    """Choose the moves of every enemy in a simulation and move them.
+
+    This class applies the enemies' movement rules to every enemy of a
+    simulation.Simulation in turn, in the order of its enemies list. Dormant
+    enemies bounce off walls, frightened enemies move at random and the rest
+    take the move with the shortest path to the target given by their own
+    _get_target_position. Enemies can't reverse outside of the beetle den.
+
+    Outside of the beetle den, an enemy only chooses its move once each time
+    it enters a decision cell, or when it reverses or its frightened state
+    changes there. In any other cell it has only one way to go, which it
+    takes without looking at its target.
+
+    Public methods:
+    step -- choose the next direction of every enemy and move them
+    """
+
+    def __init__(self, simulation):
+        """Create an engine for the enemies of a simulation.
+
+        The engine uses the maze's junction graph, so the maze must already
+        have been generated.
+
+        Arguments:
+        simulation -- the simulation.Simulation whose enemies are updated
+        """
+
+        self.__simulation = simulation
+        level_maze = simulation.maze
+        self.__columns = level_maze.columns
+        self.__rows = level_maze.rows
+
+        self.__den_cells = frozenset(level_maze.get_cell_id(cell) for cell in level_maze.beetle_den.values())
+        self.__passages = level_maze.junction_graph.passages
+        self.__decision_cells = level_maze.junction_graph.decision_cells
+        self.__corridor_moves = level_maze.junction_graph.corridor_moves
+        self.__den_center = level_maze.get_cell_id(level_maze.beetle_den['center'])
+
+    def step(self):
+        """Choose the next direction of every enemy and move them.
+
+        Dead enemies retreat to the beetle den instead. This should be called
+        every tick, after the player has moved.
+        """
+
+        simulation = self.__simulation
+        level_maze = simulation.maze
+        walls = level_maze.walls
+        directions = direction.DIRECTIONS
+        passages = self.__passages
+        corridor_moves = self.__corridor_moves
+        columns = self.__columns
+        # Distance fields used this tick, keyed by target cell id
+        distance_fields = {}
+
+        for enemy in simulation.enemies:
+            if enemy.dead:
+                enemy.retreat()
+                continue
+
+            x, y = enemy.grid_position
+            cell_id = y * columns + x
+            current = enemy.current_direction.index
+
+            if enemy.dormant:
+                if walls[cell_id] >> current & 1:
+                    enemy.next_direction = directions[current ^ 2]
+                actor.Actor.move(enemy)
+                continue
+
+            if cell_id in self.__den_cells:
+                # Enemies can reverse in the den, so they choose every tick until they leave
+                enemy.decision_key = None
+            else:
+                corridor_move = corridor_moves[cell_id * 4 + current]
+                if corridor_move != junctions.NO_MOVE:
+                    enemy.next_direction = directions[corridor_move]
+                    enemy.decision_key = None
+                    actor.Actor.move(enemy)
+                    continue
+                elif cell_id in self.__decision_cells:
+                    decision_key = cell_id * 8 + current * 2 + enemy.frightened
+                    if decision_key == enemy.decision_key:
+                        # The move was chosen when the enemy entered the cell
+                        actor.Actor.move(enemy)
+                        continue
+                    enemy.decision_key = decision_key
+
+            if enemy.frightened:
+                enemy.next_direction = simulation.random.choice(
+                    [directions[index] for index in self.__get_possible_moves(cell_id, current)])
+
+            elif cell_id == self.__den_center:
+                # So that enemy leaves the beetle den
+                enemy.target_position = (x, y + 1)
+                enemy.next_direction = direction.Direction.up
+
+            else:
+                enemy.target_position = enemy._get_target_position()
+                target_id = self.__get_nearest_cell_id(enemy.target_position)
+                distances = distance_fields.get(target_id)
+                if distances is None:
+                    distances = level_maze.get_distance_field(level_maze.get_coordinates(target_id))
+                    distance_fields[target_id] = distances
+
+                best_move = None
+                for index in self.__get_possible_moves(cell_id, current):
+                    distance = distances[passages[cell_id * 4 + index]]
+                    # Later moves are higher priority, so they win ties
+                    if best_move is None or distance <= shortest_distance:
+                        best_move = index
+                        shortest_distance = distance
+                enemy.next_direction = directions[best_move]
+
+            actor.Actor.move(enemy)
+
+    def __get_possible_moves(self, cell_id, current):
+        """Return the indices of the directions an enemy in a cell is allowed to move in.
+
+        The indices are in MOVE_ORDER. An enemy can't move through walls, or
+        reverse its current direction unless it is in the beetle den.
+
+        Arguments:
+        cell_id -- the id of the cell the enemy is in
+        current -- the index of the direction the enemy is moving in
+        """
+
+        passages = self.__passages
+        base = cell_id * 4
+        reverse = current ^ 2
+        return [index for index in MOVE_ORDER
+                if passages[base + index] != junctions.NO_PASSAGE and
+                (index != reverse or cell_id in self.__den_cells)]
+
+    def __get_nearest_cell_id(self, coordinates):
+        """Return the id of the cell nearest to grid coordinates that may lie outside of the maze."""
+
+        x = min(max(int(coordinates[0]), 0), self.__columns - 1)
+        y = min(max(int(coordinates[1]), 0), self.__rows - 1)
+        return y * self.__columns + x
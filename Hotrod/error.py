@@ -1,4 +1,21 @@
 """Contain custom exceptions."""
 
 class NonExistentCellError(Exception):
-    pass
\ No newline at end of file
+    pass
+
+
+class ServerError(Exception):
+    pass
+
+
+class ServerStatusError(ServerError):
+
+    """Raised when the server responds to a request with an error status.
+
+    Attributes:
+    status -- the HTTP status code of the response
+    """
+
+    def __init__(self, path, status):
+        ServerError.__init__(self, path, 'HTTP status ' + str(status))
+        self.status = status
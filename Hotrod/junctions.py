@@ -0,0 +1,117 @@
+"""Contain a class for the graph of a maze's junctions and the corridors between them.
+
+This module contains a graph that is precomputed from a generated maze.
+Its nodes are the decision cells, which have three or more exits, and its
+edges are the corridor segments between them. An actor in a corridor only
+has one way to go, so enemies only need to choose a move when they enter a
+decision cell, and can follow the corridor everywhere else. The passages
+between neighbouring cells are also kept, for looking up moves cell by cell.
+
+Directions are stored as their index in direction.DIRECTION_TABLE, so
+the opposite of direction index i is i ^ 2.
+
+Classes:
+JunctionGraph -- class for storing a maze's decision cells and corridors
+"""
+
+# Standard python library
+import collections
+
+# Own modules
+import direction
+
+
+# Value stored in corridor_moves when a corridor cell doesn't decide the move
+NO_MOVE = -1
+# Value stored in passages for an edge that can't be moved through
+NO_PASSAGE = -1
+
+# A corridor leaving a decision cell. end is the id of the decision cell or dead end
+# it leads to, length is the number of cells moved to get there and end_direction is
+# the index of the direction the end cell is entered moving in
+Segment = collections.namedtuple('Segment', ('end', 'length', 'end_direction'))
+
+
+class JunctionGraph(object):
+
+    """Store a maze's decision cells and the corridors between them.
+
+    The graph is built from the maze's walls when it is created, so it
+    should be created after the maze has been generated. Each cell's exits
+    are its edges that are passages, so the beetle den's one-way exit is
+    respected.
+
+    Attributes:
+    passages -- list of the id of the cell through each edge of each cell, indexed by
+                cell_id * 4 + the index of the edge's direction, or NO_PASSAGE
+    exits -- list of the direction indices of each cell's exits, indexed by cell id
+    decision_cells -- frozenset of the ids of the cells with three or more exits
+    corridor_moves -- list of the direction index to move in from each cell, indexed by
+                      cell_id * 4 + the index of the direction being moved in, or NO_MOVE
+    segments -- dictionary of the Segment leaving each decision cell, keyed by
+                (cell id, direction index of the exit)
+    """
+
+    def __init__(self, level_maze):
+        """Build the graph of a generated maze.Maze."""
+
+        cell_count = level_maze.columns * level_maze.rows
+
+        self.passages = [NO_PASSAGE] * (cell_count * 4)
+        self.exits = []
+        for cell_id in range(cell_count):
+            coordinates = level_maze.get_coordinates(cell_id)
+            cell_exits = []
+            for dir in direction.DIRECTIONS:
+                adjacent_cell = level_maze.get_adjacent_coordinates(coordinates, dir)
+                if adjacent_cell is not None and not level_maze.is_wall(coordinates, dir):
+                    cell_exits.append(dir.index)
+                    self.passages[cell_id * 4 + dir.index] = level_maze.get_cell_id(adjacent_cell)
+            self.exits.append(tuple(cell_exits))
+
+        self.decision_cells = frozenset(cell_id for cell_id in range(cell_count)
+                                        if len(self.exits[cell_id]) >= 3)
+        self.corridor_moves = [NO_MOVE] * (cell_count * 4)
+        for cell_id in range(cell_count):
+            if cell_id not in self.decision_cells:
+                for index in range(4):
+                    self.corridor_moves[cell_id * 4 + index] = self.__get_corridor_move(cell_id, index)
+
+        self.segments = {}
+        for cell_id in sorted(self.decision_cells):
+            for index in self.exits[cell_id]:
+                self.segments[(cell_id, index)] = self.__follow_corridor(cell_id, index)
+
+    def __get_corridor_move(self, cell_id, current):
+        """Return the index of the only move from a corridor cell when moving in a direction, or NO_MOVE.
+
+        An actor can't reverse, so it leaves through the exit that isn't
+        behind it. If it has already turned at the cell's center, the exit
+        behind it is a wall and it carries on in its current direction.
+        """
+
+        cell_exits = self.exits[cell_id]
+        moves = [index for index in cell_exits if index != current ^ 2]
+        if len(moves) == 1:
+            return moves[0]
+        elif current in cell_exits and current ^ 2 not in cell_exits:
+            return current
+        else:
+            return NO_MOVE
+
+    def __follow_corridor(self, start, exit_direction):
+        """Return the Segment that leaves a decision cell through one of its exits."""
+
+        cell_id = self.passages[start * 4 + exit_direction]
+        current = exit_direction
+        length = 1
+        # A corridor that loops back on itself without a junction has to stop somewhere
+        while cell_id not in self.decision_cells and length <= len(self.exits):
+            move = self.corridor_moves[cell_id * 4 + current]
+            if move == NO_MOVE:
+                # A dead end
+                break
+            cell_id = self.passages[cell_id * 4 + move]
+            current = move
+            length += 1
+        return Segment(cell_id, length, current)
@@ -7,28 +7,28 @@ Classes:
 Level(Widget) -- class for generating level and storing information about the level
 """
 
-# Standard python library
-import random
-
 # Kivy modules
 from kivy.uix.widget import Widget
-from kivy.vector import Vector
+from kivy.clock import Clock
+from kivy.graphics import Color
+from kivy.graphics import InstructionGroup
+from kivy.graphics import Mesh
 from kivy.properties import ObjectProperty
 from kivy.properties import NumericProperty
 from kivy.properties import ListProperty
 
 # Own modules
-import direction
 import collectable
+import direction
 import level_cell
-import error
+import maze
 
 
-# Minimum number of cells from the edge the beetle den must be
-# Should always be greater than 1 and less than columns/2 - beetle den size
-BEETLE_DEN_PADDING_X = 1
-# Should always be greater than 1 and less than rows/2
-BEETLE_DEN_PADDING_Y = 1
+# The colour the maze's walls are drawn in
+WALL_COLOR = (0.3, 0.1, 0.1)
+# Maximum number of walls drawn by a single mesh
+# Each wall uses 4 vertices, and mesh indices cannot be greater than 65535
+MAX_WALLS_PER_MESH = 16384
 
 
 class Level(Widget):
@@ -39,8 +39,16 @@ class Level(Widget):
     level management. An array of cells is stored in this class to provide access
     to cells.
 
+    Changes to the level's size and position are coalesced into a single layout
+    update on the next frame, which is skipped if the layout has not changed.
+    The walls of every cell are drawn together by as few canvas meshes as possible,
+    and the pellets are drawn together by a collectable.PelletLayer. Both are
+    only rebuilt when the level is set up or laid out again.
+
     Public methods:
     generate_level -- start level generation process
+    place_pellets -- display the pellets of the level's simulation
+    remove_pellet -- stop displaying the pellet in a cell
     get_cell -- return the cell at the given grid coordinates
     get_adjacent_cell -- return the adjacent cell in a given direction
     convert_to_grid_position -- convert window coordinates to grid coordinates
@@ -49,9 +57,12 @@ class Level(Widget):
     Kivy Properties:
     cells -- ListProperty to keep references to level's cells
     beetle_den -- ObjectProperty to store a dictionary to keep track of beetle den
+    maze -- ObjectProperty to store the maze.Maze layout of the level
+    pellets -- ObjectProperty to store the collectable.PelletGrid that is displayed
     rows -- Number of rows the maze should have (kv file)
     columns -- Number of columns the maze should have (kv file)
     cell_size -- The size of a cell (kv file)
+    wall_thickness -- The thickness of the walls relative to the cell size (kv file)
 
     Widget Children:
     level_cell.Cell instances (after level generation)
@@ -63,20 +74,44 @@ class Level(Widget):
     # Dictionary to contain cells in the beetle den
     beetle_den = ObjectProperty()
 
+    # Data model of the maze layout that the cells are created from
+    maze = ObjectProperty()
+
+    # Pellet state of the level's simulation
+    pellets = ObjectProperty(None, allownone=True)
+
+    def __init__(self, **kwargs):
+        """Create the level and register its layout update once."""
+
+        super(Level, self).__init__(**kwargs)
+        # The position and cell size the play area was last laid out for
+        self.__layout = None
+        # A trigger only calls back once per frame, however many times it is triggered
+        self.__trigger_layout_update = Clock.create_trigger(self.__update_layout)
+        self.bind(size=self.__trigger_layout_update, pos=self.__trigger_layout_update)
+
+        # Drawn before the pellets so that pellets appear above the walls
+        self.__walls = InstructionGroup()
+        self.canvas.add(self.__walls)
+        self.__pellet_layer = collectable.PelletLayer()
+        self.canvas.add(self.__pellet_layer.instructions)
+
     def generate_level(self):
         """Generate and set up a level.
 
         This method manages the level generation process, ensuring that the
         level is generated and all play elements are added.
+        The layout is generated first, and the cell widgets are only
+        created from it once generation has finished.
         """
 
         # Ensure generation starts from an empty level
         self.__clear_level()
         self.__generate_maze()
-        self.__remove_dead_ends()
+        self.__create_cells()
         self.__create_den()
         self.__add_cells()
-        self.__add_powerups()
+        self.__draw_walls()
 
     def get_cell(self, (x, y)):
         """Return the cell at given grid coordinates.
@@ -102,13 +137,36 @@ class Level(Widget):
         direction - the direction that you want to get the adjacent cell as direction.Direction
         """
 
-        adjacent_cell_coords = Vector(*cell.coordinates) + direction.value
+        adjacent_cell_coords = (cell.coordinates_x + direction.dx, cell.coordinates_y + direction.dy)
         if self.__contains_coordinates(adjacent_cell_coords):
             adjacent_cell = self.get_cell(adjacent_cell_coords)
             return adjacent_cell
         else:
             return None
 
+    def place_pellets(self, pellets):
+        """Display the given pellets in the level's cells.
+
+        This method draws the pellets stored in the pellet state of a
+        simulation.Simulation. It should be called after the level has
+        been generated.
+
+        Arguments:
+        pellets -- the collectable.PelletGrid of the simulation
+        """
+
+        self.pellets = pellets
+        self.__pellet_layer.draw(self.pellets, self)
+
+    def remove_pellet(self, coordinates):
+        """Stop displaying the pellet in the cell at the given grid coordinates.
+
+        Arguments:
+        coordinates -- grid coordinates of the cell as a tuple
+        """
+
+        self.__pellet_layer.hide_pellet(self.maze.get_cell_id(coordinates))
+
     def convert_to_grid_position(self, (x, y)):
         """Return grid coordinates converted from window coordinates.
 
@@ -144,233 +202,41 @@ class Level(Widget):
         self.cells = [[None for i in range(self.rows)] for i in range(self.columns)]
 
     def __generate_maze(self):
-        """Procedurally generate a maze.
-
-        This method begins the process of procedurally generating a maze using the Growing Tree Algorithm
-        (described here http://weblog.jamisbuck.org/2011/1/27/maze-generation-growing-tree-algorithm)
-        The cell to start generation from is chosen randomly, before beginning the full maze generation process.
-        I have implemented this algorithm in the past using the tutorial below, so referred to that at some points:
-        http://catlikecoding.com/unity/tutorials/maze/
-        """
-
-        # List of active cells used in generation algorithm
-        active_cells = []
-        # Pick the first cell to begin generation from randomly
-        first_cell_coordinates = self.__get_random_coordinates()
-        active_cells.append(self.__create_cell(first_cell_coordinates))
-
-        # Keep generating until no cells remain
-        while len(active_cells) > 0:
-            self.__generate_cells(active_cells)
-
-    def __generate_cells(self, active_cells):
-        """Generate the cells for the maze.
-
-        This method generates the cells for the maze using the Growing Tree Algorithm,
-        storing the information about them in self.cells. Widgets are not added at this stage.
-
-        Arguments:
-        active_cells -- list of active cells. It should contain the starting cell as a level_cell.Cell.
-        """
-
-        # Determines which index the algorithm generates from. Changing this yields different results.
-        current_index = len(active_cells) - 1         # This generates from last index
-        current_cell = active_cells[current_index]
-
-        if current_cell.all_edges_initialised():
-            # Remove fully initialised cells from the list so that they are not revisited
-            del active_cells[current_index]
-            return
-
-        direction = current_cell.get_random_uninitialised_direction()
-        # Not using self.get_adjacent_cell as only coordinates are needed here
-        next_cell_coords = Vector(*current_cell.coordinates) + direction.value
-
-        if self.__contains_coordinates(next_cell_coords):
-            next_cell = self.get_cell(next_cell_coords)
-            if next_cell == None:
-                # Create a new cell and set the relevant edges to passages if no cell exists at next_cell_coords
-                next_cell = self.__create_cell(next_cell_coords)
-                current_cell.get_edge(direction).type = level_cell.CellEdgeType.passage
-                # Set corresponding edge of the other cell to a passage too, otherwise it will later become a wall
-                next_cell.get_edge(direction.get_opposite()).type = level_cell.CellEdgeType.passage
-                active_cells.append(next_cell)
-
-            else:
-                # If a cell exists at next_cell_coords, set the relevant edges to walls
-                current_cell.get_edge(direction).type = level_cell.CellEdgeType.wall
-                next_cell.get_edge(direction.get_opposite()).type = level_cell.CellEdgeType.wall
-
-        # If next_cell_coords is outside the level boundaries, set the edge to a wall
-        else:
-            current_cell.get_edge(direction).type = level_cell.CellEdgeType.wall
-
-    def __remove_dead_ends(self):
-        """Ensure that there are no single-cell dead ends.
-
-        This method removes any single-cell dead ends by selecting a
-        random wall to remove. This should be done after all other methods
-        that affect the maze layout have been executed.
-        Dead ends are removed to prevent the game from being impossibly hard,
-        and to accommodate enemies being forbidden to reverse direction.
-        """
+        """Procedurally generate the layout of the maze.
 
-        for column in self.cells:
-            for cell in column:
-                walls = cell.get_walls()
-                # A cell is a dead end if all sides are walls except for one
-                if len(walls) >= cell.sides - 1:
-                    # Choose a random wall to be removed and attempt to remove it
-                    target_edge = random.choice(walls)
-                    while True:
-                        try:
-                            self.__set_edge_to_passage(cell, target_edge.direction)
-                            break
-                        except error.NonExistentCellError:
-                            # If the wall is at the edge, remove it from the list of walls
-                            walls.remove(target_edge)
-                            target_edge = random.choice(walls)
-
-    def __set_edge_to_passage(self, cell, direction):
-        """Change a given edge of a cell to a passage.
-
-        This method sets a cell edge type of a given cell in a given direction
-        to a passage, and also sets the corresponding edge in the adjacent cell to a passage.
-        Note that edges at the edge of the level cannot be changed into passages.
-
-        Arguments:
-        cell - the level_cell.Cell whose edge will be changed
-        direction - the direction of the edge to be changed as a direction.Direction
+        This method generates the maze layout as a maze.Maze data model.
+        No widgets are created at this stage, so generation time depends
+        only on the size of the grid. The distance fields used by the enemies
+        are computed once the layout is complete.
         """
 
-        edge = cell.get_edge(direction)
-        adjacent_cell = self.get_adjacent_cell(cell, direction)
-
-        if adjacent_cell != None:
-            opposite_edge = adjacent_cell.get_edge(direction.get_opposite())
-            opposite_edge.type = level_cell.CellEdgeType.passage
-            edge.type = level_cell.CellEdgeType.passage
-        else:
-            # Cell can only be set to passage if there is an adjacent cell
-            raise error.NonExistentCellError("There is no adjacent cell.")
-
-    def __set_edge_to_wall(self, cell, direction):
-        """Change a given edge of a cell to a passage.
-
-        This method sets a cell edge type of a given cell in a given direction
-        to a wall, and also sets the corresponding edge in the adjacent cell to a wall.
+        self.maze = maze.Maze(self.columns, self.rows)
+        self.maze.generate()
+        self.maze.precompute_distance_fields()
 
-        Arguments:
-        cell - the level_cell.Cell whose edge will be changed
-        direction - the direction of the edge to be changed as a direction.Direction
-        """
+    def __create_cells(self):
+        """Create a level_cell.Cell for every cell in the maze layout."""
 
-        edge = cell.get_edge(direction)
-        edge.type = level_cell.CellEdgeType.wall
-        adjacent_cell = self.get_adjacent_cell(cell, direction)
-
-        # Also set relevant edge of adjacent cell if it exists
-        if adjacent_cell != None:
-            opposite_edge = adjacent_cell.get_edge(direction.get_opposite())
-            opposite_edge.type = level_cell.CellEdgeType.wall
-
-    def __set_cell_edges(self, cell, directions):
-        """Set all edges of a cell as desired.
-
-        This method sets the edges of the given cell in the given directions to walls.
-        All remaining edges are set to passages.
-
-        Arguments:
-        cell - the level_cell.Cell whose edges will be changed
-        directions - tuple of direction.Direction specifying where walls should be
-        """
-
-        for edge in cell.edges:
-            if edge.direction in directions:
-                self.__set_edge_to_wall(cell, edge.direction)
-            else:
-                self.__set_edge_to_passage(cell, edge.direction)
+        for x in range(self.columns):
+            for y in range(self.rows):
+                self.__create_cell((x, y))
 
     def __create_den(self):
-        """Create a den area that enemies will come from.
+        """Store references to the cells that make up the beetle den.
 
-        This method creates a den area that will serve as the base for
-        enemy beetles. The den placement is random, and based on the
-        position of its center cell.
+        This method fills the beetle den dictionary with the cells at the
+        den coordinates chosen during maze generation.
         """
 
         self.beetle_den = {}
-
-        center_coords = self.__get_den_center()
-
-        center_cell = self.get_cell(center_coords)
-        left_cell = self.get_adjacent_cell(center_cell, direction.Direction.left)
-        right_cell = self.get_adjacent_cell(center_cell, direction.Direction.right)
-
-        self.beetle_den['center'] = center_cell
-        self.beetle_den['left'] = left_cell
-        self.beetle_den['right'] = right_cell
-
-        self.__initialise_den_edges()
-        self.__remove_walls_around_den()
-
-    def __get_den_center(self):
-        """Choose random grid coordinates for the center of the den area."""
-
-        # +/- 1 on each x coord to account for cell on either side of center
-        den_center_coords = (random.randrange(BEETLE_DEN_PADDING_X + 1, self.columns - BEETLE_DEN_PADDING_X - 1),
-                             random.randrange(BEETLE_DEN_PADDING_Y, self.rows - BEETLE_DEN_PADDING_Y))
-        return den_center_coords
-
-    def __initialise_den_edges(self):
-        """Set the edges of the beetle den correctly.
-
-        This method ensures that the edges of the beetle den are set up correctly.
-        The beetle den is enclosed with a one-way exit at the top of the center cell.
-        """
-
-        den_center = self.beetle_den['center']
-
-        self.__set_cell_edges(den_center, (direction.Direction.down, direction.Direction.up))
-        self.__set_cell_edges(self.beetle_den['left'], (direction.Direction.up, direction.Direction.down, direction.Direction.left))
-        self.__set_cell_edges(self.beetle_den['right'], (direction.Direction.up, direction.Direction.down, direction.Direction.right))
-
-        # Manually set top edge of den_center in order to create one-way passage
-        den_center.get_edge(direction.Direction.up).type = level_cell.CellEdgeType.passage
-
-    def __remove_walls_around_den(self):
-        """Ensure that there is a clear passage around the den.
-
-        This method ensures that there is a clear passage around the circumference
-        of the enemy den. This is both to guarantee there are no dead ends around it,
-        and reduce difficulty by allowing the player to move freely when near the enemy den.
-        """
-
-        for cell in self.beetle_den.itervalues():
-            # Couldn't use direction as variable name as that is module name
-            for dir in direction.Direction:
-                adjacent_cell = self.get_adjacent_cell(cell, dir)
-
-                if adjacent_cell not in self.beetle_den.itervalues():
-                    if dir == direction.Direction.up or dir == direction.Direction.down:
-                        for edge_dir in direction.Direction.left, direction.Direction.right:
-                            try:
-                                self.__set_edge_to_passage(adjacent_cell, edge_dir)
-                            except error.NonExistentCellError:
-                                pass
-
-                    if dir == direction.Direction.left or dir == direction.Direction.right:
-                        for edge_dir in direction.Direction.down, direction.Direction.up:
-                            try:
-                                self.__set_edge_to_passage(adjacent_cell, edge_dir)
-                            except error.NonExistentCellError:
-                                pass
+        for key, coordinates in self.maze.beetle_den.items():
+            self.beetle_den[key] = self.get_cell(coordinates)
 
     def __create_cell(self, (x, y)):
         """Create a Cell at provided grid coordinates.
 
         This method adds a level_cell.Cell widget to the array of cells
-        and sets up its properties and bindings.
+        and sets up its properties, laying it out for the level's current size.
         Note that the widget is not added to the level widget at this stage.
 
         Arguments:
@@ -378,8 +244,6 @@ class Level(Widget):
         """
 
         cell = level_cell.Cell()
-        # Bind here so that cells are created before event can be triggered
-        self.bind(size=self.game.play_area.update_play_area_size, pos=self.game.play_area.update_play_area_size)
         cell.size = self.cell_size
         cell.pos = self.convert_to_window_position((x, y))
         cell.coordinates = x, y
@@ -387,42 +251,85 @@ class Level(Widget):
         return cell
 
     def __add_cells(self):
-        """Perform final steps in cell-setup and add them as widgets.
+        """Add the cells as widgets.
 
-        This method performs the final steps of cell creation, namely
-        ensuring they have pellets and adding them as child widgets.
+        This method performs the final step of cell creation, namely
+        adding them as child widgets.
         """
 
         for column in self.cells:
-             for cell in column:
-                 self.add_widget(cell)
-                 cell.initialise_pellets()
+            for cell in column:
+                self.add_widget(cell)
 
-    def __add_powerups(self):
-        """Add powerups to random cells.
+    def __draw_walls(self):
+        """Draw the walls of the maze.
 
-        This method chooses cells to add powerups to randomly
-        until the game's maximum powerup limit has been reached.
+        This method replaces the canvas instructions for the walls with
+        meshes containing a rectangle for every wall in the maze layout.
+        Walls overlap at the outside of corners, so that corners are filled in.
+        It should be called after generation and whenever the layout changes.
         """
 
-        # Start counting from 0
-        powerup_count = 0
-        while powerup_count < self.game.powerup_limit:
-            coordinates = self.__get_random_coordinates()
-            cell = self.get_cell(coordinates)
-            if cell.pellet_exists and cell.pellet.type is not collectable.PelletType.power:
-                cell.add_power_pellet()
-                powerup_count += 1
+        self.__walls.clear()
+        if self.maze is None:
+            return
+        self.__walls.add(Color(*WALL_COLOR))
+
+        wall_rectangles = self.__get_wall_rectangles()
+        vertices = []
+        indices = []
+        for cell_id in range(self.columns * self.rows):
+            cell_walls = self.maze.walls[cell_id]
+            if not cell_walls:
+                continue
+
+            x, y = self.maze.get_coordinates(cell_id)
+            for dir, (left, bottom, right, top) in wall_rectangles:
+                if cell_walls & dir.bit:
+                    first_vertex = len(vertices) // 4
+                    # Each vertex is x, y, u, v, and textures aren't used
+                    for corner in ((left, bottom), (right, bottom), (right, top), (left, top)):
+                        window_x, window_y = self.convert_to_window_position((x + corner[0], y + corner[1]))
+                        vertices.extend((window_x, window_y, 0, 0))
+                    indices.extend((first_vertex, first_vertex + 1, first_vertex + 2,
+                                    first_vertex + 2, first_vertex + 3, first_vertex))
+
+                    if first_vertex + 4 == MAX_WALLS_PER_MESH * 4:
+                        self.__walls.add(Mesh(vertices=vertices, indices=indices, mode='triangles'))
+                        vertices = []
+                        indices = []
+
+        if indices:
+            self.__walls.add(Mesh(vertices=vertices, indices=indices, mode='triangles'))
+
+    def __get_wall_rectangles(self):
+        """Return the rectangle each side's wall covers relative to its cell.
+
+        This method returns a list of pairs of a direction.Direction and the
+        (left, bottom, right, top) bounds of the wall on that side, in grid units
+        relative to the bottom left corner of the cell.
+        """
 
-    def __get_random_direction(self):
-        """Return a random direction.Direction"""
+        thickness = self.wall_thickness
+        return [(direction.Direction.left, (0, -thickness, thickness, 1 + thickness)),
+                (direction.Direction.down, (-thickness, 0, 1 + thickness, thickness)),
+                (direction.Direction.right, (1 - thickness, -thickness, 1, 1 + thickness)),
+                (direction.Direction.up, (-thickness, 1 - thickness, 1 + thickness, 1))]
 
-        return random.choice(list(direction.Direction))
+    def __update_layout(self, dt):
+        """Lay out the play area if the level's position or cell size has changed.
 
-    def __get_random_coordinates(self):
-        """Return a random grid coordinate tuple"""
+        This method is called by a Clock trigger on the frame after the level's
+        size or position changes, so a burst of changes results in one update.
+        """
 
-        return (random.randrange(self.columns), random.randrange(self.rows))
+        layout = (tuple(self.pos), tuple(self.cell_size))
+        if layout != self.__layout:
+            self.__layout = layout
+            self.__draw_walls()
+            if self.pellets is not None:
+                self.__pellet_layer.draw(self.pellets, self)
+            self.game.play_area.update_play_area_size()
 
     def __contains_coordinates(self, (x, y)):
         """Check if the level grid contains the given coordinates.
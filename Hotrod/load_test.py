@@ -0,0 +1,385 @@
+"""Load test the score server with simulated game over traffic.
+
+This file contains a load generator that plays out what many players'
+games do to the score server: each simulated player logs in, then for
+every game finished fetches their best score on the level, submits or
+updates their score, and fetches the level's high scores. The players run
+concurrently on one asyncio event loop, each over its own keep-alive
+connection, and the latency, throughput and error rate of each endpoint
+are reported. Running this file will run a load test, for example:
+
+python load_test.py --url http://127.0.0.1:8130 --players 1000 --games 5
+python load_test.py --local --players 200 --combined --output results.json
+
+--local starts a score_server in this process, which shares the process
+with the load generator, so its numbers are only for comparing changes.
+A local run also fails if any endpoint's median latency reaches
+MAX_LOCAL_MEDIAN, which would mean the responses are waiting on TCP's
+delayed acknowledgements rather than on the server. The load generator
+needs Python 3.
+
+Classes:
+Connection -- class for sending requests over a keep-alive connection
+LoadTest -- class for running the simulated players and recording their requests
+"""
+
+# Standard Python libraries
+import argparse
+import asyncio
+import collections
+import json
+import random
+import sys
+import time
+from urllib.parse import urlencode, urlsplit
+
+# Own modules
+import score_server
+import server
+
+
+# Number of players playing at the same time
+DEFAULT_PLAYERS = 100
+# Number of games each player finishes
+DEFAULT_GAMES = 5
+# Mean number of seconds a player waits between games, so they don't all finish at once
+DEFAULT_THINK_TIME = 0.5
+# Chance of a player reaching the next level, so that early levels get most of the traffic
+LEVEL_UP_CHANCE = 0.4
+# The highest level a simulated game ends on
+MAX_LEVEL = 20
+# Number of seconds to wait for a response before it counts as an error
+REQUEST_TIMEOUT = 10
+# Percentiles of the latency that are reported
+PERCENTILES = (50, 95, 99)
+# The most seconds a local server's median latency can be, well under the 40ms that
+# TCP delayed acknowledgements add if Nagle's algorithm holds back part of a response
+MAX_LOCAL_MEDIAN = 0.01
+
+
+class Connection(object):
+
+    """Send requests over a keep-alive HTTP/1.1 connection.
+
+    The connection is opened when the first request is sent, and opened
+    again if the server closes it. IOError or ValueError is raised if a
+    request fails or its response can't be read.
+
+    Public methods:
+    request -- send a request and return the decoded response
+    close -- close the connection
+    """
+
+    def __init__(self, base_url):
+        """Create a connection to a server.
+
+        Arguments:
+        base_url -- the address of the server
+        """
+
+        address = urlsplit(base_url)
+        self.__host = address.hostname
+        self.__port = address.port or 80
+        self.__path = address.path.rstrip('/')
+        self.__reader = None
+        self.__writer = None
+
+    async def request(self, endpoint, parameters, body=None):
+        """Send a request to an endpoint and return the response decoded from JSON.
+
+        Arguments:
+        endpoint -- the name of the server script, such as 'getscores.py'
+        parameters -- dictionary of the query string parameters
+        body -- string to POST as the body of the request, or None to GET
+        """
+
+        path = self.__path + '/' + endpoint
+        if parameters:
+            path = path + '?' + urlencode(sorted(parameters.items()))
+        if self.__writer is None:
+            self.__reader, self.__writer = await asyncio.open_connection(self.__host, self.__port)
+
+        data = (body or '').encode('utf-8')
+        head = ['%s %s HTTP/1.1' % ('GET' if body is None else 'POST', path),
+                'Host: %s' % self.__host,
+                'Content-Length: %d' % len(data)]
+        if body is not None:
+            head.append('Content-Type: application/x-ndjson')
+        self.__writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('ascii') + data)
+
+        try:
+            status, response = await self.__read_response()
+        except (IOError, ValueError):
+            self.close()
+            raise
+        if status != 200:
+            raise IOError('HTTP status ' + str(status))
+        return json.loads(response.decode('utf-8'))
+
+    def close(self):
+        """Close the connection."""
+
+        if self.__writer is not None:
+            self.__writer.close()
+        self.__reader = None
+        self.__writer = None
+
+    async def __read_response(self):
+        """Read a response and return its status and body.
+
+        A response that is malformed or cut short raises ValueError.
+        """
+
+        status_line = await self.__reader.readline()
+        if not status_line:
+            raise IOError('connection closed by server')
+        status_fields = status_line.split()
+        if len(status_fields) < 2:
+            raise ValueError('malformed status line: %r' % status_line)
+        status = int(status_fields[1])
+
+        headers = {}
+        while True:
+            line = (await self.__reader.readline()).decode('latin-1').strip()
+            if not line:
+                break
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+
+        if 'content-length' in headers:
+            try:
+                body = await self.__reader.readexactly(int(headers['content-length']))
+            except asyncio.IncompleteReadError as read_error:
+                raise ValueError('response body cut short after %d bytes' % len(read_error.partial))
+        else:
+            # Without a length, the body lasts until the server closes the connection
+            body = await self.__reader.read()
+        if headers.get('connection', '').lower() == 'close' or 'content-length' not in headers:
+            self.close()
+        return status, body
+
+
+class LoadTest(object):
+
+    """Run simulated players against a server and record their requests.
+
+    Public methods:
+    run -- run the players and return the results
+
+    Attributes:
+    latencies -- dictionary of lists of the seconds each successful request took, keyed by endpoint
+    errors -- Counter of the failed requests, keyed by endpoint
+    """
+
+    def __init__(self, base_url, players, games, think_time, combined, seed):
+        """Create a load test.
+
+        Arguments:
+        base_url -- the address of the server
+        players -- the number of players playing at the same time
+        games -- the number of games each player finishes
+        think_time -- the mean number of seconds a player waits between games
+        combined -- whether scores are submitted with the single submitbest.py request
+        seed -- seed for the players' levels, scores and waits
+        """
+
+        self.latencies = collections.defaultdict(list)
+        self.errors = collections.Counter()
+        self.__base_url = base_url
+        self.__players = players
+        self.__games = games
+        self.__think_time = think_time
+        self.__combined = combined
+        self.__random = random.Random(seed)
+
+    def run(self):
+        """Run the players until they have all finished, and return the results."""
+
+        start_time = time.time()
+        asyncio.run(self.__run_players())
+        return summarise(self.latencies, self.errors, time.time() - start_time)
+
+    async def __run_players(self):
+        """Run every player at the same time."""
+
+        # Each run gets its own names, even with the same seed, so that new players are added every time
+        prefix = '%x' % random.getrandbits(32)
+        await asyncio.gather(*[self.__play(prefix + str(number)) for number in range(self.__players)])
+
+    async def __play(self, player):
+        """Log a player in and finish their games, as the game does."""
+
+        connection = Connection(self.__base_url)
+        try:
+            # Players arrive over the first second rather than all at once
+            await asyncio.sleep(self.__random.random())
+            if await self.__call(connection, 'adduser.py', {'player': player}) is None:
+                return
+            # As they would when they come back to the game later
+            await self.__call(connection, 'getuser.py', {'player': player})
+
+            for game in range(self.__games):
+                await asyncio.sleep(self.__random.expovariate(1.0 / self.__think_time)
+                                    if self.__think_time > 0 else 0)
+                level, score = self.__play_game()
+                if self.__combined:
+                    await self.__call(connection, 'submitbest.py',
+                                      {'player': player, 'level': level, 'score': score})
+                else:
+                    await self.__submit_separately(connection, player, level, score)
+        finally:
+            connection.close()
+
+    async def __submit_separately(self, connection, player, level, score):
+        """Submit a score the way the game did before submitbest.py existed."""
+
+        parameters = {'player': player, 'level': level}
+        best = await self.__call(connection, 'getbest.py', parameters)
+        parameters['score'] = score
+        if best is None:
+            await self.__call(connection, 'submitscore.py', parameters)
+        elif score > best:
+            await self.__call(connection, 'updatescore.py', parameters)
+        await self.__call(connection, 'getscores.py', {'level': level})
+
+    def __play_game(self):
+        """Return the level a game ended on and its score."""
+
+        level = 1
+        while level < MAX_LEVEL and self.__random.random() < LEVEL_UP_CHANCE:
+            level += 1
+        return level, self.__random.randint(0, 1000 * level)
+
+    async def __call(self, connection, endpoint, parameters):
+        """Send a request and record how long it took, returning None if it failed."""
+
+        start_time = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(connection.request(endpoint, parameters), REQUEST_TIMEOUT)
+        except (IOError, ValueError, asyncio.TimeoutError):
+            connection.close()
+            self.errors[endpoint] += 1
+            return None
+        self.latencies[endpoint].append(time.perf_counter() - start_time)
+        return result
+
+
+def percentile(sorted_values, percent):
+    """Return the nearest-rank percentile of a sorted list of values."""
+
+    rank = max(int(round(percent / 100.0 * len(sorted_values))), 1)
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarise(latencies, errors, elapsed_time):
+    """Return a dictionary of the results of each endpoint and of all of them.
+
+    Arguments:
+    latencies -- dictionary of lists of the seconds each successful request took, keyed by endpoint
+    errors -- Counter of the failed requests, keyed by endpoint
+    elapsed_time -- the real time in seconds the load test took
+    """
+
+    endpoints = {}
+    for endpoint in sorted(set(latencies) | set(errors)):
+        times = sorted(latencies.get(endpoint, []))
+        requests = len(times) + errors[endpoint]
+        result = {'requests': requests,
+                  'errors': errors[endpoint],
+                  'error_rate': float(errors[endpoint]) / requests,
+                  'throughput': requests / elapsed_time}
+        for percent in PERCENTILES:
+            result['p%d' % percent] = percentile(times, percent) if times else None
+        endpoints[endpoint] = result
+
+    total_requests = sum(result['requests'] for result in endpoints.values())
+    total_errors = sum(errors.values())
+    return {'elapsed_time': elapsed_time,
+            'requests': total_requests,
+            'errors': total_errors,
+            'throughput': total_requests / elapsed_time,
+            'endpoints': endpoints}
+
+
+def format_results(results):
+    """Return a list of lines describing the results as a table."""
+
+    lines = ['%-16s %9s %9s %9s %9s %9s %8s' % ('endpoint', 'requests', 'req/s', 'p50 ms', 'p95 ms', 'p99 ms',
+                                                 'errors')]
+    for endpoint, result in sorted(results['endpoints'].items()):
+        latencies = ['%9.1f' % (result['p%d' % percent] * 1000) if result['p%d' % percent] is not None
+                     else '%9s' % '-' for percent in PERCENTILES]
+        lines.append('%-16s %9d %9.1f %s %7.2f%%' % (endpoint, result['requests'], result['throughput'],
+                                                     ' '.join(latencies), result['error_rate'] * 100))
+    lines.append('total: %d requests in %.1fs (%.1f requests/s), %d errors' %
+                 (results['requests'], results['elapsed_time'], results['throughput'], results['errors']))
+    return lines
+
+
+def get_slow_endpoints(results, max_median=MAX_LOCAL_MEDIAN):
+    """Return a sorted list of the endpoints whose median latency is at least max_median seconds.
+
+    Arguments:
+    results -- the results returned by LoadTest.run
+    max_median -- the number of seconds the median latency must be under
+    """
+
+    return sorted(endpoint for endpoint, result in results['endpoints'].items()
+                  if result['p50'] is not None and result['p50'] >= max_median)
+
+
+def parse_arguments(arguments):
+    """Return the parsed command line arguments."""
+
+    parser = argparse.ArgumentParser(description="Load test the Hotrod the Beetle score server.")
+    parser.add_argument('--url', default=server.BASE_URL, help="address of the server (default: %(default)s)")
+    parser.add_argument('--local', action='store_true',
+                        help="start a local score_server in this process and test it instead")
+    parser.add_argument('--players', type=int, default=DEFAULT_PLAYERS, help="number of players at once")
+    parser.add_argument('--games', type=int, default=DEFAULT_GAMES, help="number of games each player finishes")
+    parser.add_argument('--think-time', type=float, default=DEFAULT_THINK_TIME,
+                        help="mean number of seconds between a player's games")
+    parser.add_argument('--combined', action='store_true',
+                        help="submit with submitbest.py instead of getbest, submit/update and getscores")
+    parser.add_argument('--seed', type=int, default=0, help="seed for the players' levels and scores")
+    parser.add_argument('--output', help="file to write the JSON results to")
+    return parser.parse_args(arguments)
+
+
+def main(arguments):
+    """Run a load test from the command line and print a summary.
+
+    The exit status is 1 if any request failed, or if a local server's
+    median latency was too high for an endpoint.
+    """
+
+    options = parse_arguments(arguments)
+    local_server = None
+    base_url = options.url
+    if options.local:
+        local_server = score_server.start_server()
+        base_url = local_server.get_base_url()
+
+    try:
+        results = LoadTest(base_url, options.players, options.games, options.think_time,
+                           options.combined, options.seed).run()
+    finally:
+        if local_server is not None:
+            local_server.shutdown()
+
+    for line in format_results(results):
+        print(line)
+    if options.output:
+        with open(options.output, 'w') as output_file:
+            json.dump(results, output_file, indent=2, sort_keys=True)
+            output_file.write('\n')
+
+    slow_endpoints = get_slow_endpoints(results) if options.local else []
+    for endpoint in slow_endpoints:
+        sys.stderr.write('%s: median latency %.1fms is not under %.1fms\n' %
+                         (endpoint, results['endpoints'][endpoint]['p50'] * 1000, MAX_LOCAL_MEDIAN * 1000))
+    return 1 if results['errors'] or slow_endpoints else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,207 @@
+"""Contain a client for logging players in.
+
+This module contains a client that adds new players and logs existing
+players in through the server. Identical logins that are already in flight
+are shared rather than sent again, each attempt has a short timeout and
+failed attempts are retried. The last player to log in successfully is
+remembered in a file, so that they can log in again without contacting the
+server at all.
+
+Classes:
+LoginClient -- class for logging players in
+"""
+
+# Standard python libraries
+import json
+import threading
+
+# Own modules
+import server
+
+
+# Number of seconds to wait for the server on each attempt to log in
+LOGIN_TIMEOUT = 5
+# Number of times a failed login is tried again before giving up
+LOGIN_RETRIES = 2
+# Number of seconds to wait before the first retry, doubled for each one after
+RETRY_DELAY = 1
+
+
+class LoginClient(object):
+
+    """Log players in through the server.
+
+    A login for a player that is the same as one already in flight gets
+    the same result as it, rather than sending another request. If a login
+    can't reach the server within LOGIN_TIMEOUT seconds, it is tried again
+    up to LOGIN_RETRIES times. The callbacks are called on the thread that
+    the server module passes results to.
+
+    Public methods:
+    add_user -- add a new player
+    get_user -- log an existing player in
+    load -- load the last player to log in from the player file
+
+    Attributes:
+    last_player -- the name of the last player to log in, or None
+    path -- the file the last player is saved to, or None to keep them in memory
+    """
+
+    def __init__(self, path=None):
+        """Create a login client.
+
+        Arguments:
+        path -- the file the last player is saved to, or None to keep them in memory
+        """
+
+        self.last_player = None
+        self.path = path
+        self.__lock = threading.Lock()
+        # Callbacks waiting on each (endpoint, player) login that is in flight
+        self.__in_flight = {}
+
+    def add_user(self, player, on_success, on_failure=None):
+        """Add a new player and log them in.
+
+        The player's name is passed to on_success if they were added, or None
+        if the name is taken. The error.ServerError of the last attempt is
+        passed to on_failure if the server can't be reached.
+
+        Arguments:
+        player -- the name of the player as a string
+        on_success -- function to call with the player's name or None
+        on_failure -- function to call with the error if every attempt fails
+        """
+
+        self.__log_in(server.add_user, player, on_success, on_failure)
+
+    def get_user(self, player, on_success, on_failure=None):
+        """Log an existing player in.
+
+        The player's name is passed to on_success if they exist, or None if
+        they don't. If they are the last player to log in, their name is passed
+        to on_success straight away without contacting the server. The
+        error.ServerError of the last attempt is passed to on_failure if the
+        server can't be reached.
+
+        Arguments:
+        player -- the name of the player as a string
+        on_success -- function to call with the player's name or None
+        on_failure -- function to call with the error if every attempt fails
+        """
+
+        if player and player == self.last_player:
+            on_success(player)
+        else:
+            self.__log_in(server.get_user, player, on_success, on_failure)
+
+    def load(self):
+        """Load the last player to log in from the player file, if it has one and it can be read."""
+
+        if self.path is None:
+            return
+        try:
+            with open(self.path) as player_file:
+                self.last_player = json.load(player_file)['player']
+        except (IOError, OSError, ValueError, KeyError, TypeError):
+            pass
+
+    def __log_in(self, send, player, on_success, on_failure):
+        """Send a login, unless the same one is already in flight."""
+
+        key = (send, player)
+        with self.__lock:
+            waiting = self.__in_flight.get(key)
+            self.__in_flight.setdefault(key, []).append((on_success, on_failure))
+            if waiting is not None:
+                return
+        self.__attempt(send, player, 0)
+
+    def __attempt(self, send, player, retries):
+        """Make an attempt at a login that has been tried the given number of times before."""
+
+        def succeed(name):
+            if name is None and retries > 0 and send is server.add_user:
+                # An attempt that timed out may have added the player before the response was lost
+                self.__log_in_existing_instead(player)
+            else:
+                self.__finish(send, player, name, None)
+
+        def fail(server_error):
+            if retries < LOGIN_RETRIES:
+                retry = threading.Timer(RETRY_DELAY * 2 ** retries, self.__attempt, (send, player, retries + 1))
+                # A pending retry shouldn't stop the app from closing
+                retry.daemon = True
+                retry.start()
+            else:
+                self.__finish(send, player, None, server_error)
+
+        send(player, succeed, fail, timeout=LOGIN_TIMEOUT)
+
+    def __log_in_existing_instead(self, player):
+        """Move the callbacks waiting on adding a player to logging them in as an existing player."""
+
+        with self.__lock:
+            waiting = self.__in_flight.pop((server.add_user, player), [])
+            in_flight = (server.get_user, player) in self.__in_flight
+            self.__in_flight.setdefault((server.get_user, player), []).extend(waiting)
+        if not in_flight:
+            self.__attempt(server.get_user, player, 0)
+
+    def __finish(self, send, player, name, server_error):
+        """Pass a login's result to the callbacks waiting on it, remembering the player if it succeeded."""
+
+        with self.__lock:
+            waiting = self.__in_flight.pop((send, player), [])
+        if name is not None:
+            self.last_player = name
+            self.__save()
+
+        for on_success, on_failure in waiting:
+            if server_error is None:
+                on_success(name)
+            elif on_failure is not None:
+                on_failure(server_error)
+
+    def __save(self):
+        """Save the last player to the player file, if there is one."""
+
+        if self.path is None:
+            return
+        try:
+            with open(self.path, 'w') as player_file:
+                json.dump({'player': self.last_player}, player_file)
+        except (IOError, OSError):
+            # The player only has to log in through the server again next time
+            pass
+
+
+# The client shared by the module's functions, created when it is first used
+_client = None
+
+
+def get_login_client():
+    """Return the LoginClient that the module's functions use."""
+
+    global _client
+    if _client is None:
+        _client = LoginClient()
+    return _client
+
+
+def set_player_file(path):
+    """Save the last player to log in to a file, and load the one already saved in it.
+
+    Arguments:
+    path -- the file to keep the player in, such as one in the app's user data directory
+    """
+
+    client = get_login_client()
+    client.path = path
+    client.load()
+
+
+def get_last_player():
+    """Return the name of the last player to log in, or None."""
+
+    return get_login_client().last_player
@@ -10,7 +10,6 @@ PlayArea(Widget) -- widget for the gameplay area
 """
 
 # Standard Python libraries
-import json
 import random
 import os
 import sys
@@ -27,85 +26,67 @@ from kivy.vector import Vector
 from kivy.clock import Clock
 from kivy.config import Config
 from kivy.core.audio import SoundLoader
-from kivy.core.audio.audio_sdl2 import SoundSDL2
-from kivy.network.urlrequest import UrlRequest
 
 # Own modules
+import audio
 import direction
 import level
 import level_cell
+import login
 import character
+import difficulty
+import score_queue
 import server
+import simulation
+import sprites
 import user_interface
 
 
-# Number of frames per second the game should run at
+# Number of frames per second the game should be rendered at
 FPS = 60
 # The relative location of the game's sound files
 SOUND_DIRECTORY = "sound"
+# The sounds loaded first in the background, as they are needed soonest
+SOUND_LOAD_ORDER = ('title', 'jingle', 'chomp_low', 'chomp_high', 'death')
+# The name of the file in the app's user data directory that caches high scores
+HIGH_SCORE_CACHE_FILE = "high_scores.json"
+# The name of the file in the app's user data directory that journals unsubmitted scores
+SCORE_JOURNAL_FILE = "score_queue.jsonl"
+# The name of the file in the app's user data directory that remembers the last player
+PLAYER_FILE = "player.json"
 
-# The values specified below were chosen to tune the game's difficulty
+# The values that tune the game's difficulty are stored in the difficulty module
 
 # These are initial values generic properties that the game keeps track of
-# Number of lives the player starts with
-INITIAL_LIVES = 3
 # The initial score the player starts with
 INITIAL_SCORE = 0
 # The level number of the initial level
 INITIAL_LEVEL = 1
 
-# These are initial values of properties that modify the games's difficulty/rewards
-# The points that kills add on the first level
-INITIAL_KILL_VALUE = 100
-# The points that pellets add on the first level
-INITIAL_PELLET_VALUE = 10
-# The number of powerups spawned on the first level
-INITIAL_POWERUP_LIMIT = 6
-# The length of time in seconds powerups last on the first level
-INITIAL_POWERUP_TIME = 10
-# The number of consecutive seconds enemies target the player for
-INITIAL_CHASE_TIME = 15
-# The number of consecutive seconds enemies stop targeting the player
-INITIAL_SCATTER_TIME = 7
-# The movement speed of characters on the first level
-INITIAL_SPEED_MULTIPLIER = 1
-
-# These are the adjustments applied to the respective property when the level advances
-LIVES_BONUS = 1
-SPEED_INCREMENT = 0.1
-CHASE_INCREMENT = 1
-PELLET_VALUE_INCREMENT = 10
-KILL_VALUE_INCREMENT = 100
-SCATTER_DECREMENT = -1
-POWERUP_TIME_DECREMENT = -1
-POWERUP_LIMIT_DECREMENT = -1
-
-# These are the maximum/minimum values the adjusted properties can take
-MAX_SPEED_MULTIPLIER = 2
-MAX_PELLET_VALUE = 100
-MIN_SCATTER_LENGTH = 0
-MIN_POWERUP_LENGTH = 0
-MIN_POWERUP_LIMIT = 0
-
 
 class PlayArea(Widget):
 
     """Store methods related to the mechanics and visualisation of the game.
 
     This widget represents the gameplay area. The gameplay objects are children of this widget.
-    This class handles anything relating to the graphical representation of the game and the
-    mechanics of the game. This includes level generation, movement updates, and character initialisation.
+    This class connects the level's simulation.Simulation, which runs the mechanics of the
+    game, to the graphical representation of the game. This includes level generation,
+    advancing the simulation and rendering the characters.
 
     Public methods:
     start_game -- begins the game
+    update_play_area_size -- ensures play area is sized correctly
 
     Kivy Events:
-    update -- updates the game/moves the characters
+    update -- advances the simulation and renders the characters
     reset_after_death -- restarts the level after player dies
-    update_play_area -- ensures play area is sized correctly
-    check_character_collisions -- check if player has collided with enemy
+
+    Kivy Properties:
+    simulation -- ObjectProperty storing the simulation.Simulation of the current level
     """
 
+    simulation = ObjectProperty(None)
+
     def start_game(self):
         """Start the game.
 
@@ -115,6 +96,12 @@ class PlayArea(Widget):
         """
 
         self.__set_up_level()
+        # Only the jingle has to be loaded before the level can start
+        self.game.sounds.when_ready('jingle', self.__play_jingle)
+
+    def __play_jingle(self):
+        """Play the jingle, starting the gameplay once it has finished."""
+
         jingle = self.game.sounds['jingle']
         jingle.play()
         # Gameplay doesn't proceed until the jingle has finished
@@ -123,20 +110,24 @@ class PlayArea(Widget):
     def __set_up_level(self):
         """Set up the level and characters.
 
-        This method initialises the generates the level and
-        resets the characters. It should be called when
-        a new game or level starts.
+        This method generates the level and creates its simulation,
+        before showing the level's pellets and characters. It should
+        be called when a new game or level starts.
         """
 
-        self.__generate_level()
-        self.__reset_characters()
+        seed = self.__generate_level()
+        self.simulation = simulation.Simulation(self.game.level.maze, self.game, seed)
+        self.__bind_simulation_events()
+        self.game.level.place_pellets(self.simulation.pellets)
+        self.__assign_actors()
+        self.__render_characters()
 
     def __generate_level(self):
         """Generate the level.
 
         This method procedurally generates the maze to be
         used for the level. It should be called when a new
-        game or level starts.
+        game or level starts. The seed used is returned.
         """
 
         seed = random.randint(0, sys.maxint)
@@ -144,32 +135,34 @@ class PlayArea(Widget):
         print seed
         random.seed(seed)
         self.game.level.generate_level()
+        return seed
 
-    def __reset_characters(self):
-        """Completely reset the characters.
+    def __bind_simulation_events(self):
+        """Bind the simulation's events to their effects outside of the simulation."""
 
-        This method ensures the characters' size, positions and
-        certain modes are initialised, as well as resetting the
-        activation timers, mode length and start position for the enemies.
-        It should be called only when a new game or level is started.
-        """
+        self.simulation.bind(on_pellet_eaten=self.__on_pellet_eaten,
+                             on_pellets_cleared=self.__on_pellets_cleared,
+                             on_powerup_activated=self.__on_powerup_activated,
+                             on_powered_up=self.__on_powered_up,
+                             on_enemy_killed=self.__on_enemy_killed,
+                             on_player_killed=self.__on_player_killed)
 
-        self.game.player.initialise()
-        for enemy in self.game.enemies:
-            enemy.reset_character()
+    def __assign_actors(self):
+        """Give each character widget the simulation's actor it displays."""
 
-    def __initialise_characters(self):
-        """Initialise the characters.
+        self.game.player.actor = self.simulation.player
+        self.game.red_enemy.actor = self.simulation.red_enemy
+        self.game.pink_enemy.actor = self.simulation.pink_enemy
+        self.game.blue_enemy.actor = self.simulation.blue_enemy
+        self.game.orange_enemy.actor = self.simulation.orange_enemy
 
-        This method ensures the characters' size, positions and
-        certain modes are set to their initial values.
-        It should be called when a new game or level is started, as well as
-        when the player dies.
-        """
+    def __render_characters(self):
+        """Render the characters at the simulation's current interpolation point."""
 
-        self.game.player.initialise()
+        alpha = self.simulation.alpha
+        self.game.player.render(alpha)
         for enemy in self.game.enemies:
-            enemy.initialise()
+            enemy.render(alpha)
 
     def __start_updates(self, event):
         """Start the game's updates.
@@ -182,37 +175,20 @@ class PlayArea(Widget):
         begins after the jingle stops playing.
         """
 
-        self.__start_enemy_timers()
+        self.simulation.start()
         self.game.game_active = True
 
-    def __start_enemy_timers(self):
-        """Start the timers for the enemies' mode changes and release.
-
-        This method initialises the timers that count down
-        to the enemies mode changes. This includes the timer
-        between scatter/chase mode change, and the timer that
-        determines when they are released. It should be called
-        when a new game or level is started.
-
-        Note: timers are started from this method to ensure that they
-        start after the intro music stops.
-        """
-
-        for enemy in self.game.enemies:
-            enemy.start_mode_change_timer()
-            enemy.start_activation_timer()
-
     def update(self, dt):
         """Update the game state.
 
         This method should be scheduled on the Kivy clock to be called once every frame.
-        It updates the state of the game.
-        (currently, in this case, only the characters' positions)
+        It advances the simulation by the real time elapsed since the last frame,
+        so that dropped frames are caught up on rather than slowing the game, and
+        then renders the characters between the last two ticks.
         """
 
-        self.game.player.move()
-        for enemy in self.game.enemies:
-            enemy.move()
+        self.simulation.advance(dt)
+        self.__render_characters()
 
     def reset_after_death(self, event):
         """Reset the characters' positions and reset the scatter timer.
@@ -225,16 +201,16 @@ class PlayArea(Widget):
         the death jingle has finished playing.
         """
 
-        self.__initialise_characters()
-        for enemy in self.game.enemies:
-            enemy.start_mode_change_timer()
+        self.simulation.reset_after_death()
+        self.__render_characters()
         self.game.game_active = True
 
-    def update_play_area_size(self, instance, value):
+    def update_play_area_size(self):
         """Ensure that game element sizes are correct.
 
-        This Kivy event is triggered when window/level size changes to ensure
-        that all elements of the play area are positioned and sized correctly.
+        This method is called by the level once per frame at most, after the
+        window/level size changes, to ensure that all elements of the play
+        area are positioned and sized correctly.
         """
 
         for column in self.game.level.cells:
@@ -245,21 +221,53 @@ class PlayArea(Widget):
             enemy.update_character_size()
         self.game.player.update_character_size()
 
-    def check_character_collisions(self, instance, value):
-        """Check for character collisions.
+    def __on_pellet_eaten(self, coordinates, pellet_type):
+        """Stop displaying the eaten pellet and increase the score.
 
-        This method checks if the player is in the same grid position as an
-        enemy. If so, the player is set to dead. If the player has a power-up
-        and the enemy is frightened, the enemy is set to dead instead.
-        It is a Kivy property binding tied to the characters' grid positions.
+        This method is bound to the simulation's on_pellet_eaten event.
         """
 
-        for enemy in self.game.enemies:
-            if enemy.grid_position == self.game.player.grid_position:
-                if self.game.player.powered_up and enemy.frightened:
-                    enemy.kill_character()
-                elif not enemy.dead:
-                    self.game.player.kill_character()
+        self.game.level.remove_pellet(coordinates)
+        self.game.score += self.game.pellet_value
+        self.game.player.play_chomp_sound()
+
+    def __on_pellets_cleared(self):
+        """Advance the level when the pellets are all gone."""
+
+        if self.game.game_active:
+            self.game.advance_level()
+
+    def __on_powerup_activated(self):
+        """Play the power-up sound when a power pellet is collected."""
+
+        self.game.sounds['power_up'].play()
+
+    def __on_powered_up(self, powered_up):
+        """Start or stop the frightened sound when the player's powered up state changes.
+
+        Note: The things in this method are things that
+        should happen only when the player changes state between
+        powered-up and not powered-up, not the things that should
+        happen when the player collects a power-up.
+        """
+
+        if powered_up:
+            if self.game.sounds['frightened'].state == 'stop':
+                self.game.sounds['frightened'].play()
+        else:
+            # Here so that this is still reset on death whilst powered up
+            self.game.sounds['frightened'].stop()
+
+    def __on_enemy_killed(self, enemy):
+        """Increase the score and play a sound when an enemy is killed."""
+
+        self.game.score += self.game.kill_value
+        self.game.sounds['retreat'].play()
+
+    def __on_player_killed(self):
+        """Remove a life when the player is killed."""
+
+        self.game.lives -= 1
 
 
 class HotrodGame(Widget):
@@ -278,9 +286,9 @@ class HotrodGame(Widget):
     Public methods:
     show_start_screen -- displays the start screen
     load_sounds -- loads the game's sounds
+    advance_level -- advances to the next level
 
     Kivy events:
-    on_pellet_count -- checks if level has been completed
     on_level_number -- advances to the next level
     on_lives -- restarts level/ends game when player loses life
     on_game_active -- starts and stops updates
@@ -291,7 +299,6 @@ class HotrodGame(Widget):
     lives -- NumericProperty to track player's remaining lives
     level_number -- NumericProperty to track the level number
     player_name -- StringProperty to store the player's name
-    pellet_count -- NumericProperty for counting how many pellets remain
     powerup_limit -- NumericProperty storing the number of powerups that can spawn
     powerup_length -- NumericProperty storing the number of seconds a powerup lasts
     scatter_length -- NumericProperty storing the number of seconds the enemies scatter
@@ -303,7 +310,8 @@ class HotrodGame(Widget):
     game_over_screen -- ObjectProperty to store a reference to the game over screen
     start_screen -- ObjectProperty to store a reference to the start screen
     login_screen -- ObjectProperty to store a reference to the login screen
-    sounds -- ObjectProperty to store a dictionary of sound assets for the game
+    sounds -- ObjectProperty to store an audio.SoundCache of sound assets for the game
+    title_music_on -- BooleanProperty to keep track of whether the title music should be playing
     game_active -- BooleanProperty to keep track of whether the game is in progress
     enemies -- ListProperty to store a list of all the enemies (kv file)
     hud_width -- NumericProperty to store the width of the HUD (kv file)
@@ -311,21 +319,19 @@ class HotrodGame(Widget):
 
     # General properties game keeps track of
     score = NumericProperty(INITIAL_SCORE)
-    lives = NumericProperty(INITIAL_LIVES)
+    lives = NumericProperty(difficulty.INITIAL_LIVES)
     level_number = NumericProperty(INITIAL_LEVEL)
     player_name = StringProperty()
-    # Pellet counter should start counting from 0
-    pellet_count = NumericProperty(0)
 
 
     # Game properties and difficulty modifiers
-    powerup_limit = NumericProperty(INITIAL_POWERUP_LIMIT)
-    powerup_length = NumericProperty(INITIAL_POWERUP_TIME)
-    scatter_length = NumericProperty(INITIAL_SCATTER_TIME)
-    chase_length = NumericProperty(INITIAL_CHASE_TIME)
-    speed_multiplier = NumericProperty(INITIAL_SPEED_MULTIPLIER)
-    pellet_value = NumericProperty(INITIAL_PELLET_VALUE)
-    kill_value = NumericProperty(INITIAL_KILL_VALUE)
+    powerup_limit = NumericProperty(difficulty.INITIAL_POWERUP_LIMIT)
+    powerup_length = NumericProperty(difficulty.INITIAL_POWERUP_TIME)
+    scatter_length = NumericProperty(difficulty.INITIAL_SCATTER_TIME)
+    chase_length = NumericProperty(difficulty.INITIAL_CHASE_TIME)
+    speed_multiplier = NumericProperty(difficulty.INITIAL_SPEED_MULTIPLIER)
+    pellet_value = NumericProperty(difficulty.INITIAL_PELLET_VALUE)
+    kill_value = NumericProperty(difficulty.INITIAL_KILL_VALUE)
 
     # GUI elements
     screens = ListProperty()
@@ -333,8 +339,10 @@ class HotrodGame(Widget):
     start_screen = ObjectProperty(None)
     login_screen = ObjectProperty(None)
 
-    # Dictionary containing all sounds used in the game
+    # Cache containing all sounds used in the game, keyed like a dictionary
     sounds = ObjectProperty()
+    # The title music may still be loading when it is asked for, so it only plays if this is still set
+    title_music_on = BooleanProperty(False)
 
     # For managing game state
     game_active = BooleanProperty(False)
@@ -348,7 +356,7 @@ class HotrodGame(Widget):
         removing them all first.
         """
 
-        self.sounds['title'].play()
+        self.__start_title_music()
         self.__remove_screens()
         self.start_screen = user_interface.StartScreen()
         self.__show_screen(self.start_screen)
@@ -357,31 +365,54 @@ class HotrodGame(Widget):
     def load_sounds(self):
         """Load the sounds used in the game.
 
-        This method loads the sounds for use in the game and
-        stores them in a dictionary for easy access.
+        This method loads the sounds in the background, starting
+        with the title music and the jingle that starts a level, so
+        that the first frame isn't held up by decoding them all.
+        The sounds are stored in a cache keyed by their filenames
+        for easy access, and any sound that is played before it
+        has been loaded in the background is loaded when it is played.
+        """
+
+        self.sounds = audio.SoundCache(SOUND_DIRECTORY)
+        self.sounds.load_in_background(order=SOUND_LOAD_ORDER)
+
+    def __start_title_music(self):
+        """Play the title music once it has loaded.
+
+        The title music is loaded in the background, so it is started
+        through the sound cache rather than loaded on the main thread.
         """
 
-        self.sounds = {}
-        # Dictionary keys correspond to filenames
-        for file in os.listdir(SOUND_DIRECTORY):
-            filename, extension = os.path.splitext(file)
-            dictionary_key = filename
-            self.sounds[dictionary_key] = SoundSDL2(source=(os.path.join(SOUND_DIRECTORY, file)))
+        self.title_music_on = True
+        self.sounds.when_ready('title', self.__play_title_music)
 
-        self.sounds['title'].loop = True
-        self.sounds['frightened'].loop = True
+    def __play_title_music(self):
+        """Play the loaded title music, unless it has been stopped whilst it was loading."""
+
+        if self.title_music_on:
+            self.sounds['title'].play()
+
+    def __stop_title_music(self):
+        """Stop the title music, or stop it from starting if it is still loading."""
+
+        self.title_music_on = False
+        if self.sounds.is_ready('title'):
+            self.sounds['title'].stop()
 
     def __start_game(self):
         """Start the game.
 
         This method begins game progression. It ensures that
         all screens are removed and the title music is stopped,
-        before triggering the play area to start the game.
+        before triggering the play area to start the game. The level's
+        scores are prefetched whilst the level is played.
         """
 
         self.__remove_screens()
-        self.sounds['title'].stop()
+        self.__stop_title_music()
         self.play_area.start_game()
+        # So that the scores are already known if the game ends on this level
+        server.prefetch_scores(self.player_name, self.level_number)
 
     def __reset(self, event):
         """Reset the game after a game over.
@@ -402,19 +433,10 @@ class HotrodGame(Widget):
 
         self.level_number = INITIAL_LEVEL
         self.score = INITIAL_SCORE
-        self.lives = INITIAL_LIVES
-        self.pellet_value = INITIAL_PELLET_VALUE
-        self.kill_value = INITIAL_KILL_VALUE
-
-        self.powerup_length = INITIAL_POWERUP_TIME
-        self.scatter_length = INITIAL_SCATTER_TIME
-        self.chase_length = INITIAL_CHASE_TIME
-        self.speed_multiplier = INITIAL_SPEED_MULTIPLIER
+        self.lives = difficulty.INITIAL_LIVES
+        difficulty.initialise_difficulty(self)
 
-        # Ensure pellet counter starts at 0
-        self.pellet_count = 0
-
-    def __advance_level(self):
+    def advance_level(self):
         """Advance to the next level.
 
         This method stops the game and increases the
@@ -425,30 +447,9 @@ class HotrodGame(Widget):
         self.game_active = False
         # Increase level number and lives by 1
         self.level_number += 1
-        self.lives += 1
+        self.lives += difficulty.LIVES_BONUS
         self.__start_game()
 
-    def __increase_difficulty(self):
-        """Increase the difficulty.
-
-        This method increases the difficulty by adjusting the values
-        of the relevant properties by the defined increment, until they
-        will exceed their maximum or minimum values.
-        """
-
-        if self.speed_multiplier <= MAX_SPEED_MULTIPLIER - SPEED_INCREMENT:
-            self.speed_multiplier += SPEED_INCREMENT
-        if self.scatter_length >= MIN_SCATTER_LENGTH - SCATTER_DECREMENT:
-            self.scatter_length += SCATTER_DECREMENT
-        if self.powerup_length >= MIN_POWERUP_LENGTH - POWERUP_TIME_DECREMENT:
-            self.powerup_length += POWERUP_TIME_DECREMENT
-        if self.powerup_limit >= MIN_POWERUP_LIMIT - POWERUP_LIMIT_DECREMENT:
-            self.powerup_limit += POWERUP_LIMIT_DECREMENT
-
-        self.chase_length += CHASE_INCREMENT
-        self.pellet_value += PELLET_VALUE_INCREMENT
-        self.kill_value += KILL_VALUE_INCREMENT
-
     def __show_screen(self, screen):
         """Show a given screen.
 
@@ -483,7 +484,9 @@ class HotrodGame(Widget):
 
         This method is triggered by a Kivy event.
         This method shows the login screen and binds the buttons to
-        the appropriate add user/get user methods.
+        the appropriate add user/get user methods. The name of the
+        last player to log in is filled in, so that they can log in
+        again straight away.
         It ensures that no other screens are displaying by
         removing them all first.
         """
@@ -491,6 +494,9 @@ class HotrodGame(Widget):
         self.__remove_screens()
         self.login_screen = user_interface.LoginScreen()
         self.__show_screen(self.login_screen)
+        last_player = login.get_last_player()
+        if last_player is not None:
+            self.login_screen.name_text.text = last_player
         self.login_screen.new_button.bind(on_press=self.__add_new_user)
         self.login_screen.existing_button.bind(on_press=self.__get_existing_user)
 
@@ -503,12 +509,11 @@ class HotrodGame(Widget):
         is pressed.
         """
 
-        self.sounds['title'].play()
+        self.__start_title_music()
         self.game_over_screen = user_interface.GameOverScreen()
         self.__show_screen(self.game_over_screen)
         self.game_over_screen.show_final_score(self.score)
         self.game_over_screen.show_best_score(self.player_name, self.level_number, self.score)
-        self.game_over_screen.show_high_scores(self.level_number)
         self.game_over_screen.reset_button.bind(on_press=self.__reset)
 
     def __add_new_user(self, event):
@@ -519,23 +524,30 @@ class HotrodGame(Widget):
         """
 
         name = self.login_screen.name_text.text
-        UrlRequest('http://bsccg02.ga.fal.io/adduser.py?player=' + name, self.__check_user)
         self.login_screen.instruction_text.text = "Adding player..."
-        self.login_screen.new_button.disabled = True
+        self.__disable_login_buttons()
+        login.get_login_client().add_user(name, self.__check_user, self.__login_failure)
 
     def __get_existing_user(self, event):
         """Find an existing user in the database.
 
         This Kivy property bind event sees if the user exists in
-        the database and attempts to begin the game.
+        the database and attempts to begin the game. The last player
+        to log in is logged in again without contacting the database.
         """
 
         name = self.login_screen.name_text.text
-        UrlRequest('http://bsccg02.ga.fal.io/getuser.py?player=' + name, self.__check_user)
         self.login_screen.instruction_text.text = "Logging in..."
+        self.__disable_login_buttons()
+        login.get_login_client().get_user(name, self.__check_user, self.__login_failure)
+
+    def __disable_login_buttons(self):
+        """Disable both login buttons, so only one login is made at a time."""
+
+        self.login_screen.new_button.disabled = True
         self.login_screen.existing_button.disabled = True
 
-    def __check_user(self, request, results):
+    def __check_user(self, name):
         """Check if the user login/addition was successful.
 
         This method checks if the user was added successfully or if
@@ -543,7 +555,9 @@ class HotrodGame(Widget):
         successful, it begins the game.
         """
 
-        name = json.loads(results)
+        if self.login_screen not in self.screens:
+            # The game has already been started by another login with the same result
+            return
         if name is None:
             self.login_screen.instruction_text.text = "Invalid name!"
             self.login_screen.new_button.disabled = False
@@ -552,6 +566,13 @@ class HotrodGame(Widget):
             self.player_name = name
             self.__start_game()
 
+    def __login_failure(self, server_error):
+        """Let the player try again if the server couldn't be reached."""
+
+        self.login_screen.instruction_text.text = "Couldn't reach server!"
+        self.login_screen.new_button.disabled = False
+        self.login_screen.existing_button.disabled = False
+
     def on_level_number(self, instance, value):
         """Increase the difficulty after the level advances.
 
@@ -562,19 +583,7 @@ class HotrodGame(Widget):
 
         # After level 1, so that difficulty doesn't increase on start
         if self.level_number != 1:
-            self.__increase_difficulty()
-
-    def on_pellet_count(self, instance, value):
-        """Advance the level when pellets are all gone.
-
-        This Kivy event is called when the pellet count changes.
-        If the pellet count gets to 0, the level advances.
-        """
-
-        # If there are no pellets left
-        if self.pellet_count == 0:
-            if self.game_active:
-                self.__advance_level()
+            difficulty.increase_difficulty(self)
 
     def on_touch_up(self, touch):
         """Detect player swipes and change character's next direction accordingly.
@@ -587,16 +596,16 @@ class HotrodGame(Widget):
             # Dividing by 10 means the swipe needs to be at least a 10th of the window
             # Move right if player swipes right
             if touch.pos[0] > touch.opos[0] + self.width/10:
-                self.player.next_direction = direction.Direction.right
+                self.player.actor.next_direction = direction.Direction.right
             # Move left if player swipes left
             if touch.pos[0] < touch.opos[0] - self.width/10:
-                self.player.next_direction = direction.Direction.left
+                self.player.actor.next_direction = direction.Direction.left
             # Move up is player swipes up
             if touch.pos[1] > touch.opos[1] + self.height/10:
-                self.player.next_direction = direction.Direction.up
+                self.player.actor.next_direction = direction.Direction.up
             # Move down if player swipes down
             if touch.pos[1] < touch.opos[1] - self.height/10:
-                self.player.next_direction = direction.Direction.down
+                self.player.actor.next_direction = direction.Direction.down
 
     def on_lives(self, instance, value):
         """Reset the play area if a life is lost or show game over screen if all are lost.
@@ -616,6 +625,9 @@ class HotrodGame(Widget):
                 game_over_sound.bind(on_stop=self.__show_game_over_screen)
                 self.sounds['game_over'].play()
             else:
+                if self.lives == 1:
+                    # The game may be about to end, so make sure the scores are up to date
+                    server.prefetch_scores(self.player_name, self.level_number)
                 death_sound = self.sounds['death']
                 death_sound.bind(on_stop=self.play_area.reset_after_death)
                 self.sounds['death'].play()
@@ -634,6 +646,8 @@ class HotrodGame(Widget):
         Next level has begun, new game has begun, or after positions have reset after death
         """
 
+        # The simulation stops mid-frame if the game is stopped during a tick
+        self.play_area.simulation.active = self.game_active
         if self.game_active:
             Clock.schedule_interval(self.play_area.update, 1.0/FPS)
         else:
@@ -650,6 +664,12 @@ class HotrodApp(App):
         return self.game
 
     def on_start(self):
+        server.set_high_score_cache_file(os.path.join(self.user_data_dir, HIGH_SCORE_CACHE_FILE))
+        login.set_player_file(os.path.join(self.user_data_dir, PLAYER_FILE))
+        # Scores that couldn't be submitted last time are submitted in the background
+        score_queue.set_journal_file(os.path.join(self.user_data_dir, SCORE_JOURNAL_FILE))
+        # So the atlas isn't loaded during the first frame a character is rendered
+        sprites.load()
         # Called here rather than in build() so that size is correct
         self.game.load_sounds()
         self.game.show_start_screen()
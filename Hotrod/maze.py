@@ -0,0 +1,495 @@
+"""Contain a class for storing and generating the layout of a maze.
+
+This module contains a pure-data model of a level's maze. The layout is
+stored as a compact grid of wall bitmasks with one byte per cell, so that
+mazes can be generated and queried without creating any widgets.
+
+Classes:
+Maze -- class for generating and storing the layout of a maze
+"""
+
+# Standard python library
+import collections
+import random
+from array import array
+
+# Own modules
+import direction
+import error
+import junctions
+
+
+# Minimum number of cells from the edge the beetle den must be
+# Should always be greater than 1 and less than columns/2 - beetle den size
+BEETLE_DEN_PADDING_X = 1
+# Should always be greater than 1 and less than rows/2
+BEETLE_DEN_PADDING_Y = 1
+
+# Distance stored in a distance field for cells that cannot reach the target
+# Distance fields store unsigned shorts, so mazes must have fewer cells than this
+UNREACHABLE = 0xFFFF
+# Maximum number of distance fields that are cached at once
+# Mazes with this many cells or fewer have every distance field precomputed
+DISTANCE_CACHE_SIZE = 256
+
+
+class Maze(object):
+
+    """Store the layout of a maze and methods for generating it.
+
+    This class stores the edges of every cell in the maze as a bitmask,
+    where a set bit means that the edge in the corresponding direction
+    is a wall. Cells are identified by an integer id so that the bitmasks
+    can be kept in a flat bytearray. Each cell stores all of its own edges,
+    which allows one-way passages such as the beetle den's exit.
+
+    Public methods:
+    generate -- procedurally generate the maze layout
+    get_cell_id -- return the id of the cell at the given grid coordinates
+    get_coordinates -- return the grid coordinates of the cell with the given id
+    contains_coordinates -- check if the maze contains the given grid coordinates
+    get_adjacent_coordinates -- return the coordinates of the adjacent cell in a given direction
+    is_wall -- check if the edge of a cell in a given direction is a wall
+    get_walls -- return the directions of a cell's edges that are walls
+    is_in_den -- check if the given grid coordinates are part of the beetle den
+    precompute_distance_fields -- compute the distance fields for small mazes up front
+    get_distance_field -- return the shortest path distances from every cell to a target cell
+    get_distance -- return the shortest path distance between two cells
+
+    Attributes:
+    columns -- the number of columns the maze has
+    rows -- the number of rows the maze has
+    sides -- the number of sides each cell has
+    walls -- bytearray storing the wall bitmask of each cell
+    beetle_den -- dictionary of the grid coordinates of the beetle den's cells
+    junction_graph -- the junctions.JunctionGraph of the generated layout, or None before generation
+    """
+
+    sides = 4
+
+    def __init__(self, columns, rows):
+        """Allocate an empty maze with the given number of columns and rows."""
+
+        self.columns = columns
+        self.rows = rows
+        self.walls = bytearray(columns * rows)
+        self.beetle_den = {}
+        self.junction_graph = None
+
+        # Only needed during generation
+        self.__created = bytearray(columns * rows)
+        self.__initialised = bytearray(columns * rows)
+
+        # Distance fields keyed by target cell id, least recently used first
+        self.__distance_fields = collections.OrderedDict()
+
+    def generate(self):
+        """Generate the maze layout.
+
+        This method manages the maze generation process, ensuring that the
+        maze is generated, single-cell dead ends are removed and the beetle
+        den is created. The junction graph of the finished layout is then built.
+        """
+
+        self.__generate_maze()
+        self.__remove_dead_ends()
+        self.__create_den()
+        # Any distances computed before the layout was finished are wrong
+        self.__distance_fields.clear()
+        self.junction_graph = junctions.JunctionGraph(self)
+
+    def get_cell_id(self, coordinates):
+        """Return the id of the cell at the given grid coordinates.
+
+        Arguments:
+        coordinates -- grid coordinates as a tuple
+        """
+
+        x, y = coordinates
+        return y * self.columns + x
+
+    def get_coordinates(self, cell_id):
+        """Return the grid coordinates of the cell with the given id as a tuple.
+
+        Arguments:
+        cell_id -- the id of the cell as an integer
+        """
+
+        y, x = divmod(cell_id, self.columns)
+        return x, y
+
+    def contains_coordinates(self, coordinates):
+        """Return True if the maze grid contains the given coordinates.
+
+        Arguments:
+        coordinates -- grid coordinates as a tuple
+        """
+
+        x, y = coordinates
+        return 0 <= x < self.columns and 0 <= y < self.rows
+
+    def get_adjacent_coordinates(self, coordinates, direction):
+        """Return the coordinates of the adjacent cell in a given direction.
+
+        This method returns the grid coordinates of the cell next to the cell
+        at the given coordinates. If there is no cell there, None is returned.
+
+        Arguments:
+        coordinates -- grid coordinates as a tuple
+        direction -- the direction of the adjacent cell as a direction.Direction
+        """
+
+        adjacent_coordinates = (int(coordinates[0] + direction.dx),
+                                int(coordinates[1] + direction.dy))
+        if self.contains_coordinates(adjacent_coordinates):
+            return adjacent_coordinates
+        else:
+            return None
+
+    def is_wall(self, coordinates, direction):
+        """Return True if the edge of a cell in the given direction is a wall.
+
+        Arguments:
+        coordinates -- grid coordinates of the cell as a tuple
+        direction -- the direction of the edge as a direction.Direction
+        """
+
+        return bool(self.walls[self.get_cell_id(coordinates)] & direction.bit)
+
+    def get_walls(self, coordinates):
+        """Return a list of the directions of a cell's edges that are walls.
+
+        Arguments:
+        coordinates -- grid coordinates of the cell as a tuple
+        """
+
+        cell_walls = self.walls[self.get_cell_id(coordinates)]
+        return [dir for dir in direction.Direction if cell_walls & dir.bit]
+
+    def is_in_den(self, coordinates):
+        """Return True if the given grid coordinates are part of the beetle den.
+
+        Arguments:
+        coordinates -- grid coordinates as a tuple
+        """
+
+        return tuple(coordinates) in self.beetle_den.values()
+
+    def precompute_distance_fields(self):
+        """Compute the distance fields for every cell if the maze is small enough.
+
+        This method fills the distance field cache with a field for every
+        target cell when they all fit in the cache, so that no distances need
+        to be computed during gameplay. Larger mazes compute fields lazily.
+        It should be called after the maze has been generated.
+        """
+
+        cell_count = self.columns * self.rows
+        if cell_count <= DISTANCE_CACHE_SIZE:
+            for cell_id in range(cell_count):
+                self.get_distance_field(self.get_coordinates(cell_id))
+
+    def get_distance_field(self, target):
+        """Return the shortest path distances from every cell to a target cell.
+
+        This method returns a flat array of distances indexed by cell id.
+        Each distance is the number of cells that must be moved through to
+        reach the target without passing through walls, or UNREACHABLE.
+        Fields are computed on first use and cached.
+
+        Arguments:
+        target -- grid coordinates of the target cell as a tuple
+        """
+
+        target_id = self.get_cell_id(target)
+        try:
+            distances = self.__distance_fields.pop(target_id)
+        except KeyError:
+            distances = self.__compute_distance_field(target_id)
+            if len(self.__distance_fields) >= DISTANCE_CACHE_SIZE:
+                # Evict the least recently used field
+                self.__distance_fields.popitem(last=False)
+        # Reinserting marks the field as the most recently used
+        self.__distance_fields[target_id] = distances
+        return distances
+
+    def get_distance(self, start, target):
+        """Return the shortest path distance from the start cell to the target cell.
+
+        Arguments:
+        start -- grid coordinates of the start cell as a tuple
+        target -- grid coordinates of the target cell as a tuple
+        """
+
+        return self.get_distance_field(target)[self.get_cell_id(start)]
+
+    def __compute_distance_field(self, target_id):
+        """Compute the shortest path distances from every cell to a target cell.
+
+        This method performs a breadth-first search outwards from the target
+        cell. A cell is only reached from its neighbour if the cell's edge
+        facing the neighbour is a passage, so one-way passages are respected.
+
+        Arguments:
+        target_id -- the id of the target cell
+        """
+
+        distances = array('H', [UNREACHABLE]) * (self.columns * self.rows)
+        distances[target_id] = 0
+        queue = collections.deque([target_id])
+
+        while queue:
+            cell_id = queue.popleft()
+            cell = self.get_coordinates(cell_id)
+            next_distance = distances[cell_id] + 1
+            for dir in direction.Direction:
+                adjacent_cell = self.get_adjacent_coordinates(cell, dir)
+                if adjacent_cell is None:
+                    continue
+                adjacent_cell_id = self.get_cell_id(adjacent_cell)
+                # The adjacent cell can only move into this cell if its edge facing this cell is a passage
+                if (distances[adjacent_cell_id] == UNREACHABLE and
+                        not self.walls[adjacent_cell_id] & dir.opposite.bit):
+                    distances[adjacent_cell_id] = next_distance
+                    queue.append(adjacent_cell_id)
+
+        return distances
+
+    def __generate_maze(self):
+        """Procedurally generate a maze.
+
+        This method begins the process of procedurally generating a maze using the Growing Tree Algorithm
+        (described here http://weblog.jamisbuck.org/2011/1/27/maze-generation-growing-tree-algorithm)
+        The cell to start generation from is chosen randomly, before beginning the full maze generation process.
+        I have implemented this algorithm in the past using the tutorial below, so referred to that at some points:
+        http://catlikecoding.com/unity/tutorials/maze/
+        """
+
+        # List of active cell coordinates used in generation algorithm
+        active_cells = []
+        # Pick the first cell to begin generation from randomly
+        first_cell_coordinates = self.__get_random_coordinates()
+        self.__created[self.get_cell_id(first_cell_coordinates)] = True
+        active_cells.append(first_cell_coordinates)
+
+        # Keep generating until no cells remain
+        while len(active_cells) > 0:
+            self.__generate_cells(active_cells)
+
+    def __generate_cells(self, active_cells):
+        """Generate the cells for the maze.
+
+        This method generates the cells for the maze using the Growing Tree Algorithm,
+        storing the layout in the wall bitmasks.
+
+        Arguments:
+        active_cells -- list of active cell coordinates. It should contain the starting cell's coordinates.
+        """
+
+        # Determines which index the algorithm generates from. Changing this yields different results.
+        current_index = len(active_cells) - 1         # This generates from last index
+        current_cell = active_cells[current_index]
+        current_cell_id = self.get_cell_id(current_cell)
+
+        uninitialised_directions = [dir for dir in direction.Direction
+                                    if not self.__initialised[current_cell_id] & dir.bit]
+        if not uninitialised_directions:
+            # Remove fully initialised cells from the list so that they are not revisited
+            del active_cells[current_index]
+            return
+
+        dir = random.choice(uninitialised_directions)
+        next_cell = self.get_adjacent_coordinates(current_cell, dir)
+
+        if next_cell is not None:
+            next_cell_id = self.get_cell_id(next_cell)
+            if not self.__created[next_cell_id]:
+                # Create a new cell and set the relevant edges to passages if no cell exists at next_cell
+                self.__created[next_cell_id] = True
+                self.__set_edge(current_cell_id, dir, False)
+                # Set corresponding edge of the other cell to a passage too, otherwise it will later become a wall
+                self.__set_edge(next_cell_id, dir.opposite, False)
+                active_cells.append(next_cell)
+
+            else:
+                # If a cell exists at next_cell, set the relevant edges to walls
+                self.__set_edge(current_cell_id, dir, True)
+                self.__set_edge(next_cell_id, dir.opposite, True)
+
+        # If next_cell is outside the level boundaries, set the edge to a wall
+        else:
+            self.__set_edge(current_cell_id, dir, True)
+
+    def __set_edge(self, cell_id, direction, is_wall):
+        """Set a single edge of a cell to a wall or a passage.
+
+        This method only changes the edge of the given cell. The corresponding
+        edge of the adjacent cell is left as it is.
+
+        Arguments:
+        cell_id -- the id of the cell whose edge will be changed
+        direction -- the direction of the edge as a direction.Direction
+        is_wall -- True if the edge should become a wall, False for a passage
+        """
+
+        bit = direction.bit
+        self.__initialised[cell_id] |= bit
+        if is_wall:
+            self.walls[cell_id] |= bit
+        else:
+            self.walls[cell_id] &= ~bit
+
+    def __remove_dead_ends(self):
+        """Ensure that there are no single-cell dead ends.
+
+        This method removes any single-cell dead ends by selecting a
+        random wall to remove. This should be done after all other methods
+        that affect the maze layout have been executed.
+        Dead ends are removed to prevent the game from being impossibly hard,
+        and to accommodate enemies being forbidden to reverse direction.
+        """
+
+        for x in range(self.columns):
+            for y in range(self.rows):
+                cell = (x, y)
+                walls = self.get_walls(cell)
+                # A cell is a dead end if all sides are walls except for one
+                if len(walls) >= self.sides - 1:
+                    # Choose a random wall to be removed and attempt to remove it
+                    target_direction = random.choice(walls)
+                    while True:
+                        try:
+                            self.__set_edge_to_passage(cell, target_direction)
+                            break
+                        except error.NonExistentCellError:
+                            # If the wall is at the edge, remove it from the list of walls
+                            walls.remove(target_direction)
+                            target_direction = random.choice(walls)
+
+    def __set_edge_to_passage(self, cell, direction):
+        """Change a given edge of a cell to a passage.
+
+        This method sets a cell edge of a given cell in a given direction
+        to a passage, and also sets the corresponding edge in the adjacent cell to a passage.
+        Note that edges at the edge of the level cannot be changed into passages.
+
+        Arguments:
+        cell -- the grid coordinates of the cell whose edge will be changed
+        direction -- the direction of the edge to be changed as a direction.Direction
+        """
+
+        adjacent_cell = self.get_adjacent_coordinates(cell, direction)
+
+        if adjacent_cell is not None:
+            self.__set_edge(self.get_cell_id(adjacent_cell), direction.opposite, False)
+            self.__set_edge(self.get_cell_id(cell), direction, False)
+        else:
+            # Cell can only be set to passage if there is an adjacent cell
+            raise error.NonExistentCellError("There is no adjacent cell.")
+
+    def __set_edge_to_wall(self, cell, direction):
+        """Change a given edge of a cell to a wall.
+
+        This method sets a cell edge of a given cell in a given direction
+        to a wall, and also sets the corresponding edge in the adjacent cell to a wall.
+
+        Arguments:
+        cell -- the grid coordinates of the cell whose edge will be changed
+        direction -- the direction of the edge to be changed as a direction.Direction
+        """
+
+        self.__set_edge(self.get_cell_id(cell), direction, True)
+        adjacent_cell = self.get_adjacent_coordinates(cell, direction)
+
+        # Also set relevant edge of adjacent cell if it exists
+        if adjacent_cell is not None:
+            self.__set_edge(self.get_cell_id(adjacent_cell), direction.opposite, True)
+
+    def __set_cell_edges(self, cell, directions):
+        """Set all edges of a cell as desired.
+
+        This method sets the edges of the given cell in the given directions to walls.
+        All remaining edges are set to passages.
+
+        Arguments:
+        cell -- the grid coordinates of the cell whose edges will be changed
+        directions -- tuple of direction.Direction specifying where walls should be
+        """
+
+        for dir in direction.Direction:
+            if dir in directions:
+                self.__set_edge_to_wall(cell, dir)
+            else:
+                self.__set_edge_to_passage(cell, dir)
+
+    def __create_den(self):
+        """Create a den area that enemies will come from.
+
+        This method creates a den area that will serve as the base for
+        enemy beetles. The den placement is random, and based on the
+        position of its center cell.
+        """
+
+        center_coords = self.__get_den_center()
+
+        self.beetle_den = {}
+        self.beetle_den['center'] = center_coords
+        self.beetle_den['left'] = self.get_adjacent_coordinates(center_coords, direction.Direction.left)
+        self.beetle_den['right'] = self.get_adjacent_coordinates(center_coords, direction.Direction.right)
+
+        self.__initialise_den_edges()
+        self.__remove_walls_around_den()
+
+    def __get_den_center(self):
+        """Choose random grid coordinates for the center of the den area."""
+
+        # +/- 1 on each x coord to account for cell on either side of center
+        den_center_coords = (random.randrange(BEETLE_DEN_PADDING_X + 1, self.columns - BEETLE_DEN_PADDING_X - 1),
+                             random.randrange(BEETLE_DEN_PADDING_Y, self.rows - BEETLE_DEN_PADDING_Y))
+        return den_center_coords
+
+    def __initialise_den_edges(self):
+        """Set the edges of the beetle den correctly.
+
+        This method ensures that the edges of the beetle den are set up correctly.
+        The beetle den is enclosed with a one-way exit at the top of the center cell.
+        """
+
+        den_center = self.beetle_den['center']
+
+        self.__set_cell_edges(den_center, (direction.Direction.down, direction.Direction.up))
+        self.__set_cell_edges(self.beetle_den['left'], (direction.Direction.up, direction.Direction.down, direction.Direction.left))
+        self.__set_cell_edges(self.beetle_den['right'], (direction.Direction.up, direction.Direction.down, direction.Direction.right))
+
+        # Manually set top edge of den_center in order to create one-way passage
+        self.__set_edge(self.get_cell_id(den_center), direction.Direction.up, False)
+
+    def __remove_walls_around_den(self):
+        """Ensure that there is a clear passage around the den.
+
+        This method ensures that there is a clear passage around the circumference
+        of the enemy den. This is both to guarantee there are no dead ends around it,
+        and reduce difficulty by allowing the player to move freely when near the enemy den.
+        """
+
+        for cell in self.beetle_den.values():
+            # Couldn't use direction as variable name as that is module name
+            for dir in direction.Direction:
+                adjacent_cell = self.get_adjacent_coordinates(cell, dir)
+
+                if adjacent_cell is not None and not self.is_in_den(adjacent_cell):
+                    if dir == direction.Direction.up or dir == direction.Direction.down:
+                        edge_directions = direction.Direction.left, direction.Direction.right
+                    else:
+                        edge_directions = direction.Direction.down, direction.Direction.up
+
+                    for edge_dir in edge_directions:
+                        try:
+                            self.__set_edge_to_passage(adjacent_cell, edge_dir)
+                        except error.NonExistentCellError:
+                            pass
+
+    def __get_random_coordinates(self):
+        """Return a random grid coordinate tuple"""
+
+        return (random.randrange(self.columns), random.randrange(self.rows))
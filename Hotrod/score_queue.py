@@ -0,0 +1,359 @@
+"""Contain a queue for submitting scores to the server in the background.
+
+This module contains a queue that scores are written to instead of being
+sent to the server straight away. The queue is kept in a journal file, so
+that scores aren't lost if the server can't be reached or the app is closed,
+and it is flushed to the server by a background worker. Only the highest
+score for each player and level is kept, as that is the only one that can
+change the high scores.
+
+Classes:
+ScoreQueue -- class for queueing scores and flushing them to the server
+"""
+
+# Standard python libraries
+import json
+import os
+import threading
+
+# Own modules
+import error
+import server
+
+
+# Number of seconds to wait after a failed flush before trying again
+INITIAL_RETRY_DELAY = 1
+# The longest number of seconds to wait between failed flushes
+MAX_RETRY_DELAY = 300
+# Number of seconds to wait for more scores before flushing, so they're sent together
+BATCH_DELAY = 0.5
+# The most scores that are sent in one flush
+MAX_BATCH_SIZE = 50
+# HTTP status of a request to an endpoint the server doesn't have
+NOT_FOUND = 404
+
+
+class ScoreQueue(object):
+
+    """Queue scores and submit them to the server in the background.
+
+    Scores are appended to the journal file as soon as they are queued.
+    A worker thread sends the queued scores in batches, each in one request
+    with server.submit_scores, and removes them from the journal once the
+    server has them. If the server doesn't have the batch endpoint, each
+    score is sent on its own with server.submit_if_best_separately instead.
+    If a batch fails, it is tried again after a delay that doubles with each
+    failure, up to MAX_RETRY_DELAY. Scores that the server rejects with a
+    client error, which trying again won't fix, are dropped instead.
+
+    Public methods:
+    submit -- queue a score to be submitted
+    load -- load the scores that were left in the journal file
+    pending -- return the scores waiting to be submitted
+
+    Attributes:
+    path -- the journal file, or None to keep the queue in memory
+    """
+
+    def __init__(self, path=None, submit=server.submit_scores, submit_one=server.submit_if_best_separately,
+                 dispatch=server.dispatch_on_main_thread):
+        """Create an empty queue.
+
+        Arguments:
+        path -- the journal file, or None to keep the queue in memory
+        submit -- function that sends a batch of scores to the server, with the signature of server.submit_scores
+        submit_one -- function that sends a single score to the server if it doesn't have the batch
+                      endpoint, with the signature of server.submit_if_best_separately
+        dispatch -- function that calls a submission's callback with a result, on the thread that should handle it
+        """
+
+        self.path = path
+        self.__submit = submit
+        self.__submit_one = submit_one
+        self.__dispatch = dispatch
+        # Cleared once the server turns out not to have the batch endpoint
+        self.__batch_supported = True
+        self.__condition = threading.Condition()
+        # The highest queued score, keyed by (player, level)
+        self.__pending = {}
+        # Lists of the submissions waiting on each (player, level)'s score to be submitted
+        self.__callbacks = {}
+        self.__worker = None
+        self.__failures = 0
+
+    def submit(self, player, level, score, on_success=None, on_failure=None):
+        """Queue a score to be submitted to the server.
+
+        The score is written to the journal before this method returns. The
+        callbacks are called through the queue's dispatch function, which by
+        default calls them on the Kivy main thread rather than the worker. The
+        result of the submission, in the form passed on by server.submit_if_best, is
+        passed to on_success once the score has been submitted, with the
+        player's previous best as it was when this score was queued, so
+        counting higher scores queued before it. If the first
+        attempt fails, the error.ServerError is passed to on_failure, but the
+        score stays queued and on_success may still be called later. If the
+        server rejects the score, it is dropped and the error.ServerStatusError
+        is passed to on_failure, even if an earlier failure was passed to it.
+
+        Arguments:
+        player -- the name of the player as a string
+        level -- the level number to submit the score to
+        score -- the score to submit
+        on_success -- function to call with the response once the score is submitted
+        on_failure -- function to call with the error if the first attempt fails
+        """
+
+        with self.__condition:
+            key = (player, level)
+            # Only the highest score is sent, so the response's previous best won't include the ones before it
+            submission = {'score': score, 'queued_best': self.__pending.get(key),
+                          'on_success': on_success, 'on_failure': on_failure, 'failure_reported': False}
+            if key not in self.__pending or score > self.__pending[key]:
+                self.__pending[key] = score
+                self.__append(player, level, score)
+            self.__callbacks.setdefault(key, []).append(submission)
+            self.__start_worker()
+            self.__condition.notify()
+
+    def load(self):
+        """Queue the scores left in the journal file, keeping the highest of each player and level."""
+
+        if self.path is None:
+            return
+        try:
+            with open(self.path) as journal:
+                lines = journal.readlines()
+        except (IOError, OSError):
+            return
+
+        with self.__condition:
+            for line in lines:
+                try:
+                    player, level, score = json.loads(line)
+                except ValueError:
+                    # The last line may be half written if the app closed whilst writing it
+                    continue
+                key = (player, level)
+                if key not in self.__pending or score > self.__pending[key]:
+                    self.__pending[key] = score
+            self.__compact()
+            if self.__pending:
+                self.__start_worker()
+                self.__condition.notify()
+
+    def pending(self):
+        """Return a dictionary of the queued scores, keyed by (player, level)."""
+
+        with self.__condition:
+            return dict(self.__pending)
+
+    def __start_worker(self):
+        """Start the worker thread if it hasn't been started. The queue must already be locked."""
+
+        if self.__worker is None:
+            self.__worker = threading.Thread(target=self.__work)
+            # The scores are in the journal, so the worker shouldn't stop the app from closing
+            self.__worker.daemon = True
+            self.__worker.start()
+
+    def __work(self):
+        """Flush the queued scores to the server, waiting longer after each failure."""
+
+        while True:
+            with self.__condition:
+                while not self.__pending:
+                    self.__condition.wait()
+            # Give scores queued at about the same time the chance to be sent together
+            threading.Event().wait(BATCH_DELAY)
+
+            if self.__flush():
+                self.__failures = 0
+            else:
+                delay = min(INITIAL_RETRY_DELAY * 2 ** self.__failures, MAX_RETRY_DELAY)
+                self.__failures += 1
+                threading.Event().wait(delay)
+
+    def __flush(self):
+        """Send a batch of the queued scores and return whether none of them need to be tried again."""
+
+        with self.__condition:
+            batch = sorted(self.__pending.items())[:MAX_BATCH_SIZE]
+
+        if self.__batch_supported:
+            entries = [(player, level, score) for (player, level), score in batch]
+            responses, server_error = self.__wait_for(
+                lambda on_success, on_failure: self.__submit(entries, on_success, on_failure))
+            if server_error is None:
+                for (key, score), response in zip(batch, responses):
+                    self.__finish(key, score, response, None)
+                return True
+            elif not (isinstance(server_error, error.ServerStatusError) and server_error.status == NOT_FOUND):
+                for key, score in batch:
+                    self.__finish(key, score, None, server_error)
+                return is_permanent_error(server_error)
+            # Servers without the batch endpoint are sent each score on its own from now on
+            self.__batch_supported = False
+
+        for key, score in batch:
+            player, level = key
+            response, server_error = self.__wait_for(
+                lambda on_success, on_failure: self.__submit_one(player, level, score, on_success, on_failure))
+            self.__finish(key, score, response, server_error)
+            if server_error is not None and not is_permanent_error(server_error):
+                # The server can't be reached, so the rest of the batch would fail too
+                return False
+        return True
+
+    def __wait_for(self, send):
+        """Send a request and wait for it to finish, returning its response and error.
+
+        Arguments:
+        send -- function that sends the request, taking the on_success and on_failure callbacks
+        """
+
+        finished = threading.Event()
+        result = [None, None]
+
+        def succeed(response):
+            result[0] = response
+            finished.set()
+
+        def fail(server_error):
+            result[1] = server_error
+            finished.set()
+
+        send(succeed, fail)
+        finished.wait()
+        return result
+
+    def __finish(self, key, score, response, server_error):
+        """Remove a submitted or rejected score from the queue and pass the result to its callbacks.
+
+        Only the submissions of scores up to the one that was sent are finished,
+        as a higher score may have been queued whilst it was being sent.
+        """
+
+        with self.__condition:
+            submissions = self.__callbacks.get(key, [])
+            finished = self.__pending.get(key, score) <= score
+            if server_error is not None and not (finished and is_permanent_error(server_error)):
+                # Only the first failure is reported, as the score is still queued
+                failed = [submission['on_failure'] for submission in submissions
+                          if submission['on_failure'] is not None and not submission['failure_reported']]
+                for submission in submissions:
+                    submission['failure_reported'] = True
+                done = []
+            else:
+                done = [submission for submission in submissions if submission['score'] <= score]
+                waiting = [submission for submission in submissions if submission['score'] > score]
+                if waiting:
+                    self.__callbacks[key] = waiting
+                else:
+                    self.__callbacks.pop(key, None)
+                if finished:
+                    self.__pending.pop(key, None)
+                    self.__compact()
+                failed = []
+                if server_error is not None:
+                    failed = [submission['on_failure'] for submission in done
+                              if submission['on_failure'] is not None]
+
+        # The callbacks change widgets, so they mustn't be called on the worker thread
+        for on_failure in failed:
+            self.__dispatch(on_failure, server_error)
+        if server_error is None:
+            for submission in done:
+                if submission['on_success'] is not None:
+                    self.__dispatch(submission['on_success'], self.__get_response(submission, response))
+
+    def __get_response(self, submission, response):
+        """Return a submission's response, with the previous best as it was when its score was queued."""
+
+        previous_best = response['previous_best']
+        queued_best = submission['queued_best']
+        if previous_best is None or (queued_best is not None and queued_best > previous_best):
+            previous_best = queued_best
+        return dict(response, previous_best=previous_best)
+
+    def __append(self, player, level, score):
+        """Append a score to the journal. The queue must already be locked."""
+
+        if self.path is None:
+            return
+        try:
+            with open(self.path, 'a') as journal:
+                journal.write(json.dumps([player, level, score]) + '\n')
+                journal.flush()
+                os.fsync(journal.fileno())
+        except (IOError, OSError):
+            # The score is still queued in memory, so it is only lost if the app closes
+            pass
+
+    def __compact(self):
+        """Rewrite the journal with only the queued scores. The queue must already be locked."""
+
+        if self.path is None:
+            return
+        temporary_path = self.path + '.tmp'
+        try:
+            with open(temporary_path, 'w') as journal:
+                for (player, level), score in sorted(self.__pending.items()):
+                    journal.write(json.dumps([player, level, score]) + '\n')
+                journal.flush()
+                os.fsync(journal.fileno())
+            # os.replace overwrites on every platform, but doesn't exist in Python 2
+            getattr(os, 'replace', os.rename)(temporary_path, self.path)
+        except (IOError, OSError):
+            pass
+
+
+# The queue shared by the module's functions, created when it is first used
+_queue = None
+
+
+def get_queue():
+    """Return the ScoreQueue that the module's functions use."""
+
+    global _queue
+    if _queue is None:
+        _queue = ScoreQueue()
+    return _queue
+
+
+def set_journal_file(path):
+    """Keep the queue in a journal file, and queue the scores that were left in it.
+
+    Arguments:
+    path -- the journal file, such as one in the app's user data directory
+    """
+
+    queue = get_queue()
+    queue.path = path
+    queue.load()
+
+
+def is_permanent_error(server_error):
+    """Return whether the server rejected a request in a way that trying it again won't fix.
+
+    Arguments:
+    server_error -- the error.ServerError a request failed with
+    """
+
+    return isinstance(server_error, error.ServerStatusError) and 400 <= server_error.status < 500
+
+
+def submit_score(player, level, score, on_success=None, on_failure=None):
+    """Queue a score to be submitted to the server in the background.
+
+    See ScoreQueue.submit.
+
+    Arguments:
+    player -- the name of the player as a string
+    level -- the level number to submit the score to
+    score -- the score to submit
+    on_success -- function to call with the response once the score is submitted
+    on_failure -- function to call with the error if the first attempt fails
+    """
+
+    get_queue().submit(player, level, score, on_success, on_failure)
@@ -0,0 +1,374 @@
+"""Run a local stand-in for the score server.
+
+This file contains a server that implements the same endpoints as the
+server the game uses for players and high scores, with the players and
+scores kept in an SQLite database. It can be started in-process, for example
+by tests and load runs, or run from the command line and used by pointing
+the game at it with the HOTROD_SERVER_URL environment variable:
+
+python score_server.py --port 8130 --database scores.db
+HOTROD_SERVER_URL=http://127.0.0.1:8130 python main.py
+
+Classes:
+ScoreStore -- class for storing players and scores
+ScoreRequestHandler(BaseHTTPRequestHandler) -- class for answering requests to the endpoints
+ScoreServer(ThreadingMixIn, HTTPServer) -- class for the server itself
+"""
+
+# Standard python libraries
+import argparse
+import json
+import sqlite3
+import threading
+
+try:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urlparse import parse_qs, urlsplit
+except ImportError:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import parse_qs, urlsplit
+
+try:
+    # Player names in JSON are unicode strings in Python 2
+    TEXT_TYPE = unicode
+except NameError:
+    TEXT_TYPE = str
+
+
+# Number of scores in a level's high score table
+HIGH_SCORE_COUNT = 10
+# Address the server listens on when run from the command line
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8130
+
+# The database's tables. Scores are read by level in score order far more
+# than they're written, so the index on (level, score DESC) serves the high
+# scores, and the unique key keeps one best score per player and level.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    name TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS scores (
+    player TEXT NOT NULL,
+    level INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    UNIQUE (player, level)
+);
+CREATE INDEX IF NOT EXISTS scores_by_level ON scores (level, score DESC, player);
+"""
+
+
+class ScoreStore(object):
+
+    """Store players and their best score on each level in an SQLite database.
+
+    Each player has one row per level, enforced by a unique (player, level)
+    key, and the high scores are read from an index on (level, score DESC),
+    so a level's table is found without looking at other levels' scores.
+    All methods are atomic, so the store can be shared by the server's
+    request threads.
+
+    Public methods:
+    add_user -- add a new player
+    get_user -- return a player's name if they exist
+    get_best -- return a player's best score on a level
+    get_scores -- return the high scores of a level
+    submit_score -- add a player's first score on a level
+    update_score -- replace a player's score on a level
+    submit_if_best -- store a score if it is the player's best, returning the previous best and high scores
+    submit_batch -- store many scores that are the players' bests, returning the previous bests and high scores
+    close -- close the database
+    """
+
+    def __init__(self, database=':memory:'):
+        """Create a store, creating its tables if they don't exist.
+
+        Arguments:
+        database -- the path of the database file, or ':memory:' to keep it in memory
+        """
+
+        self.__lock = threading.Lock()
+        # The connection is shared by the request threads, which take turns using the lock
+        self.__database = sqlite3.connect(database, check_same_thread=False)
+        with self.__database:
+            self.__database.executescript(SCHEMA)
+
+    def add_user(self, player):
+        """Add a new player and return their name, or None if they already exist."""
+
+        with self.__lock, self.__database:
+            try:
+                self.__database.execute('INSERT INTO players (name) VALUES (?)', (player,))
+            except sqlite3.IntegrityError:
+                return None
+            return player
+
+    def get_user(self, player):
+        """Return the player's name if they exist, or None."""
+
+        with self.__lock:
+            row = self.__database.execute('SELECT name FROM players WHERE name = ?', (player,)).fetchone()
+        return row[0] if row is not None else None
+
+    def get_best(self, player, level):
+        """Return the player's best score on the level, or None if they have no score."""
+
+        with self.__lock:
+            return self.__get_best(player, level)
+
+    def get_scores(self, level):
+        """Return a list of the [name, level, score] entries of the level's high scores."""
+
+        with self.__lock:
+            return self.__get_high_scores(level)
+
+    def submit_score(self, player, level, score):
+        """Add the player's first score on the level, and return whether it was added."""
+
+        with self.__lock, self.__database:
+            try:
+                self.__database.execute('INSERT INTO scores (player, level, score) VALUES (?, ?, ?)',
+                                        (player, level, score))
+            except sqlite3.IntegrityError:
+                return False
+            return True
+
+    def update_score(self, player, level, score):
+        """Replace the player's score on the level, and return whether it was replaced."""
+
+        with self.__lock, self.__database:
+            cursor = self.__database.execute('UPDATE scores SET score = ? WHERE player = ? AND level = ?',
+                                             (score, player, level))
+            return cursor.rowcount > 0
+
+    def submit_if_best(self, player, level, score):
+        """Store the score if it is the player's best on the level.
+
+        A dictionary is returned containing the player's previous best score,
+        or None, and the level's high scores after the score is stored.
+        Both happen at once, so another submission can't come in between.
+        """
+
+        with self.__lock, self.__database:
+            previous_best = self.__store_if_best(player, level, score)
+            return {'previous_best': previous_best,
+                    'high_scores': self.__get_high_scores(level)}
+
+    def submit_batch(self, entries):
+        """Store each of a list of (player, level, score) entries if it is the player's best.
+
+        A dictionary is returned containing a list of the previous best score
+        before each entry, or None, and a list of [level, high scores] pairs for
+        each level that was submitted to. All of the entries are stored at once.
+        """
+
+        with self.__lock, self.__database:
+            previous_bests = [self.__store_if_best(player, level, score) for player, level, score in entries]
+            levels = sorted(set(level for player, level, score in entries))
+            return {'previous_best': previous_bests,
+                    'high_scores': [[level, self.__get_high_scores(level)] for level in levels]}
+
+    def close(self):
+        """Close the database."""
+
+        with self.__lock:
+            self.__database.close()
+
+    def __store_if_best(self, player, level, score):
+        """Store the score if it is the player's best, and return their previous best.
+
+        The store must already be locked, and in a transaction.
+        """
+
+        previous_best = self.__get_best(player, level)
+        if previous_best is None:
+            self.__database.execute('INSERT INTO scores (player, level, score) VALUES (?, ?, ?)',
+                                    (player, level, score))
+        elif score > previous_best:
+            self.__database.execute('UPDATE scores SET score = ? WHERE player = ? AND level = ?',
+                                    (score, player, level))
+        return previous_best
+
+    def __get_best(self, player, level):
+        """Return the player's best score on the level, or None. The store must already be locked."""
+
+        row = self.__database.execute('SELECT score FROM scores WHERE player = ? AND level = ?',
+                                      (player, level)).fetchone()
+        return row[0] if row is not None else None
+
+    def __get_high_scores(self, level):
+        """Return the level's high scores. The store must already be locked."""
+
+        rows = self.__database.execute('SELECT player, level, score FROM scores WHERE level = ? '
+                                       'ORDER BY score DESC, player LIMIT ?', (level, HIGH_SCORE_COUNT))
+        return [list(row) for row in rows]
+
+
+class ScoreRequestHandler(BaseHTTPRequestHandler):
+
+    """Answer requests to the score server's endpoints.
+
+    Responses are JSON, and connections are kept alive between requests.
+    The handler's server must have a store attribute containing a ScoreStore.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    # The headers and body are written separately, so with Nagle's algorithm the body
+    # waits for the client's delayed acknowledgement of the headers on a kept-alive connection
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        """Answer a request to one of the endpoints."""
+
+        self.__answer(None)
+
+    def do_POST(self):
+        """Answer a request with a body to one of the endpoints."""
+
+        length = int(self.headers.get('Content-Length', 0))
+        self.__answer(self.rfile.read(length).decode('utf-8'))
+
+    def log_message(self, format, *args):
+        """Don't log every request."""
+
+        pass
+
+    def __answer(self, body):
+        """Call the requested endpoint and send its result."""
+
+        address = urlsplit(self.path)
+        endpoint = address.path.rsplit('/', 1)[-1]
+        parameters = dict((key, values[0]) for key, values in parse_qs(address.query).items())
+
+        try:
+            result = self.__call_endpoint(endpoint, parameters, body)
+        except (KeyError, ValueError, TypeError, AttributeError):
+            self.__respond(400, {'error': 'bad request'})
+        else:
+            if result is NotImplemented:
+                self.__respond(404, {'error': 'unknown endpoint'})
+            else:
+                self.__respond(200, result)
+
+    def __call_endpoint(self, endpoint, parameters, body):
+        """Return the result of an endpoint, or NotImplemented if it doesn't exist."""
+
+        store = self.server.store
+        if endpoint == 'adduser.py':
+            return store.add_user(parameters['player'])
+        elif endpoint == 'getuser.py':
+            return store.get_user(parameters['player'])
+        elif endpoint == 'getbest.py':
+            return store.get_best(parameters['player'], int(parameters['level']))
+        elif endpoint == 'getscores.py':
+            return store.get_scores(int(parameters['level']))
+        elif endpoint == 'submitscore.py':
+            return store.submit_score(parameters['player'], int(parameters['level']), int(parameters['score']))
+        elif endpoint == 'updatescore.py':
+            return store.update_score(parameters['player'], int(parameters['level']), int(parameters['score']))
+        elif endpoint == 'submitbest.py':
+            return store.submit_if_best(parameters['player'], int(parameters['level']), int(parameters['score']))
+        elif endpoint == 'submitbatch.py':
+            return store.submit_batch(self.__parse_batch(body))
+        return NotImplemented
+
+    def __parse_batch(self, body):
+        """Return the list of (player, level, score) entries in a body of JSON lines.
+
+        A ValueError or TypeError is raised if a line isn't a [player, level, score] list.
+        """
+
+        if body is None:
+            raise ValueError('submitbatch.py needs a body')
+        entries = []
+        for line in body.splitlines():
+            if line.strip():
+                entry = json.loads(line)
+                if not isinstance(entry, list):
+                    raise TypeError('batch line is not a list: %r' % line)
+                player, level, score = entry
+                # Anything else would be turned into a name, or not stored at all, by SQLite
+                if not isinstance(player, TEXT_TYPE):
+                    raise TypeError('player name is not a string: %r' % line)
+                entries.append((player, int(level), int(score)))
+        return entries
+
+    def __respond(self, status, result):
+        """Send a JSON response."""
+
+        body = json.dumps(result).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class ScoreServer(ThreadingMixIn, HTTPServer):
+
+    """Serve the score endpoints, answering each connection on its own thread.
+
+    Attributes:
+    store -- the ScoreStore the endpoints use
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, store=None):
+        """Create a server listening on the given (host, port) address.
+
+        Arguments:
+        address -- tuple of the host and port to listen on, where port 0 picks a free port
+        store -- the ScoreStore to use, or None for a new empty store
+        """
+
+        HTTPServer.__init__(self, address, ScoreRequestHandler)
+        self.store = store if store is not None else ScoreStore()
+
+    def get_base_url(self):
+        """Return the address of the server for a server.ScoreClient."""
+
+        host, port = self.server_address[:2]
+        return 'http://%s:%d' % (host, port)
+
+
+def start_server(host=DEFAULT_HOST, port=0, store=None):
+    """Start a server on a background thread and return it.
+
+    The server should be stopped with its shutdown method.
+
+    Arguments:
+    host -- the host to listen on
+    port -- the port to listen on, or 0 to pick a free port
+    store -- the ScoreStore to use, or None for a new empty store
+    """
+
+    score_server = ScoreServer((host, port), store)
+    thread = threading.Thread(target=score_server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return score_server
+
+
+def main():
+    """Run a server from the command line until it is interrupted."""
+
+    parser = argparse.ArgumentParser(description="Run a local Hotrod the Beetle score server.")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="host to listen on")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="port to listen on")
+    parser.add_argument('--database', default=':memory:',
+                        help="SQLite database file to keep the scores in (default: in memory)")
+    options = parser.parse_args()
+
+    score_server = ScoreServer((options.host, options.port), ScoreStore(options.database))
+    print('Serving scores on ' + score_server.get_base_url())
+    try:
+        score_server.serve_forever()
+    except KeyboardInterrupt:
+        score_server.server_close()
+
+
+if __name__ == '__main__':
+    main()
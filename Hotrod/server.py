@@ -1,76 +1,787 @@
 """Contain functions for accessing the server.
 
 This module contains functions for accessing the server that
-handles the database of players and high scores.
+handles the database of players and high scores. Requests don't block:
+they are sent by a small pool of worker threads, each of which keeps its
+connection to the server alive between requests, so independent requests
+are sent at the same time. The result of a request is passed to a callback
+on the Kivy main thread, so callbacks can update widgets directly.
+
+High score tables are kept in a cache, so that a level's table is shown
+straight away when it has been seen before, whilst it is refreshed in the
+background if it is out of date.
+
+Classes:
+ScoreClient -- class for sending requests to the server without blocking
+HighScoreCache -- class for caching the levels' high score tables
 """
 
-from kivy.network.urlrequest import UrlRequest
+# Standard python libraries
+import collections
+import errno
+import json
+import os
+import socket
+import threading
+import time
+
+try:
+    from httplib import BadStatusLine, HTTPConnection, HTTPException
+    from Queue import Queue
+    from urllib import urlencode
+    from urlparse import urlsplit
+except ImportError:
+    from http.client import BadStatusLine, HTTPConnection, HTTPException
+    from queue import Queue
+    from urllib.parse import urlencode, urlsplit
+
+# Own modules
+import error
+
+
+# The address of the server that stores the players and high scores, which
+# can be changed with the HOTROD_SERVER_URL environment variable, for example
+# to use a local score_server
+BASE_URL = os.environ.get('HOTROD_SERVER_URL', 'http://bsccg02.ga.fal.io')
+# Number of connections kept open to the server, and so requests sent at once
+POOL_SIZE = 4
+# Errors from a kept alive connection that mean the server closed it whilst it was idle
+# RemoteDisconnected, raised when the server closes it without responding, is a BadStatusLine
+STALE_CONNECTION_ERRORS = (errno.ECONNRESET, errno.EPIPE)
+# Number of seconds to wait for the server before a request fails
+REQUEST_TIMEOUT = 10
+# Number of seconds a cached high score table is used before it is refreshed
+HIGH_SCORE_TTL = 300
+# Number of levels whose high score tables are kept in the cache
+HIGH_SCORE_CACHE_SIZE = 32
+
+
+def dispatch_on_main_thread(callback, value):
+    """Call a callback with a value on the Kivy main thread.
+
+    This is the default way a ScoreClient returns results, as
+    widgets should only be changed from the main thread.
+
+    Arguments:
+    callback -- the function to call
+    value -- the value to pass to the function
+    """
+
+    from kivy.clock import Clock
+    Clock.schedule_once(lambda dt: callback(value), 0)
+
+
+class ScoreClient(object):
+
+    """Send requests to the server without blocking.
+
+    Requests are put in a queue that is shared by a pool of worker threads.
+    Each worker keeps its own connection to the server open, so that requests
+    don't have to wait for a new connection, and reconnects if the server has
+    closed it. The workers are started when the first request is made.
+
+    Public methods:
+    request -- queue a request to an endpoint of the server
+    close -- stop the workers once the queued requests have been sent
+
+    Attributes:
+    base_url -- the address of the server
+    timeout -- the number of seconds to wait for the server
+    """
+
+    def __init__(self, base_url=BASE_URL, pool_size=POOL_SIZE, timeout=REQUEST_TIMEOUT,
+                 dispatch=dispatch_on_main_thread):
+        """Create a client for a server.
+
+        Arguments:
+        base_url -- the address of the server
+        pool_size -- the number of connections to keep open to the server
+        timeout -- the number of seconds to wait for the server
+        dispatch -- function that calls a callback with a result, on the thread that should handle it
+        """
+
+        self.base_url = base_url
+        self.timeout = timeout
+        address = urlsplit(base_url)
+        self.__host = address.hostname
+        self.__port = address.port
+        self.__path = address.path.rstrip('/')
+
+        self.__pool_size = pool_size
+        self.__dispatch = dispatch
+        self.__requests = Queue()
+        self.__workers = []
+        self.__lock = threading.Lock()
+
+    def request(self, endpoint, parameters, on_success=None, on_failure=None, body=None,
+                content_type='application/json', timeout=None):
+        """Queue a request to an endpoint of the server.
+
+        The response is decoded from JSON if possible and passed to on_success.
+        If the request fails, an error.ServerError is passed to on_failure instead.
+        Requests with a body are sent as POST requests.
+
+        Arguments:
+        endpoint -- the name of the server script, such as 'getscores.py'
+        parameters -- dictionary of the query string parameters
+        on_success -- function to call with the response
+        on_failure -- function to call with the error if the request fails
+        body -- string to send as the body of the request, or None
+        content_type -- the media type of the body
+        timeout -- the number of seconds to wait for the server, or None for the client's timeout
+        """
+
+        self.__start_workers()
+        path = self.__path + '/' + endpoint
+        if parameters:
+            path = path + '?' + urlencode(sorted(parameters.items()))
+        self.__requests.put((path, body, content_type, timeout or self.timeout, on_success, on_failure))
+
+    def close(self):
+        """Stop the workers once the queued requests have been sent."""
+
+        with self.__lock:
+            for worker in self.__workers:
+                self.__requests.put(None)
+            self.__workers = []
+
+    def __start_workers(self):
+        """Start the worker threads if they haven't been started."""
+
+        with self.__lock:
+            while len(self.__workers) < self.__pool_size:
+                worker = threading.Thread(target=self.__work)
+                # Workers shouldn't stop the app from closing
+                worker.daemon = True
+                worker.start()
+                self.__workers.append(worker)
+
+    def __work(self):
+        """Send queued requests over a persistent connection until the client is closed."""
+
+        connection = None
+        while True:
+            queued_request = self.__requests.get()
+            if queued_request is None:
+                break
+
+            path, body, content_type, timeout, on_success, on_failure = queued_request
+            try:
+                connection, result = self.__send(connection, path, body, content_type, timeout)
+            except error.ServerError as server_error:
+                connection = None
+                if on_failure is not None:
+                    self.__dispatch(on_failure, server_error)
+            else:
+                if on_success is not None:
+                    self.__dispatch(on_success, result)
+
+        if connection is not None:
+            connection.close()
+
+    def __send(self, connection, path, body, content_type, timeout):
+        """Send a request and return the connection used and the decoded response.
+
+        If a connection that was kept alive turns out to have been closed by
+        the server whilst it was idle, the request is tried once more on a new
+        connection. Any other failure, including a timeout, isn't retried, as
+        the server may already have acted on the request.
+        An error.ServerError is raised if the request fails.
+
+        Arguments:
+        connection -- the worker's open connection, or None
+        path -- the path and query string to request
+        body -- string to send as the body of the request, or None
+        content_type -- the media type of the body
+        timeout -- the number of seconds to wait for the server
+        """
+
+        reused = connection is not None
+        while True:
+            if connection is None:
+                connection = HTTPConnection(self.__host, self.__port, timeout=timeout)
+            else:
+                # The connection may have been opened for a request with a different timeout
+                connection.timeout = timeout
+                if connection.sock is not None:
+                    connection.sock.settimeout(timeout)
+            response = None
+            try:
+                if body is None:
+                    connection.request('GET', path)
+                else:
+                    connection.request('POST', path, body, {'Content-Type': content_type})
+                response = connection.getresponse()
+                data = response.read()
+            except (socket.error, HTTPException) as request_error:
+                connection.close()
+                connection = None
+                if reused and response is None and self.__is_stale_connection_error(request_error):
+                    reused = False
+                    continue
+                raise error.ServerError(path, str(request_error))
+
+            if response.status != 200:
+                connection.close()
+                raise error.ServerStatusError(path, response.status)
+            return connection, self.__decode(data)
+
+    def __is_stale_connection_error(self, request_error):
+        """Return whether an error means the server closed the connection before responding."""
+
+        if isinstance(request_error, socket.timeout):
+            return False
+        return (isinstance(request_error, BadStatusLine) or
+                getattr(request_error, 'errno', None) in STALE_CONNECTION_ERRORS)
+
+    def __decode(self, data):
+        """Return the response decoded from JSON, or as text if it isn't JSON."""
+
+        text = data.decode('utf-8')
+        try:
+            return json.loads(text)
+        except ValueError:
+            return text
+
+
+class HighScoreCache(object):
+
+    """Cache the levels' high score tables.
+
+    A cached table is passed to the caller straight away. If it is older than
+    the time to live, it is also refreshed from the server in the background,
+    and the caller is given the new table when it arrives if it has changed.
+    Only one refresh of a level is sent at a time, however many callers ask
+    for it. The least recently used levels are dropped when the cache is full.
+    If the cache has a file, it is saved whenever a table is stored, so that
+    the tables survive the app being closed.
+
+    Public methods:
+    get -- pass a level's high scores to a callback, refreshing them if needed
+    peek -- return a level's cached high scores without refreshing them
+    prefetch -- refresh a level's high scores in the background if needed
+    store -- store a level's high scores
+    invalidate -- mark a level's high scores as out of date
+    load -- load the cache from its file
+
+    Attributes:
+    ttl -- the number of seconds a table is used before it is refreshed
+    capacity -- the number of levels whose tables are kept
+    path -- the file the cache is saved to, or None to keep it in memory
+    """
+
+    def __init__(self, client, ttl=HIGH_SCORE_TTL, capacity=HIGH_SCORE_CACHE_SIZE, path=None,
+                 clock=time.time):
+        """Create an empty cache.
+
+        Arguments:
+        client -- the ScoreClient to refresh the tables with
+        ttl -- the number of seconds a table is used before it is refreshed
+        capacity -- the number of levels whose tables are kept
+        path -- the file the cache is saved to, or None to keep it in memory
+        clock -- function returning the current time in seconds
+        """
+
+        self.ttl = ttl
+        self.capacity = capacity
+        self.path = path
+        self.__client = client
+        self.__clock = clock
+        self.__lock = threading.Lock()
+        # (time fetched, high scores) keyed by level, least recently used first
+        self.__entries = collections.OrderedDict()
+        # Callbacks waiting on each level's refresh that is in flight
+        self.__waiting = {}
+        # Increased when a level is invalidated, so refreshes sent before are ignored
+        self.__versions = {}
+
+    def get(self, level, on_success, on_failure=None):
+        """Pass a level's high scores to on_success, refreshing them if needed.
+
+        If the level's table is cached, it is passed to on_success straight away.
+        If it isn't cached or is out of date, it is requested from the server
+        and passed to on_success when it arrives, unless it is the same as the
+        cached table. on_failure is only called if there was no table to show.
+
+        Arguments:
+        level -- the level number to get the scores of
+        on_success -- function to call with the high scores
+        on_failure -- function to call with the error.ServerError if the request fails
+        """
+
+        with self.__lock:
+            entry = self.__entries.get(level)
+            if entry is not None:
+                self.__entries.pop(level)
+                self.__entries[level] = entry
+            fresh = entry is not None and self.__clock() - entry[0] < self.ttl
+
+        if entry is not None:
+            on_success(entry[1])
+            if fresh:
+                return
+            # The stale table has already been shown, so a failed refresh is ignored
+            on_failure = None
+        self.__refresh(level, on_success, on_failure, entry)
+
+    def peek(self, level):
+        """Return a level's cached high scores, or None if they aren't cached.
+
+        The high scores are returned even if they are out of date,
+        and aren't refreshed.
+
+        Arguments:
+        level -- the level number to get the scores of
+        """
+
+        with self.__lock:
+            entry = self.__entries.get(level)
+        return entry[1] if entry is not None else None
+
+    def prefetch(self, level):
+        """Refresh a level's high scores in the background if they aren't cached or are out of date.
+
+        Arguments:
+        level -- the level number to get the scores of
+        """
+
+        with self.__lock:
+            entry = self.__entries.get(level)
+            if entry is not None and self.__clock() - entry[0] < self.ttl:
+                return
+        self.__refresh(level, lambda high_scores: None, None, entry)
+
+    def store(self, level, high_scores):
+        """Store a level's high scores, fetched just now.
+
+        Arguments:
+        level -- the level number the scores are of
+        high_scores -- list of the [name, level, score] entries of the level's high scores
+        """
+
+        with self.__lock:
+            self.__store(level, high_scores)
+            snapshot = self.__snapshot()
+        self.__save(snapshot)
+
+    def invalidate(self, level):
+        """Mark a level's high scores as out of date.
+
+        This should be called when the player's own score changes the level's
+        table. The next request for the level goes to the server, and refreshes
+        that were already in flight aren't stored.
+
+        Arguments:
+        level -- the level number whose scores have changed
+        """
+
+        with self.__lock:
+            self.__versions[level] = self.__versions.get(level, 0) + 1
+            self.__entries.pop(level, None)
+            snapshot = self.__snapshot()
+        self.__save(snapshot)
+
+    def load(self):
+        """Load the cache from its file, if it has one and it can be read."""
+
+        if self.path is None:
+            return
+        try:
+            with open(self.path) as cache_file:
+                saved = json.load(cache_file)
+        except (IOError, OSError, ValueError):
+            return
+
+        with self.__lock:
+            for level, fetched_at, high_scores in saved:
+                self.__entries[level] = (fetched_at, high_scores)
+            while len(self.__entries) > self.capacity:
+                self.__entries.popitem(last=False)
+
+    def __refresh(self, level, on_success, on_failure, entry):
+        """Request a level's high scores, unless a request for them is already in flight."""
+
+        with self.__lock:
+            waiting = self.__waiting.get(level)
+            self.__waiting.setdefault(level, []).append((on_success, on_failure, entry))
+            if waiting is not None:
+                return
+            version = self.__versions.get(level, 0)
+
+        self.__client.request('getscores.py', {'level': level},
+                              lambda high_scores: self.__finish_refresh(level, version, high_scores),
+                              lambda server_error: self.__fail_refresh(level, server_error))
+
+    def __finish_refresh(self, level, version, high_scores):
+        """Store a refreshed table and pass it to the callbacks waiting on it."""
+
+        with self.__lock:
+            waiting = self.__waiting.pop(level, [])
+            stored = self.__versions.get(level, 0) == version
+            if stored:
+                self.__store(level, high_scores)
+                snapshot = self.__snapshot()
+        if stored:
+            self.__save(snapshot)
+
+        for on_success, on_failure, entry in waiting:
+            if entry is None or entry[1] != high_scores:
+                on_success(high_scores)
+
+    def __fail_refresh(self, level, server_error):
+        """Pass a failed refresh's error to the callbacks waiting on it."""
+
+        with self.__lock:
+            waiting = self.__waiting.pop(level, [])
+        for on_success, on_failure, entry in waiting:
+            if on_failure is not None:
+                on_failure(server_error)
+
+    def __store(self, level, high_scores):
+        """Store a table, dropping the least recently used. The cache must already be locked."""
+
+        self.__entries.pop(level, None)
+        self.__entries[level] = (self.__clock(), high_scores)
+        while len(self.__entries) > self.capacity:
+            self.__entries.popitem(last=False)
+
+    def __snapshot(self):
+        """Return the entries to be saved. The cache must already be locked."""
+
+        return [[level, fetched_at, high_scores]
+                for level, (fetched_at, high_scores) in self.__entries.items()]
+
+    def __save(self, snapshot):
+        """Save the entries to the cache's file, if it has one.
+
+        The entries are written to a temporary file first, so that
+        the cache file is never left half written.
+        """
+
+        if self.path is None:
+            return
+        temporary_path = self.path + '.tmp'
+        try:
+            with open(temporary_path, 'w') as cache_file:
+                json.dump(snapshot, cache_file)
+            # os.replace overwrites on every platform, but doesn't exist in Python 2
+            getattr(os, 'replace', os.rename)(temporary_path, self.path)
+        except (IOError, OSError):
+            # The cache is only an optimisation, so the game carries on without saving it
+            pass
+
+
+# The client and cache shared by the module's functions, created when first used
+_client = None
+_high_score_cache = None
+# The players' best scores, keyed by (player, level), as last heard from the server
+_best_scores = {}
+
+
+def get_client():
+    """Return the ScoreClient that the module's functions use."""
 
+    global _client
+    if _client is None:
+        _client = ScoreClient()
+    return _client
 
-def get_best_score(player, level):
+
+def set_base_url(base_url):
+    """Send the module's requests to the server at a different address.
+
+    The cached high scores and best scores are forgotten, as they belong
+    to the old server. This should be called before any requests are made,
+    as requests that are already queued are still sent to the old server.
+
+    Arguments:
+    base_url -- the address of the server, such as 'http://127.0.0.1:8130'
+    """
+
+    global _client, _high_score_cache
+    if _client is not None:
+        _client.close()
+    _client = ScoreClient(base_url)
+    _high_score_cache = None
+    _best_scores.clear()
+
+
+def get_high_score_cache():
+    """Return the HighScoreCache that the module's functions use."""
+
+    global _high_score_cache
+    if _high_score_cache is None:
+        _high_score_cache = HighScoreCache(get_client())
+    return _high_score_cache
+
+
+def set_high_score_cache_file(path):
+    """Save the high score cache to a file, and load the tables already saved in it.
+
+    Arguments:
+    path -- the file to keep the cache in, such as one in the app's user data directory
+    """
+
+    cache = get_high_score_cache()
+    cache.path = path
+    cache.load()
+
+
+def add_user(player, on_success, on_failure=None, timeout=None):
+    """Request that a new player be added to the database.
+
+    The player's name is passed to on_success if they were added,
+    or None if a player with that name already exists.
+
+    Arguments:
+    player -- the name of the player as a string
+    on_success -- function to call with the player's name or None
+    on_failure -- function to call with the error.ServerError if the request fails
+    timeout -- the number of seconds to wait for the server, or None for the client's timeout
+    """
+
+    get_client().request('adduser.py', {'player': player}, on_success, on_failure, timeout=timeout)
+
+
+def get_user(player, on_success, on_failure=None, timeout=None):
+    """Request an existing player from the database.
+
+    The player's name is passed to on_success if they exist, or None if not.
+
+    Arguments:
+    player -- the name of the player as a string
+    on_success -- function to call with the player's name or None
+    on_failure -- function to call with the error.ServerError if the request fails
+    timeout -- the number of seconds to wait for the server, or None for the client's timeout
+    """
+
+    get_client().request('getuser.py', {'player': player}, on_success, on_failure, timeout=timeout)
+
+
+def get_best_score(player, level, on_success, on_failure=None):
     """Request the best score for a given player on a given level.
 
     This functions sends a GET request to the server to retrieve the best score
-    for a given player on a given level. The function returns the request for the
-    thing that called it to handle.
+    for a given player on a given level. The best score, or None if the player
+    has no score on the level, is passed to on_success. It is also kept so that
+    it can be returned by get_cached_best_score.
 
     Arguments:
     player -- the name of the player as a string
     level -- the level number top get the score from
+    on_success -- function to call with the best score
+    on_failure -- function to call with the error.ServerError if the request fails
+    """
+
+    def store_best_score(best_score):
+        _best_scores[(player, level)] = best_score
+        on_success(best_score)
+
+    get_client().request('getbest.py', {'player': player, 'level': level}, store_best_score, on_failure)
+
+
+def get_cached_best_score(player, level):
+    """Return the best score last received for a player on a level.
+
+    None is returned if the player has no score on the level. A KeyError
+    is raised if the player's best score on the level hasn't been received.
+
+    Arguments:
+    player -- the name of the player as a string
+    level -- the level number to get the score from
     """
 
-    request = UrlRequest('http://bsccg02.ga.fal.io/getbest.py?player=' + player + '&level=' + str(level))
-    return request
+    return _best_scores[(player, level)]
+
+
+def get_cached_high_scores(level):
+    """Return the cached high scores for the level, or None if they aren't cached.
+
+    Arguments:
+    level -- the level number to get the scores of
+    """
 
+    return get_high_score_cache().peek(level)
 
-def get_high_scores(level):
+
+def prefetch_scores(player, level):
+    """Request the level's high scores and the player's best score in the background.
+
+    This function should be called during gameplay, so that the scores
+    are already known when the game over screen is shown. The high scores
+    are only requested if the cached ones are missing or out of date.
+
+    Arguments:
+    player -- the name of the player as a string
+    level -- the level number to get the scores of
+    """
+
+    get_high_score_cache().prefetch(level)
+    get_best_score(player, level, lambda best_score: None)
+
+
+def get_high_scores(level, on_success, on_failure=None):
     """Request the high scores for the level.
 
     This functions sends a GET request to the server to retrieve the top 10
-    high scores for the given level. The function returns the request for the
-    thing that called it to handle.
-
+    high scores for the given level. A list of [name, level, score] entries
+    is passed to on_success. If the level's high scores are cached they are
+    passed to on_success straight away, and if they are out of date they are
+    passed to it again once they have been refreshed and have changed.
 
     Arguments:
     level -- the level number to get the scores of
+    on_success -- function to call with the high scores
+    on_failure -- function to call with the error.ServerError if the request fails
     """
 
-    request = UrlRequest('http://bsccg02.ga.fal.io/getscores.py?level=' + str(level))
-    return request
+    get_high_score_cache().get(level, on_success, on_failure)
 
 
-def submit_high_score(player, level, score):
+def submit_high_score(player, level, score, on_success=None, on_failure=None):
     """Request that a score be added to the database.
 
     This functions sends a GET request to the server to add a score for the
-    given player and level to the database. The function returns the request for the
-    thing that called it to handle.
+    given player and level to the database. The level's cached high scores
+    are invalidated once the score is added.
 
     Arguments:
     player -- the name of the player as a string
     level -- the level number to submit the score to
     score -- the score to submit
+    on_success -- function to call with the response once the score is added
+    on_failure -- function to call with the error.ServerError if the request fails
     """
 
-    request = UrlRequest('http://bsccg02.ga.fal.io/submitscore.py?player=' + player +
-                   '&level=' + str(level) + '&score=' + str(score))
-    return request
+    get_client().request('submitscore.py', {'player': player, 'level': level, 'score': score},
+                         _invalidating(level, on_success), on_failure)
 
 
-def update_high_score(player, level, score):
+def update_high_score(player, level, score, on_success=None, on_failure=None):
     """Request that a score be updated in the database.
 
     This functions sends a GET request to the server to update the high score
-    for the given player on a given level. The function returns the request for the
-    thing that called it to handle.
+    for the given player on a given level. The level's cached high scores
+    are invalidated once the score is updated.
 
     Arguments:
     player -- the name of the player as a string
     level -- the level number to update the score of
     score -- the new score to submit
+    on_success -- function to call with the response once the score is updated
+    on_failure -- function to call with the error.ServerError if the request fails
+    """
+
+    get_client().request('updatescore.py', {'player': player, 'level': level, 'score': score},
+                         _invalidating(level, on_success), on_failure)
+
+
+def submit_if_best(player, level, score, on_success, on_failure=None):
+    """Request that a score be stored if it is the player's best on the level.
+
+    This function sends a single GET request that checks the player's best
+    score and stores the new score if it is better, without anything else
+    happening in between on the server. A dictionary containing the player's
+    previous best score ('previous_best', or None if they had no score) and the
+    level's top 10 high scores after the score was stored ('high_scores') is
+    passed to on_success. The high scores replace the level's cached ones.
+
+    Arguments:
+    player -- the name of the player as a string
+    level -- the level number to submit the score to
+    score -- the score to submit
+    on_success -- function to call with the previous best and high scores
+    on_failure -- function to call with the error.ServerError if the request fails
     """
 
-    request = UrlRequest('http://bsccg02.ga.fal.io/updatescore.py?player=' + player +
-               '&level=' + str(level) + '&score=' + str(score))
-    return request
+    def store_high_scores(response):
+        get_high_score_cache().store(level, response['high_scores'])
+        previous_best = response['previous_best']
+        _best_scores[(player, level)] = score if previous_best is None else max(score, previous_best)
+        on_success(response)
+
+    get_client().request('submitbest.py', {'player': player, 'level': level, 'score': score},
+                         store_high_scores, on_failure)
+
+
+def submit_if_best_separately(player, level, score, on_success, on_failure=None):
+    """Request that a score be stored if it is the player's best on the level, one step at a time.
+
+    This function does the same as submit_if_best for servers that don't
+    have submitbest.py, using the getbest.py, submitscore.py or updatescore.py
+    and getscores.py requests in turn. Unlike submit_if_best, other requests
+    can be handled by the server in between them. The same dictionary as
+    submit_if_best's is passed to on_success.
+
+    Arguments:
+    player -- the name of the player as a string
+    level -- the level number to submit the score to
+    score -- the score to submit
+    on_success -- function to call with the previous best and high scores
+    on_failure -- function to call with the error.ServerError if a request fails
+    """
+
+    def submit(previous_best):
+        def request_high_scores(response=None):
+            get_client().request('getscores.py', {'level': level}, store_high_scores, on_failure)
+
+        def store_high_scores(high_scores):
+            get_high_score_cache().store(level, high_scores)
+            _best_scores[(player, level)] = score if previous_best is None else max(score, previous_best)
+            on_success({'previous_best': previous_best, 'high_scores': high_scores})
+
+        if previous_best is None:
+            submit_high_score(player, level, score, request_high_scores, on_failure)
+        elif score > previous_best:
+            update_high_score(player, level, score, request_high_scores, on_failure)
+        else:
+            request_high_scores()
+
+    get_best_score(player, level, submit, on_failure)
+
+
+def submit_scores(entries, on_success, on_failure=None):
+    """Request that many scores be stored if they are the players' bests, in one request.
+
+    This function sends a single POST request whose body has one JSON
+    [player, level, score] line per score, so that scores that have built up,
+    for example whilst offline, are submitted together. Each score is handled
+    as by submit_if_best, all at once on the server. A list with a dictionary
+    for each score, in the same order and in the same form as the response
+    passed on by submit_if_best, is passed to on_success. The high scores
+    replace the levels' cached ones.
+
+    Arguments:
+    entries -- list of (player, level, score) tuples to submit
+    on_success -- function to call with the list of results
+    on_failure -- function to call with the error.ServerError if the request fails
+    """
+
+    entries = list(entries)
+    body = ''.join(json.dumps([player, level, score], separators=(',', ':')) + '\n'
+                   for player, level, score in entries)
+
+    def store_high_scores(response):
+        # Each level's high scores are only sent once, however many scores were submitted to it
+        high_scores = dict((level, table) for level, table in response['high_scores'])
+        results = []
+        for (player, level, score), previous_best in zip(entries, response['previous_best']):
+            _best_scores[(player, level)] = score if previous_best is None else max(score, previous_best)
+            results.append({'previous_best': previous_best, 'high_scores': high_scores[level]})
+        for level, table in high_scores.items():
+            get_high_score_cache().store(level, table)
+        on_success(results)
+
+    get_client().request('submitbatch.py', {}, store_high_scores, on_failure,
+                         body=body, content_type='application/x-ndjson')
+
+
+def _invalidating(level, on_success):
+    """Return a callback that invalidates the level's cached high scores before calling on_success."""
+
+    def invalidate(response):
+        get_high_score_cache().invalidate(level)
+        if on_success is not None:
+            on_success(response)
 
+    return invalidate
@@ -0,0 +1,419 @@
+"""Contain a class for running the game's rules headlessly.
+
+This module contains a deterministic simulation of a level that advances
+in fixed-length ticks. It owns the state of the characters, their mode
+timers and the level's pellets, and does not depend on any widgets, so a
+level can be simulated without a window and faster than real time.
+
+Classes:
+Simulation -- class for stepping the state of a level with a fixed timestep
+"""
+
+# Standard python library
+import itertools
+import random
+
+# Own modules
+import actor
+import collectable
+import enemy_engine
+
+
+# Number of ticks the simulation advances per second of game time
+TICK_RATE = 60
+# Maximum number of ticks run to catch up in a single call to advance
+# Any further time is dropped so that a long stall doesn't freeze the game
+MAX_CATCH_UP_TICKS = 10
+# Grid coordinates the player starts from (bottom left corner)
+PLAYER_START_POSITION = (0, 0)
+
+
+class Simulation(object):
+
+    """Store and advance the state of a level with a fixed timestep.
+
+    This class owns the actors, pellets and timers of a level. Real elapsed
+    time is accumulated and consumed in fixed-length ticks, so the game runs
+    at the same speed regardless of frame rate. Timers are measured in ticks
+    rather than on the Kivy clock, which makes a run with a given seed repeatable.
+    Anything outside the simulation, such as sounds and the score, responds
+    to events that the simulation dispatches. The simulation also resolves
+    power-ups through its own events, so that a power pellet pickup is published
+    once and fanned out to the player and every enemy by a single handler.
+
+    Public methods:
+    bind -- register callbacks for simulation events
+    unbind -- remove callbacks registered for simulation events
+    dispatch -- call the callbacks registered for an event
+    get_time -- return the number of seconds of game time that have been simulated
+    schedule_once -- schedule a callback after a number of seconds of game time
+    unschedule -- cancel a scheduled callback
+    start -- start the enemies' timers at the start of a level
+    reset_after_death -- reset the actors after the player loses a life
+    advance -- run as many ticks as fit in the given real elapsed time
+    step -- run a single tick
+    get_pellet -- return the type of pellet in a cell
+    eat_pellet -- remove the pellet from a cell
+    get_occupants -- return the actors in a cell
+    check_character_collisions -- check if the player has collided with an enemy
+    add_enemy -- add another enemy to the level
+
+    Events:
+    on_pellet_eaten -- (coordinates, pellet_type) a pellet has been eaten
+    on_pellets_cleared -- () the last pellet of the level has been eaten
+    on_power_pellet_eaten -- () a power pellet has been eaten, before its effects are applied
+    on_powerup_activated -- () the player has collected a power pellet
+    on_powered_up -- (powered_up) the player's powered up state has changed
+    on_enemy_killed -- (enemy) the player has killed an enemy
+    on_player_killed -- () an enemy has killed the player
+
+    Attributes:
+    maze -- the maze.Maze layout of the level
+    settings -- object with the game's difficulty properties, such as a main.HotrodGame
+    random -- random.Random used for all of the simulation's random choices
+    tick_length -- the length of a tick in seconds
+    tick_count -- the number of ticks that have been run
+    alpha -- how far between the last tick and the next the leftover time is, from 0 to 1
+    active -- whether ticks are currently being run
+    pellets -- the collectable.PelletGrid storing the pellets remaining in each cell
+    player -- the actor.PlayerActor
+    red_enemy, pink_enemy, blue_enemy, orange_enemy -- the actor.EnemyActor instances
+    enemies -- list of all enemy actors
+    enemy_engine -- the enemy_engine.EnemyEngine that moves the enemies each tick
+    occupancy -- dictionary of the actors in each occupied cell, keyed by cell id
+    """
+
+    def __init__(self, level_maze, settings, seed=None):
+        """Set up a simulation of a level.
+
+        The pellets are placed and the actors are reset to their start
+        positions, ready for the level to start.
+
+        Arguments:
+        level_maze -- the generated maze.Maze layout of the level
+        settings -- object with the powerup_limit, powerup_length, scatter_length,
+                    chase_length and speed_multiplier difficulty properties
+        seed -- seed for the simulation's random number generator
+        """
+
+        self.maze = level_maze
+        self.settings = settings
+        self.random = random.Random(seed)
+
+        self.tick_length = 1.0 / TICK_RATE
+        self.tick_count = 0
+        self.alpha = 0.0
+        self.active = False
+        self.__accumulator = 0.0
+
+        # Scheduled callbacks mapped to the tick they are due and the order they were scheduled
+        self.__timers = {}
+        self.__timer_order = itertools.count()
+        self.__listeners = {}
+        self.bind(on_power_pellet_eaten=self.__on_power_pellet_eaten,
+                  on_powered_up=self.__on_powered_up)
+
+        self.player = actor.PlayerActor(self)
+        self.player.start_position = PLAYER_START_POSITION
+        self.red_enemy = actor.RedActor(self)
+        self.pink_enemy = actor.PinkActor(self)
+        self.blue_enemy = actor.BlueActor(self)
+        self.orange_enemy = actor.OrangeActor(self)
+        self.enemies = [self.red_enemy, self.pink_enemy, self.blue_enemy, self.orange_enemy]
+        self.enemy_engine = enemy_engine.EnemyEngine(self)
+        self.occupancy = {}
+
+        self.__initialise_pellets()
+        self.__add_powerups()
+        self.__reset_characters()
+
+    def bind(self, **kwargs):
+        """Register callbacks for simulation events.
+
+        Callbacks are passed as keyword arguments named after the event,
+        in the same way as Kivy's bind.
+        """
+
+        for event, callback in kwargs.items():
+            self.__listeners.setdefault(event, []).append(callback)
+
+    def unbind(self, **kwargs):
+        """Remove callbacks registered for simulation events."""
+
+        for event, callback in kwargs.items():
+            if callback in self.__listeners.get(event, []):
+                self.__listeners[event].remove(callback)
+
+    def dispatch(self, event, *args):
+        """Call every callback registered for the given event with the given arguments."""
+
+        for callback in self.__listeners.get(event, [])[:]:
+            callback(*args)
+
+    def get_time(self):
+        """Return the number of seconds of game time that have been simulated."""
+
+        return self.tick_count * self.tick_length
+
+    def schedule_once(self, callback, timeout):
+        """Schedule a callback to be called after a number of seconds of game time.
+
+        The callback is passed the length of a tick when called, in the same
+        way as callbacks scheduled on Kivy's Clock. Scheduling a callback that
+        is already scheduled replaces the earlier schedule.
+
+        Arguments:
+        callback -- the function to call
+        timeout -- the number of seconds of game time to wait
+        """
+
+        due_tick = self.tick_count + int(round(timeout * TICK_RATE))
+        self.__timers[callback] = (due_tick, next(self.__timer_order))
+
+    def unschedule(self, callback):
+        """Cancel a scheduled callback if it is scheduled."""
+
+        self.__timers.pop(callback, None)
+
+    def start(self):
+        """Start the timers for the enemies' mode changes and release.
+
+        This method should be called when the level begins, after
+        the intro music has stopped.
+        """
+
+        for enemy in self.enemies:
+            enemy.start_mode_change_timer()
+            enemy.start_activation_timer()
+
+    def reset_after_death(self):
+        """Reset the actors' positions and reset the scatter timers.
+
+        This method should only be called when the player has lost a life
+        without it resulting in a game over.
+        """
+
+        self.player.initialise()
+        for enemy in self.enemies:
+            enemy.initialise()
+            enemy.start_mode_change_timer()
+
+    def advance(self, dt):
+        """Run as many ticks as fit in the given real elapsed time.
+
+        The elapsed time is accumulated, and leftover time that is less than
+        a tick is carried over to the next call. Ticks are only run whilst the
+        simulation is active. The number of ticks run is returned.
+
+        Arguments:
+        dt -- the real time in seconds since advance was last called
+        """
+
+        self.__accumulator += dt
+        ticks = 0
+        while self.active and self.__accumulator >= self.tick_length:
+            if ticks == MAX_CATCH_UP_TICKS:
+                self.__accumulator = 0.0
+                break
+            self.step()
+            self.__accumulator -= self.tick_length
+            ticks += 1
+
+        self.alpha = min(self.__accumulator / self.tick_length, 1.0)
+        return ticks
+
+    def step(self):
+        """Run a single tick of the simulation.
+
+        Any timers that are due are called first, and then all of
+        the actors are moved, with the enemies moved together by the
+        enemy engine. Collisions are checked once all of the actors
+        have moved.
+        """
+
+        self.tick_count += 1
+        self.__run_timers()
+
+        self.player.move()
+        self.enemy_engine.step()
+
+        self.check_character_collisions()
+
+    def get_pellet(self, coordinates):
+        """Return the collectable.PelletType of the pellet in a cell, or None.
+
+        Arguments:
+        coordinates -- grid coordinates of the cell as a tuple
+        """
+
+        return self.pellets.get_pellet(self.maze.get_cell_id(coordinates))
+
+    def eat_pellet(self, coordinates):
+        """Remove the pellet from a cell.
+
+        This method removes the pellet from the given cell and
+        dispatches its events. If it is a power pellet, on_power_pellet_eaten
+        is dispatched once, and its effects are applied by the simulation's
+        handler. Once the last pellet has been eaten, on_pellets_cleared
+        is dispatched.
+
+        Arguments:
+        coordinates -- grid coordinates of the cell as a tuple
+        """
+
+        pellet_type = self.pellets.eat_pellet(self.maze.get_cell_id(coordinates))
+
+        if pellet_type == collectable.PelletType.power:
+            self.dispatch('on_power_pellet_eaten')
+
+        self.dispatch('on_pellet_eaten', coordinates, pellet_type)
+        if self.pellets.count == 0:
+            self.dispatch('on_pellets_cleared')
+
+    def get_occupants(self, coordinates):
+        """Return a list of the actors in a cell as of the last collision check.
+
+        Arguments:
+        coordinates -- grid coordinates of the cell as a tuple
+        """
+
+        return self.occupancy.get(self.maze.get_cell_id(coordinates), [])
+
+    def check_character_collisions(self):
+        """Check for character collisions.
+
+        This method rebuilds the occupancy of each cell and then checks
+        if any enemies share the player's cell. If the player entered its
+        cell this tick, enemies that were in the cell at the start of the
+        tick also collide with it, so the player and an enemy that swap cells
+        don't pass through each other. If an enemy collides with the player,
+        the player is set to dead. If the player has a power-up and the enemy
+        is frightened, the enemy is set to dead instead. It is called once
+        per tick, after all of the actors have moved, and takes time
+        proportional to the number of actors.
+        """
+
+        self.__update_occupancy()
+        player = self.player
+        occupants = list(self.get_occupants(player.grid_position))
+        if self.__get_previous_cell(player) != player.grid_position:
+            occupants.extend(enemy for enemy in self.enemies
+                             if self.__get_previous_cell(enemy) == player.grid_position and
+                             enemy not in occupants)
+
+        for occupant in occupants:
+            if occupant is player:
+                continue
+            if self.player.powered_up and occupant.frightened:
+                occupant.kill_character()
+            elif not occupant.dead:
+                self.player.kill_character()
+
+    def add_enemy(self, enemy_class):
+        """Add another enemy to the level and return it.
+
+        This allows levels with more than the four standard enemies. The
+        enemy is reset to its start position, and should be added before
+        the simulation is started so that its timers are started with the
+        rest.
+
+        Arguments:
+        enemy_class -- the actor.EnemyActor subclass of the enemy, such as actor.RedActor
+        """
+
+        enemy = enemy_class(self)
+        enemy.reset_character()
+        self.enemies.append(enemy)
+        return enemy
+
+    def __get_previous_cell(self, occupant):
+        """Return the grid coordinates of the cell an actor was in at the start of the tick."""
+
+        return int(occupant.previous_x), int(occupant.previous_y)
+
+    def __update_occupancy(self):
+        """Store the actors in each cell, keyed by the cell's id."""
+
+        self.occupancy = {}
+        for occupant in [self.player] + self.enemies:
+            cell_id = self.maze.get_cell_id(occupant.grid_position)
+            self.occupancy.setdefault(cell_id, []).append(occupant)
+
+    def __on_power_pellet_eaten(self):
+        """Apply the effects of a power pellet to the player and every enemy.
+
+        The player's powerup is activated, which frightens the enemies if the
+        player's powered up state changes. If the player was already powered up,
+        the enemies are frightened here instead, so that enemies that have left
+        the den since the last power pellet still become frightened.
+        """
+
+        was_powered_up = self.player.powered_up
+        self.player.activate_powerup()
+        if was_powered_up:
+            self.__switch_frightened_states()
+
+    def __on_powered_up(self, powered_up):
+        """Switch the enemies' frightened states when the player's powered up state changes."""
+
+        self.__switch_frightened_states()
+
+    def __switch_frightened_states(self):
+        """Switch every enemy's frightened state to match the player's powerup."""
+
+        for enemy in self.enemies:
+            enemy.switch_frightened_state()
+
+    def __run_timers(self):
+        """Call the scheduled callbacks that are due on the current tick."""
+
+        due_timers = sorted((due_tick, order, callback)
+                            for callback, (due_tick, order) in self.__timers.items()
+                            if due_tick <= self.tick_count)
+
+        for due_tick, order, callback in due_timers:
+            # Skip callbacks that an earlier callback unscheduled or rescheduled
+            if self.__timers.get(callback) == (due_tick, order):
+                del self.__timers[callback]
+                callback(self.tick_length)
+
+    def __initialise_pellets(self):
+        """Place a normal pellet in every cell.
+
+        Cells in the beetle den and the player's start position
+        are left without a pellet.
+        """
+
+        self.pellets = collectable.PelletGrid(self.maze.columns * self.maze.rows)
+
+        for cell_id in range(len(self.pellets.flags)):
+            coordinates = self.maze.get_coordinates(cell_id)
+            if not self.maze.is_in_den(coordinates) and coordinates != self.player.start_position:
+                self.pellets.add_pellet(cell_id, collectable.PelletType.normal)
+
+    def __add_powerups(self):
+        """Add powerups to random cells.
+
+        This method chooses cells to add powerups to randomly
+        until the game's maximum powerup limit has been reached.
+        """
+
+        # Start counting from 0
+        powerup_count = 0
+        while powerup_count < self.settings.powerup_limit:
+            cell_id = self.random.randrange(len(self.pellets.flags))
+            if self.pellets.get_pellet(cell_id) == collectable.PelletType.normal:
+                self.pellets.add_pellet(cell_id, collectable.PelletType.power)
+                powerup_count += 1
+
+    def __reset_characters(self):
+        """Completely reset the actors.
+
+        This method ensures the actors' positions and
+        certain modes are initialised, as well as resetting the
+        activation timers, mode length and start position for the enemies.
+        """
+
+        self.player.initialise()
+        for enemy in self.enemies:
+            enemy.reset_character()
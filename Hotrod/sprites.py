@@ -0,0 +1,36 @@
+"""Contain functions for getting the characters' sprites from the atlas.
+
+All of the characters' images are packed into one texture atlas, which
+is loaded once. Each sprite is a region of the atlas's single texture, so
+changing a character's sprite only changes its texture coordinates, and
+doesn't bind another texture or look up an image file.
+
+The atlas is images/characters.atlas, in Kivy's atlas format, with each
+image in images/ scaled to 512x512 and packed into images/characters-0.png.
+"""
+
+# The location of the atlas containing the characters' sprites
+ATLAS_PATH = "images/characters.atlas"
+
+# The atlas's textures keyed by sprite name, loaded when first used
+_textures = None
+
+
+def load():
+    """Load the atlas if it hasn't been loaded.
+
+    This should be called before gameplay starts, so that the atlas
+    isn't loaded during the first frame a character is rendered.
+    """
+
+    global _textures
+    if _textures is None:
+        from kivy.atlas import Atlas
+        _textures = Atlas(ATLAS_PATH).textures
+
+
+def get_texture(name):
+    """Return the texture of the sprite with the given name, such as 'hotrod'."""
+
+    load()
+    return _textures[name]
@@ -0,0 +1,11 @@
+"""Let the tests import the game's modules, which are run from the Hotrod directory."""
+
+# Standard python libraries
+import os
+import sys
+
+# Kivy must not parse pytest's arguments, and only logs warnings so the output is readable
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+os.environ.setdefault('KCFG_KIVY_LOG_LEVEL', 'warning')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,52 @@
+"""Test the junction graph built from a generated maze."""
+
+# Standard python libraries
+import random
+import unittest
+
+# Own modules
+import junctions
+import maze
+
+
+# Seed used for the maze, so every run tests the same layout
+SEED = 130
+
+
+class JunctionGraphTest(unittest.TestCase):
+
+    """Test the decision cells and corridor segments of a maze's junction graph."""
+
+    def setUp(self):
+        random.seed(SEED)
+        self.maze = maze.Maze(16, 16)
+        self.maze.generate()
+        self.graph = self.maze.junction_graph
+
+    def test_every_decision_cell_exit_has_a_segment(self):
+        expected = set((cell_id, index) for cell_id in self.graph.decision_cells
+                       for index in self.graph.exits[cell_id])
+        self.assertEqual(set(self.graph.segments), expected)
+
+    def test_segments_follow_the_corridor(self):
+        graph = self.graph
+        for (start, exit_direction), segment in graph.segments.items():
+            # Walk the corridor one cell at a time and check it ends where the segment says
+            cell_id = graph.passages[start * 4 + exit_direction]
+            current = exit_direction
+            length = 1
+            while cell_id != segment.end:
+                move = graph.corridor_moves[cell_id * 4 + current]
+                self.assertNotEqual(move, junctions.NO_MOVE)
+                cell_id = graph.passages[cell_id * 4 + move]
+                current = move
+                length += 1
+            self.assertEqual(length, segment.length)
+            self.assertEqual(current, segment.end_direction)
+            # A segment ends where there's a choice, or no way on, such as a dead end
+            self.assertTrue(segment.end in graph.decision_cells or
+                            graph.corridor_moves[segment.end * 4 + segment.end_direction] == junctions.NO_MOVE)
+
+
+if __name__ == '__main__':
+    unittest.main()
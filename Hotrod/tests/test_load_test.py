@@ -0,0 +1,31 @@
+"""Test the stand-in score server's latency with a short load test."""
+
+# Standard python libraries
+import unittest
+
+# Own modules
+import load_test
+import score_server
+
+
+class LocalLatencyTest(unittest.TestCase):
+
+    """Test that the stand-in server answers well within TCP's delayed acknowledgement time."""
+
+    def setUp(self):
+        self.server = score_server.start_server()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_median_latency(self):
+        results = load_test.LoadTest(self.server.get_base_url(), players=5, games=4, think_time=0,
+                                     combined=False, seed=0).run()
+
+        self.assertEqual(results['errors'], 0)
+        self.assertEqual(load_test.get_slow_endpoints(results), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
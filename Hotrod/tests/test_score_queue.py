@@ -0,0 +1,64 @@
+"""Test that the score queue submits scores and hands their results to the right thread."""
+
+# Standard python libraries
+import threading
+import unittest
+
+# Own modules
+import score_queue
+
+
+# Number of seconds to wait for the worker before failing a test
+TIMEOUT = 5
+
+
+class ScoreQueueTest(unittest.TestCase):
+
+    """Test the callbacks of queued scores."""
+
+    def setUp(self):
+        self.batch_delay = score_queue.BATCH_DELAY
+        score_queue.BATCH_DELAY = 0
+        self.dispatched = []
+        self.dispatched_event = threading.Event()
+
+    def tearDown(self):
+        score_queue.BATCH_DELAY = self.batch_delay
+
+    def dispatch(self, callback, value):
+        """Record a dispatched callback instead of calling it."""
+
+        self.dispatched.append((callback, value))
+        self.dispatched_event.set()
+
+    def test_callbacks_are_dispatched(self):
+        def submit(entries, on_success, on_failure):
+            on_success([{'previous_best': 20, 'high_scores': []} for entry in entries])
+
+        called = []
+        on_success = lambda response: called.append(response)
+        queue = score_queue.ScoreQueue(submit=submit, dispatch=self.dispatch)
+        queue.submit('player', 1, 100, on_success)
+
+        self.assertTrue(self.dispatched_event.wait(TIMEOUT))
+        self.assertEqual(self.dispatched, [(on_success, {'previous_best': 20, 'high_scores': []})])
+        # Only the dispatcher may call it, as the worker isn't the main thread
+        self.assertEqual(called, [])
+
+    def test_failures_are_dispatched(self):
+        failure = IOError('server unreachable')
+
+        def submit(entries, on_success, on_failure):
+            on_failure(failure)
+
+        on_failure = lambda server_error: None
+        queue = score_queue.ScoreQueue(submit=submit, dispatch=self.dispatch)
+        queue.submit('player', 1, 100, None, on_failure)
+
+        self.assertTrue(self.dispatched_event.wait(TIMEOUT))
+        self.assertEqual(self.dispatched[0], (on_failure, failure))
+        self.assertEqual(queue.pending(), {('player', 1): 100})
+
+
+if __name__ == '__main__':
+    unittest.main()
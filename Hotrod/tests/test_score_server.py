@@ -0,0 +1,76 @@
+"""Test the stand-in score server's batch endpoint."""
+
+# Standard python libraries
+import json
+import unittest
+
+try:
+    from httplib import HTTPConnection
+except ImportError:
+    from http.client import HTTPConnection
+
+# Own modules
+import score_server
+
+
+# Status of a request the server can't understand
+BAD_REQUEST = 400
+
+
+class SubmitBatchTest(unittest.TestCase):
+
+    """Test that submitbatch.py stores valid batches and rejects malformed ones."""
+
+    def setUp(self):
+        self.server = score_server.start_server()
+        host, port = self.server.server_address[:2]
+        self.connection = HTTPConnection(host, port, timeout=5)
+
+    def tearDown(self):
+        self.connection.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def post_batch(self, body):
+        """Send a batch and return the response's status and decoded body."""
+
+        self.connection.request('POST', '/submitbatch.py', body.encode('utf-8'),
+                                {'Content-Type': 'application/x-ndjson'})
+        response = self.connection.getresponse()
+        return response.status, json.loads(response.read().decode('utf-8'))
+
+    def test_valid_batch(self):
+        status, result = self.post_batch('["ann",1,50]\n["bob",1,80]\n["ann",1,70]\n')
+
+        self.assertEqual(status, 200)
+        self.assertEqual(result['previous_best'], [None, None, 50])
+        self.assertEqual(result['high_scores'], [[1, [['bob', 1, 80], ['ann', 1, 70]]]])
+
+    def test_malformed_lines_are_rejected(self):
+        malformed_lines = ['not json',
+                           '5',
+                           'null',
+                           '{"player": "ann", "level": 1, "score": 50}',
+                           '["ann", 1]',
+                           '["ann", 1, 50, 60]',
+                           '["ann", "one", 50]',
+                           '["ann", 1, null]',
+                           '["ann", 1, [50]]',
+                           '[["ann"], 1, 50]',
+                           '[null, 1, 50]']
+        for line in malformed_lines:
+            # The same connection is used throughout, so it must stay usable after each rejection
+            status, result = self.post_batch(line + '\n')
+            self.assertEqual(status, BAD_REQUEST, line)
+
+        self.assertEqual(self.server.store.get_scores(1), [])
+
+    def test_rejected_batch_stores_nothing(self):
+        status, result = self.post_batch('["ann",1,50]\n["bob",1,"lots"]\n')
+
+        self.assertEqual(status, BAD_REQUEST)
+        self.assertEqual(self.server.store.get_best('ann', 1), None)
+
+
+if __name__ == '__main__':
+    unittest.main()
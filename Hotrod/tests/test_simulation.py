@@ -0,0 +1,80 @@
+"""Test the simulation's collisions between the player and the enemies."""
+
+# Standard python libraries
+import random
+import unittest
+
+# Own modules
+import difficulty
+import direction
+import maze
+import simulation
+
+
+# Seed used for the maze and the simulation, so every run tests the same level
+SEED = 130
+
+
+class CollisionTest(unittest.TestCase):
+
+    """Test that the player collides with enemies however they meet."""
+
+    def setUp(self):
+        random.seed(SEED)
+        level_maze = maze.Maze(8, 8)
+        level_maze.generate()
+        self.simulation = simulation.Simulation(level_maze, difficulty.DifficultySettings(), SEED)
+        self.simulation.active = True
+        self.enemy = self.simulation.red_enemy
+        # Only one enemy is needed, and the others could get in the way
+        self.simulation.enemies = [self.enemy]
+        self.enemy.dormant = False
+        self.enemy.chasing = True
+        self.killed = []
+        self.simulation.bind(on_player_killed=lambda: self.killed.append(True))
+
+        # A horizontal passage outside of the beetle den for the actors to meet in
+        self.left_cell, self.right_cell = next(
+            ((x, y), (x + 1, y)) for y in range(level_maze.rows) for x in range(level_maze.columns - 1)
+            if not level_maze.is_wall((x, y), direction.Direction.right) and
+            not level_maze.is_in_den((x, y)) and not level_maze.is_in_den((x + 1, y)))
+
+    def place(self, character, cell, offset, moving):
+        """Place a character in a cell, offset from its left edge and moving in the given direction."""
+
+        character._move_to_cell_center(cell)
+        character.x = character.previous_x = cell[0] + offset
+        character.current_direction = character.next_direction = moving
+
+    def test_swapping_cells_collides(self):
+        # Each is one step from the edge between their cells, so they swap cells in the same tick
+        speed = self.simulation.player.speed
+        self.place(self.simulation.player, self.left_cell, 1 - speed / 2, direction.Direction.right)
+        self.place(self.enemy, self.right_cell, speed / 2, direction.Direction.left)
+
+        self.simulation.step()
+
+        self.assertEqual(self.simulation.player.grid_position, self.right_cell)
+        self.assertEqual(self.enemy.grid_position, self.left_cell)
+        self.assertEqual(self.killed, [True])
+
+    def test_sharing_a_cell_collides(self):
+        self.place(self.simulation.player, self.left_cell, 0.5, direction.Direction.right)
+        self.place(self.enemy, self.left_cell, 0.5, direction.Direction.left)
+
+        self.simulation.step()
+
+        self.assertEqual(self.killed, [True])
+
+    def test_neighbours_do_not_collide(self):
+        # Both move away from the edge between their cells
+        self.place(self.simulation.player, self.left_cell, 0.5, direction.Direction.left)
+        self.place(self.enemy, self.right_cell, 0.5, direction.Direction.right)
+
+        self.simulation.step()
+
+        self.assertEqual(self.killed, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
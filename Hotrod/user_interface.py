@@ -14,15 +14,13 @@ HUDText(Label) - class for the HUD text
 TitleText(Label) - class for title text
 """
 
-# Standard python library
-import json
-
 # Kivy modules
 from kivy.uix.floatlayout import FloatLayout
 from kivy.uix.textinput import TextInput
 from kivy.uix.label import Label
 
 # Own modules
+import score_queue
 import server
 
 
@@ -52,7 +50,8 @@ class GameOverScreen(Screen):
     """Store methods relating to the display of the game over screen.
 
     This class stores methods related to the display of the game over
-    screen.
+    screen. Requests to the server don't block, so the screen is shown
+    straight away and its labels are filled in as the responses arrive.
 
     Public Methods:
     show_score -- displays the given score
@@ -75,32 +74,30 @@ class GameOverScreen(Screen):
     def show_high_scores(self, level):
         """Show the high scores.
 
-        This method requests the high scores for the given level
-        from the server, and then sets the high scores and level labels to
-        display this information.
+        This method sets the level label and requests the high scores
+        for the given level from the server. The high scores label is set
+        when the server responds. The high scores are already shown by
+        show_best_score, so this is only needed when no score is submitted.
 
         Arguments:
         level -- the level to show high scores of
         """
 
-        high_request = server.get_high_scores(level)
-        high_request.wait ()
-
-        high_scores = json.loads(high_request.result)
-        text = ''
-        for entry in high_scores:
-            name, level, score = entry
-            text = text + name + ": " + str(score) + "\n"
-        self.high_scores_text.text = text
         self.level_number_text.text = str(level)
+        server.get_high_scores(level, self.__display_high_scores, self.__display_high_scores_failure)
 
     def show_best_score(self, player, level, score):
-        """Show the player's best score.
+        """Submit the score and show the player's best score and the high scores.
 
-        This method retrieves the given player's best score stored
-        on the server, and compares it with the given current score.
+        This method queues the given score to be submitted to the server, which
+        stores it if it is the player's best and responds with the player's
+        previous best score and the level's high scores, so only one request is
+        needed. The score is kept in the queue until the server has it, so it
+        isn't lost if the server can't be reached.
         If the current score is less than the best, it sets the best
-        score text to display the best score.
+        score text to display the best score. Scores that were prefetched
+        during gameplay are shown straight away, and are replaced when
+        the response arrives.
 
         Arguments:
         player -- the player to show the best score of
@@ -108,19 +105,57 @@ class GameOverScreen(Screen):
         score -- the new score to compare with the player's best score
         """
 
-        best_request = server.get_best_score(player, level)
-        best_request.wait()
-        current_best = json.loads(best_request.result)
+        self.level_number_text.text = str(level)
+        high_scores = server.get_cached_high_scores(level)
+        if high_scores is not None:
+            self.__display_high_scores(high_scores)
+        try:
+            self.__display_best_score(score, server.get_cached_best_score(player, level))
+        except KeyError:
+            pass
 
-        if current_best is None:
-            server.submit_high_score(player, level, score).wait()
-            self.best_score_text.text = "New personal best!"
-        elif score > current_best:
-            server.update_high_score(player, level, score).wait()
+        score_queue.submit_score(player, level, score,
+                                 lambda response: self.__display_submission(score, response),
+                                 lambda server_error: self.__display_submission_failure(level, server_error))
+
+    def __display_submission(self, score, response):
+        """Show the player's best score and the high scores from a submission's response."""
+
+        self.__display_best_score(score, response['previous_best'])
+        self.__display_high_scores(response['high_scores'])
+
+    def __display_best_score(self, score, current_best):
+        """Set the best score label to compare the score with the player's previous best."""
+
+        if current_best is None or score > current_best:
             self.best_score_text.text = "New personal best!"
         else:
             self.best_score_text.text = "Personal best: " + str(current_best)
 
+    def __display_submission_failure(self, level, server_error):
+        """Show whether the score will be submitted later, and try to get the high scores alone."""
+
+        if score_queue.is_permanent_error(server_error):
+            self.best_score_text.text = "Score could not be submitted"
+        else:
+            self.best_score_text.text = "Score will be submitted later"
+        self.show_high_scores(level)
+
+    def __display_high_scores(self, high_scores):
+        """Set the high scores label to display the given high scores."""
+
+        text = ''
+        for entry in high_scores:
+            name, level, score = entry
+            text = text + name + ": " + str(score) + "\n"
+        self.high_scores_text.text = text
+
+    def __display_high_scores_failure(self, server_error):
+        """Show that the high scores couldn't be retrieved."""
+
+        self.high_scores_text.text = "Couldn't get high scores"
+
+
 
 class StartScreen(Screen):
 
@@ -195,4 +230,4 @@ class TitleText(Label):
     This class is defined in the kv file.
     """
 
-    pass
\ No newline at end of file
+    pass